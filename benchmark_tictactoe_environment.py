@@ -0,0 +1,248 @@
+#
+# Copyright (C) 2019 Luca Pasqualini
+# University of Siena - Artificial Intelligence Laboratory - SAILab
+#
+#
+# TicTacToeRL project is licensed under a BSD 3-Clause.
+#
+# You should have received a copy of the license along with this
+# work. If not, see <https://opensource.org/licenses/BSD-3-Clause>.
+
+# Import packages
+
+import logging
+import hashlib
+import numpy
+import random
+import math
+import time
+
+# Import required src
+
+from src.tictactoe_environment import TicTacToeEnvironment
+from src.tictactoe_environment_fixed import TicTacToeEnvironmentFixed, Player
+from src.tictactoe_environment_random import TicTacToeEnvironmentRandom
+from src.tictactoe_vector_environment import VectorTicTacToeEnvironment
+from src.tictactoe_vector_environment_fixed import VectorTicTacToeEnvironmentFixed
+from src.tictactoe_vector_environment_random import VectorTicTacToeEnvironmentRandom
+
+# Define the environments compared by the benchmark
+
+
+class _RandomTicTacToeEnvironment(TicTacToeEnvironment):
+    """
+    Tic-Tac-Toe environment in which the environment player plays a random possible action drawn with the random module.
+    """
+
+    def get_environment_player_first_action(self,
+                                            logger: logging.Logger,
+                                            session) -> int:
+        return self.get_random_action(logger, session)
+
+    def get_environment_player_action(self,
+                                      logger: logging.Logger,
+                                      session) -> int:
+        return self.get_random_action(logger, session)
+
+
+class _ReferenceTicTacToeEnvironment(_RandomTicTacToeEnvironment):
+    """
+    Reference implementation of the original board representation: the board is an array of players checked and
+    encoded by iterating over the cells at each step. Rendering is not supported.
+    """
+
+    def reset(self,
+              logger: logging.Logger,
+              session):
+        # Reset attributes and state
+        self.winner = Player.none
+        self.last_player = Player.none
+        self._move = 0
+        self._episode_done = False
+        self._state = numpy.array([Player.none for _ in range(9)])
+        # Choose a random starting player
+        self.current_player = Player.o
+        if random.uniform(0, 1) <= 0.5:
+            self.current_player = Player.x
+        # If the current player is the environment player, let it decide how to play
+        if self.current_player == self.environment_player:
+            self._move += 1
+            self._apply_reference_action(self.get_environment_player_first_action(logger, session))
+        # Return the first state encoded
+        return self._encode_state_int(self._state)
+
+    def step(self,
+             logger: logging.Logger,
+             action,
+             session):
+        # Change the state with the given action and check for winner and episode completion flag
+        self._move += 1
+        self._apply_reference_action(action)
+        self._episode_done, self.winner = self._check_if_final(self._state)
+        # If the current player is the environment player, let it decide how to play
+        if not self._episode_done and self.current_player == self.environment_player:
+            self._move += 1
+            self._apply_reference_action(self.get_environment_player_action(logger, session))
+            self._episode_done, self.winner = self._check_if_final(self._state)
+        # Assign rewards
+        reward: float = 0.0
+        if self._episode_done:
+            if self.winner == Player.x:
+                reward = self.agent_player_win_reward
+            elif self.winner == Player.o:
+                reward = self.environment_player_win_reward
+            else:
+                reward = self.draw_reward
+        # Return the encoded state, the reward and the episode completion flag
+        return self._encode_state_int(self._state), reward, self._episode_done
+
+    def get_action_mask(self,
+                        logger: logging.Logger,
+                        session) -> numpy.ndarray:
+        # Build the mask checking each action on the board
+        mask: numpy.ndarray = -math.inf * numpy.ones(self.action_space_shape, dtype=float)
+        for action in range(*self.action_space_shape):
+            position, player = divmod(action, 2)
+            player = Player.o if player == 0 else Player.x
+            if self._state[position] == Player.none and player == self.current_player:
+                mask[action] = 1.0
+        return mask
+
+    def get_possible_actions(self,
+                             logger: logging.Logger,
+                             session) -> []:
+        return numpy.where(self.get_action_mask(logger, session) > 0.0)[0].tolist()
+
+    def _apply_reference_action(self,
+                                action: int):
+        """
+        Apply the given action to the board and pass the turn to the other player.
+
+        :param action: the action to apply
+        """
+        position, player = divmod(action, 2)
+        self._state[position] = Player.o if player == 0 else Player.x
+        self.last_player = self.current_player
+        self.current_player = Player.o if self.current_player == Player.x else Player.x
+
+    @staticmethod
+    def _check_if_final(state: numpy.ndarray):
+        """
+        Check if the given state is final and also return the winner, checking each line of the board.
+
+        :return: True if final, False otherwise and the winner
+        """
+        for first, second, third in [(0, 1, 2), (3, 4, 5), (6, 7, 8), (0, 3, 6), (1, 4, 7), (2, 5, 8), (0, 4, 8), (2, 4, 6)]:
+            if state[first] != Player.none and state[first] == state[second] == state[third]:
+                return True, state[first]
+        for element in state:
+            if element == Player.none:
+                return False, Player.none
+        return True, Player.none
+
+    @staticmethod
+    def _encode_state_int(state: numpy.ndarray):
+        """
+        Encode the given state of the board (expressed in player occupied cells) with an integer sequence.
+
+        :param state: the state to encode
+        :return: the encoded state
+        """
+        encoded_state: numpy.ndarray = numpy.zeros(state.size, dtype=int)
+        for i in range(state.size):
+            encoded_state[i] = state[i].value
+        return encoded_state
+
+
+# Define utility functions to run the benchmark
+
+
+def _benchmark_environment(logger: logging.Logger,
+                           environment: TicTacToeEnvironment,
+                           episodes: int,
+                           seed: int):
+    """
+    Play the given number of episodes with a random agent on the given environment.
+
+    :param logger: the logger used to print the benchmark information, warnings and errors
+    :param environment: the environment to benchmark
+    :param episodes: the number of episodes to play
+    :param seed: the seed of the random module, used to play the same games on each run
+    :return: the number of steps per second and a digest of all the observations, rewards and completion flags
+    """
+    # Seed the random module to play the same games
+    random.seed(seed)
+    digest = hashlib.sha256()
+    steps: int = 0
+    start_time: float = time.perf_counter()
+    for _ in range(episodes):
+        state = environment.reset(logger, None)
+        digest.update(state.tobytes())
+        episode_done: bool = False
+        while not episode_done:
+            state, reward, episode_done = environment.step(logger, environment.get_random_action(logger, None), None)
+            digest.update(state.tobytes())
+            digest.update(repr((reward, episode_done)).encode())
+            steps += 1
+    elapsed_time: float = time.perf_counter() - start_time
+    # Return the steps per second and the digest of the played games
+    return steps / elapsed_time, digest.hexdigest()
+
+
+def _benchmark_vector_environment(logger: logging.Logger,
+                                  environment: VectorTicTacToeEnvironment,
+                                  volleys: int):
+    """
+    Play the given number of volleys (one step on each board) with a random agent on the given vectorized environment.
+
+    :param logger: the logger used to print the benchmark information, warnings and errors
+    :param environment: the vectorized environment to benchmark
+    :param volleys: the number of steps to execute on each board
+    :return: the number of steps per second and the number of completed episodes
+    """
+    episodes: int = 0
+    start_time: float = time.perf_counter()
+    environment.reset(logger, None)
+    for _ in range(volleys):
+        _, _, episodes_done, _ = environment.step(logger, environment.get_random_actions(), None)
+        episodes += int(episodes_done.sum())
+    elapsed_time: float = time.perf_counter() - start_time
+    # Return the steps per second and the number of completed episodes
+    return volleys * environment.boards_number / elapsed_time, episodes
+
+
+if __name__ == "__main__":
+    # Define the logger
+    logger: logging.Logger = logging.getLogger(__name__)
+    logger.setLevel(logging.INFO)
+    logging.basicConfig(format="%(asctime)s - %(levelname)s - %(message)s")
+    # Define benchmark data
+    episodes: int = 20000
+    seed: int = 0
+    # Compare the state code and tables of the environment with the reference implementation of the original board
+    # Note: both environment players draw from the random module, so the same games are played on both environments
+    reference_environment: TicTacToeEnvironment = _ReferenceTicTacToeEnvironment("Reference", Player.o, 1.0, -0.1, 0.0)
+    table_environment: TicTacToeEnvironment = _RandomTicTacToeEnvironment("Tables", Player.o, 1.0, -0.1, 0.0)
+    reference_steps_per_second, reference_digest = _benchmark_environment(logger, reference_environment, episodes, seed)
+    table_steps_per_second, table_digest = _benchmark_environment(logger, table_environment, episodes, seed)
+    logger.info("Board representations over " + str(episodes) + " episodes:")
+    logger.info("Original board: " + str(round(reference_steps_per_second)) + " steps/sec")
+    logger.info("State code and tables: " + str(round(table_steps_per_second)) + " steps/sec")
+    logger.info("Speed-up: " + str(round(table_steps_per_second / reference_steps_per_second, 2)) + "x")
+    if reference_digest != table_digest:
+        logger.error("Observations and rewards of the two board representations differ!")
+    # Measure each environment type
+    # Note: the random environment is seeded to make its own random stream play the same games on each run
+    for environment_type, environment_arguments in [(TicTacToeEnvironmentRandom, {"seed": seed}), (TicTacToeEnvironmentFixed, {})]:
+        environment: TicTacToeEnvironment = environment_type(environment_type.__name__, Player.o, 1.0, -0.1, 0.0, **environment_arguments)
+        steps_per_second, _ = _benchmark_environment(logger, environment, episodes, seed)
+        logger.info(environment_type.__name__ + " over " + str(episodes) + " episodes:")
+        logger.info("Single board: " + str(round(steps_per_second)) + " steps/sec")
+    # Measure the vectorized environments
+    boards_number: int = 1024
+    volleys: int = 200
+    for environment_type in [VectorTicTacToeEnvironmentRandom, VectorTicTacToeEnvironmentFixed]:
+        vector_environment: VectorTicTacToeEnvironment = environment_type(environment_type.__name__, Player.o, 1.0, -0.1, 0.0, boards_number, seed)
+        vector_steps_per_second, vector_episodes = _benchmark_vector_environment(logger, vector_environment, volleys)
+        logger.info(environment_type.__name__ + " with " + str(boards_number) + " boards over " + str(vector_episodes) + " episodes:")
+        logger.info("Vectorized: " + str(round(vector_steps_per_second)) + " steps/sec")
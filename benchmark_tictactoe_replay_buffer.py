@@ -0,0 +1,128 @@
+#
+# Copyright (C) 2019 Luca Pasqualini
+# University of Siena - Artificial Intelligence Laboratory - SAILab
+#
+#
+# TicTacToeRL project is licensed under a BSD 3-Clause.
+#
+# You should have received a copy of the license along with this
+# work. If not, see <https://opensource.org/licenses/BSD-3-Clause>.
+
+# Import packages
+
+import logging
+import numpy
+import time
+
+# Import usienarl
+
+from usienarl.libs import SumTree
+from usienarl.td_models.dueling_deep_q_learning import Buffer
+
+# Import required src
+
+from src.tictactoe_state_index import STATES, STATE_OBSERVATIONS
+from src.tictactoe_sum_tree import VectorSumTree
+from src.tictactoe_replay_buffer import TicTacToeReplayBuffer
+
+# Define utility functions to run the benchmark
+
+
+def _benchmark_sum_tree(sum_tree: SumTree,
+                        batch_size: int,
+                        iterations: int) -> float:
+    """
+    Sample and update the priorities of the given number of batches on the given sum tree, one element at a time.
+
+    :param sum_tree: the sum tree of the model buffer, already filled
+    :param batch_size: the number of priorities sampled and updated in each batch
+    :param iterations: the number of batches
+    :return: the average milliseconds of each batch
+    """
+    start_time: float = time.perf_counter()
+    for _ in range(iterations):
+        priority_values: numpy.ndarray = numpy.random.uniform(0.0, sum_tree.total_priority, batch_size)
+        leaf_indexes: [] = [sum_tree.get(priority_value) for priority_value in priority_values]
+        for leaf_index, priority_value in zip(leaf_indexes, numpy.random.uniform(0.0, 1.0, batch_size)):
+            sum_tree.update(leaf_index, priority_value)
+    return (time.perf_counter() - start_time) * 1000 / iterations
+
+
+def _benchmark_vector_sum_tree(sum_tree: VectorSumTree,
+                               batch_size: int,
+                               iterations: int) -> float:
+    """
+    Sample and update the priorities of the given number of batches on the given vectorized sum tree.
+
+    :param sum_tree: the vectorized sum tree, already filled
+    :param batch_size: the number of priorities sampled and updated in each batch
+    :param iterations: the number of batches
+    :return: the average milliseconds of each batch
+    """
+    start_time: float = time.perf_counter()
+    for _ in range(iterations):
+        data_indexes: numpy.ndarray = sum_tree.find(numpy.random.uniform(0.0, sum_tree.total_priority, batch_size))
+        sum_tree.update(data_indexes, numpy.random.uniform(0.0, 1.0, batch_size))
+    return (time.perf_counter() - start_time) * 1000 / iterations
+
+
+def _benchmark_buffer(buffer,
+                      batch_size: int,
+                      iterations: int) -> float:
+    """
+    Get a minibatch and update its priorities with random absolute errors for the given number of iterations.
+
+    :param buffer: the buffer, already filled
+    :param batch_size: the size of the minibatch
+    :param iterations: the number of minibatches
+    :return: the average milliseconds of each minibatch
+    """
+    start_time: float = time.perf_counter()
+    for _ in range(iterations):
+        buffer.get(batch_size)
+        buffer.update(numpy.random.uniform(0.0, 1.0, (batch_size, 18)))
+    return (time.perf_counter() - start_time) * 1000 / iterations
+
+
+if __name__ == "__main__":
+    # Define the logger
+    logger: logging.Logger = logging.getLogger(__name__)
+    logger.setLevel(logging.INFO)
+    logging.basicConfig(format="%(asctime)s - %(levelname)s - %(message)s")
+    # Define benchmark data, as used by the agents of the experiments
+    capacity: int = 100000
+    batch_size: int = 150
+    iterations: int = 200
+    numpy.random.seed(0)
+    # Fill both sum trees with the same priorities
+    priorities: numpy.ndarray = numpy.random.uniform(0.0, 1.0, capacity)
+    sum_tree: SumTree = SumTree(capacity)
+    for priority in priorities:
+        sum_tree.add(None, priority)
+    vector_sum_tree: VectorSumTree = VectorSumTree(capacity)
+    vector_sum_tree.update(numpy.arange(capacity), priorities)
+    sum_tree_milliseconds: float = _benchmark_sum_tree(sum_tree, batch_size, iterations)
+    vector_sum_tree_milliseconds: float = _benchmark_vector_sum_tree(vector_sum_tree, batch_size, iterations)
+    logger.info("Sum tree sampling and update of " + str(batch_size) + " priorities at capacity " + str(capacity) + ":")
+    logger.info("Sum tree: " + str(round(sum_tree_milliseconds, 3)) + " ms")
+    logger.info("Vectorized sum tree: " + str(round(vector_sum_tree_milliseconds, 3)) + " ms")
+    logger.info("Speed-up: " + str(round(sum_tree_milliseconds / vector_sum_tree_milliseconds, 2)) + "x")
+    # Fill both buffers with the same transitions
+    model_buffer: Buffer = Buffer(capacity, 0.01, 0.6, 0.4, 0.001)
+    replay_buffer: TicTacToeReplayBuffer = TicTacToeReplayBuffer(capacity, 0.01, 0.6, 0.4, 0.001)
+    start_time: float = time.perf_counter()
+    state_ids: numpy.ndarray = numpy.random.randint(0, STATES, (capacity, 2))
+    actions: numpy.ndarray = numpy.random.randint(0, 18, capacity)
+    for index in range(capacity):
+        model_buffer.store(STATE_OBSERVATIONS[state_ids[index, 0]].astype(float), actions[index], 0.0, STATE_OBSERVATIONS[state_ids[index, 1]].astype(float), False)
+    model_buffer_store_seconds: float = time.perf_counter() - start_time
+    start_time = time.perf_counter()
+    for index in range(capacity):
+        replay_buffer.store(state_ids[index, 0], actions[index], 0.0, state_ids[index, 1], False)
+    replay_buffer_store_seconds: float = time.perf_counter() - start_time
+    model_buffer_milliseconds: float = _benchmark_buffer(model_buffer, batch_size, iterations)
+    replay_buffer_milliseconds: float = _benchmark_buffer(replay_buffer, batch_size, iterations)
+    logger.info("Buffer get and update of " + str(batch_size) + " transitions at capacity " + str(capacity) + ":")
+    logger.info("Model buffer: " + str(round(model_buffer_milliseconds, 3)) + " ms (filled in " + str(round(model_buffer_store_seconds, 2)) + " s)")
+    logger.info("Replay buffer: " + str(round(replay_buffer_milliseconds, 3)) + " ms (filled in " + str(round(replay_buffer_store_seconds, 2)) + " s)")
+    logger.info("Speed-up: " + str(round(model_buffer_milliseconds / replay_buffer_milliseconds, 2)) + "x")
@@ -13,38 +13,95 @@
 import logging
 import numpy
 import random
+import threading
+import queue
 
 # Import usienarl package
 
 from usienarl import Agent, ExplorationPolicy, SpaceType
-from usienarl.td_models import DuelingDeepQLearning
+from usienarl.td_models.dueling_deep_q_learning import Estimator
 
 # Import required src
 
+from src.tictactoe_dueling_deep_q_learning import TicTacToeDuelingDeepQLearning
 from src.tictactoe_pass_through_interface import TicTacToePassThroughInterface
+from src.tictactoe_state_index import STATE_OBSERVATIONS
+from src.tictactoe_replay_buffer import TicTacToeReplayBuffer
+from src.tictactoe_batch_prefetcher import TicTacToeBatchPrefetcher
+from src.tictactoe_summary_policy import TicTacToeSummaryPolicy
 
 
 class DDDQLTicTacToeAgent(Agent):
     """
     Dueling Double Deep Q-Learning agent for Tic Tac Toe environments.
+
+    During training the model is updated every given number of steps, with a number of updates such that the given
+    number of updates per step is kept on average (by default, one update at each step). The summaries of the updates
+    are written according to the given summary policy (by default, only the summary of the last update of each group).
+
+    If asynchronous, the model is instead updated by a learner thread while training: the acting loop only pushes the
+    transitions in a bounded queue, from which the learner thread moves them to the buffer before each update. The
+    buffer is only accessed by the learner thread while it runs. The learner thread waits for new transitions once the
+    given number of updates per pushed step is reached, so that the replay ratio is the same as in synchronous training.
+    The acting policy (also used by the self-play environments) predicts with its own acting copy of the main network,
+    to which the updated weights are published (increasing the weights version, e.g. invalidating the self-play caches)
+    after each given number of updates, so that it never sees partially updated weights. The target network is updated
+    after each weight copy interval of updates.
+
+    If a replay buffer is given, the steps are stored in it by the ids of their states instead of in the buffer of the
+    model, and the observations are rebuilt when sampling. If also prefetching, the next batch is sampled from the replay
+    buffer by a background thread while the model is updated with the current one (see TicTacToeBatchPrefetcher for the
+    staleness policy of the priorities).
     """
 
     def __init__(self,
                  name: str,
-                 model: DuelingDeepQLearning,
+                 model: TicTacToeDuelingDeepQLearning,
                  exploration_policy: ExplorationPolicy,
                  weight_copy_step_interval: int,
                  batch_size: int = 1,
-                 warmup_random_action_probability: float = 1.0):
+                 warmup_random_action_probability: float = 1.0,
+                 update_every: int = 1,
+                 updates_per_step: float = 1.0,
+                 asynchronous: bool = False,
+                 transition_queue_size: int = 1024,
+                 publish_interval: int = 100,
+                 replay_buffer: TicTacToeReplayBuffer = None,
+                 prefetch: bool = False,
+                 summary_policy: TicTacToeSummaryPolicy = None):
         # Define agent attributes
         self.warmup_random_action_probability: float = warmup_random_action_probability
+        self.update_every: int = update_every
+        self.updates_per_step: float = updates_per_step
+        self.updates: int = 0
+        self.asynchronous: bool = asynchronous
+        self.publish_interval: int = publish_interval
+        # Note: the weights version is increased each time the weights of the model may change
+        self.weights_version: int = 0
         # Define internal agent attributes
-        self._model: DuelingDeepQLearning = model
+        self._model: TicTacToeDuelingDeepQLearning = model
         self._exploration_policy: ExplorationPolicy = exploration_policy
         self._weight_copy_step_interval: int = weight_copy_step_interval
         self._batch_size: int = batch_size
         self._current_absolute_errors = None
         self._current_loss = None
+        self._replay_buffer: TicTacToeReplayBuffer = replay_buffer
+        self._state_id_current: int = None
+        self._summary_policy: TicTacToeSummaryPolicy = summary_policy if summary_policy is not None else TicTacToeSummaryPolicy()
+        self._batch_prefetcher: TicTacToeBatchPrefetcher = None
+        if prefetch and replay_buffer is not None:
+            self._batch_prefetcher = TicTacToeBatchPrefetcher(replay_buffer)
+        # Define the internal attributes of the learner thread
+        self._transition_queue: queue.Queue = queue.Queue(transition_queue_size)
+        self._learner_thread: threading.Thread = None
+        self._learner_stop: threading.Event = threading.Event()
+        self._learner_error: Exception = None
+        self._last_train_step_absolute: int = -1
+        # Define the internal attributes of the acting network, defined only if asynchronous
+        self._acting_network: Estimator = None
+        self._acting_weight_publisher: [] = None
+        self._acting_lock: threading.Lock = threading.Lock()
+        self._acting_weights_published: bool = False
         # Generate base agent
         super(DDDQLTicTacToeAgent, self).__init__(name)
 
@@ -52,38 +109,76 @@ class DDDQLTicTacToeAgent(Agent):
                   logger: logging.Logger,
                   observation_space_type: SpaceType, observation_space_shape,
                   agent_action_space_type: SpaceType, agent_action_space_shape) -> bool:
+        # Check the model exposes the main network and its configuration, required by batched predictions and the acting network
+        if not isinstance(self._model, TicTacToeDuelingDeepQLearning):
+            logger.error("Error during generation of agent: the model is not a Tic Tac Toe dueling deep q-learning model")
+            return False
         # Generate the exploration policy and check if it's successful, stop if not successful
         if self._exploration_policy.generate(logger, agent_action_space_type, agent_action_space_shape):
-            # Generate the _model and return a flag stating if generation was successful
-            return self._model.generate(logger, self._scope + "/" + self._name,
+            # Generate the _model and check if it's successful, stop if not successful
+            if not self._model.generate(logger, self._scope + "/" + self._name,
                                         observation_space_type, observation_space_shape,
-                                        agent_action_space_type, agent_action_space_shape)
+                                        agent_action_space_type, agent_action_space_shape):
+                return False
+            # Define the acting network, if asynchronous
+            if self.asynchronous:
+                self._define_acting_network(observation_space_shape, agent_action_space_shape)
+            return True
         return False
 
+    def _define_acting_network(self,
+                               observation_space_shape, agent_action_space_shape):
+        """
+        Define the acting copy of the main network of the model, outside the model scope, and the operation publishing
+        the weights of the main network to it.
+
+        :param observation_space_shape: the shape of the observation space of the agent
+        :param agent_action_space_shape: the shape of the action space of the agent
+        """
+        self._acting_network = Estimator(self._scope + "/" + self._name + "/ActingNetwork",
+                                         observation_space_shape, agent_action_space_shape,
+                                         self._model.hidden_layers_config, self._model.error_clipping)
+        self._acting_weight_publisher = []
+        for main_network_parameter, acting_network_parameter in zip(self._model.main_network.weight_parameters,
+                                                                    self._acting_network.weight_parameters):
+            self._acting_weight_publisher.append(acting_network_parameter.assign(main_network_parameter))
+
     def initialize(self,
                    logger: logging.Logger,
                    session):
+        # Stop the learner thread, if running, before initializing the model it updates
+        self.stop_learner(logger)
+        # Reset agent attributes
+        self.updates = 0
         # Reset internal agent attributes
+        # Note: the prefetched batch, if any, has been stopped with the learner
         self._current_absolute_errors = None
         self._current_loss = None
+        self._summary_policy.reset()
         # Initialize the model
         self._model.initialize(logger, session)
         # Initialize the exploration policy
         self._exploration_policy.initialize(logger, session)
         # Run the weight copy operation to uniform main and target networks
         self._model.copy_weight(session)
+        self.weights_version += 1
+        # Publish the weights to the acting network, if any, at its first prediction, after the restore of the checkpoint (if any)
+        self._acting_weights_published = False
 
     def act_warmup(self,
                    logger: logging.Logger,
                    session,
                    interface: TicTacToePassThroughInterface,
                    agent_observation_current):
+        # Save the id of the current state for the replay buffer, if any
+        if self._replay_buffer is not None:
+            self._state_id_current = interface.state_id
         # Act randomly or using best agent prediction depending on defined probability
         if random.uniform(0, 1) < self.warmup_random_action_probability:
             action = interface.get_random_agent_action(logger, session)
         else:
             # Return the best action predicted by the model with the current possible action mask
-            action = self._model.get_best_action(session, agent_observation_current, interface.get_action_mask(logger, session))
+            action = numpy.argmax(self._get_all_action_values(session, agent_observation_current, interface.get_action_mask(logger, session)))
         # Return the chosen action
         return action
 
@@ -92,8 +187,12 @@ class DDDQLTicTacToeAgent(Agent):
                   session,
                   interface: TicTacToePassThroughInterface,
                   agent_observation_current):
+        # Save the id of the current state for the replay buffer, if any
+        if self._replay_buffer is not None:
+            self._state_id_current = interface.state_id
         # Get the best action predicted by the model and all relative action q-values
-        best_action, all_actions = self._model.get_best_action_and_all_action_values(session, agent_observation_current, interface.get_action_mask(logger, session))
+        all_actions = self._get_all_action_values(session, agent_observation_current, interface.get_action_mask(logger, session))
+        best_action = numpy.argmax(all_actions)
         # Act according to the exploration policy
         action = self._exploration_policy.act(logger, session, interface, all_actions, best_action)
         # Return the chosen action
@@ -105,7 +204,74 @@ class DDDQLTicTacToeAgent(Agent):
                       interface: TicTacToePassThroughInterface,
                       agent_observation_current):
         # Return the best action predicted by the model with the current possible action mask
-        return self._model.get_best_action(session, agent_observation_current, interface.get_action_mask(logger, session))
+        return numpy.argmax(self._get_all_action_values(session, agent_observation_current, interface.get_action_mask(logger, session)))
+
+    def act_inference_batch(self,
+                            logger: logging.Logger,
+                            session,
+                            agent_observations_current: numpy.ndarray,
+                            masks: numpy.ndarray) -> numpy.ndarray:
+        """
+        Get the best actions predicted by the model at the given batch of observations, in a single forward pass.
+
+        :param logger: the logger used to print the agent information, warnings and errors
+        :param session: the session of tensorflow currently running
+        :param agent_observations_current: the (N, *observation_space_shape) array of the current observations
+        :param masks: the (N, *agent_action_space_shape) array of the action masks of each observation
+        :return: the (N,) array of the best actions
+        """
+        # Feed the whole batch to the acting network at once
+        return numpy.argmax(self._get_action_values_batch(session, agent_observations_current, masks), axis=1)
+
+    def _get_all_action_values(self,
+                               session,
+                               agent_observation_current,
+                               mask: numpy.ndarray) -> numpy.ndarray:
+        """
+        Get all the action values predicted by the acting network, if any, otherwise by the model, at the given observation.
+
+        :param session: the session of tensorflow currently running
+        :param agent_observation_current: the current observation of the agent
+        :param mask: the action mask of the observation
+        :return: the (1, *agent_action_space_shape) array of the action values
+        """
+        if self._acting_network is None:
+            return self._model.get_all_action_values(session, agent_observation_current, mask)
+        return self._get_action_values_batch(session, [agent_observation_current], [mask])
+
+    def _get_action_values_batch(self,
+                                 session,
+                                 agent_observations_current,
+                                 masks) -> numpy.ndarray:
+        """
+        Get the action values predicted at the given batch of observations by the acting network, if any, otherwise by
+        the main network of the model, never while the weights are published to the acting network.
+
+        :param session: the session of tensorflow currently running
+        :param agent_observations_current: the (N, *observation_space_shape) batch of the current observations
+        :param masks: the (N, *agent_action_space_shape) batch of the action masks of each observation
+        :return: the (N, *agent_action_space_shape) array of the action values
+        """
+        if self._acting_network is None:
+            return self._model.get_all_action_values_batch(session, agent_observations_current, masks)
+        if not self._acting_weights_published:
+            self._publish_weights(session)
+        with self._acting_lock:
+            return session.run(self._acting_network.outputs,
+                               feed_dict={self._acting_network.inputs: agent_observations_current, self._acting_network.mask: masks})
+
+    def _publish_weights(self,
+                         session):
+        """
+        Publish the weights of the main network to the acting network, if any, and increase the weights version.
+
+        :param session: the session of tensorflow currently running
+        """
+        if self._acting_network is not None:
+            with self._acting_lock:
+                session.run(self._acting_weight_publisher)
+            self._acting_weights_published = True
+        self.weights_version += 1
 
     def complete_step_warmup(self,
                              logger: logging.Logger,
@@ -117,16 +283,8 @@ class DDDQLTicTacToeAgent(Agent):
                              warmup_step_current: int,
                              warmup_episode_current: int,
                              warmup_episode_volley: int):
-        # Adjust the next observation if None (final step)
-        last_step: bool = False
-        if agent_observation_next is None:
-            last_step = True
-            if self._observation_space_type == SpaceType.discrete:
-                agent_observation_next = 0
-            else:
-                agent_observation_next = numpy.zeros(self._observation_space_shape, dtype=float)
         # Save the current step in the buffer
-        self._model.buffer.store(agent_observation_current, agent_action, reward, agent_observation_next, last_step)
+        self._buffer.store(*self._get_step_record(interface, agent_observation_current, agent_action, reward, agent_observation_next))
 
     def complete_step_train(self,
                             logger: logging.Logger,
@@ -139,25 +297,238 @@ class DDDQLTicTacToeAgent(Agent):
                             train_step_current: int, train_step_absolute: int,
                             train_episode_current: int, train_episode_absolute: int,
                             train_episode_volley: int, train_episode_total: int):
+        step_record: () = self._get_step_record(interface, agent_observation_current, agent_action, reward, agent_observation_next)
+        # Push the current step to the learner thread, if asynchronous
+        if self.asynchronous:
+            self._push_transition(logger, session, (step_record, train_step_absolute))
+            return
+        # After each weight step interval update the target network weights with the main network weights
+        if train_step_absolute % self._weight_copy_step_interval == 0:
+            self._model.copy_weight(session)
+            self.weights_version += 1
+        # Save the current step in the buffer
+        self._buffer.store(*step_record)
+        # Update the model after each update step interval
+        if (train_step_absolute + 1) % self.update_every == 0:
+            self._update_model(logger, session, train_step_absolute)
+
+    def _get_step_record(self,
+                         interface: TicTacToePassThroughInterface,
+                         agent_observation_current,
+                         agent_action,
+                         reward: float,
+                         agent_observation_next) -> ():
+        """
+        Get the record of the given step to store in the buffer: the state ids with the replay buffer, the observations
+        (with an empty next observation at the final step) otherwise.
+
+        :param interface: the interface of the agent, at the next state of the step
+        :param agent_observation_current: the current observation
+        :param agent_action: the agent action
+        :param reward: the reward
+        :param agent_observation_next: the next observation, None at the final step
+        :return: the tuple of the current state, action, reward, next state and last step flag
+        """
+        last_step: bool = agent_observation_next is None
+        if self._replay_buffer is not None:
+            return self._state_id_current, agent_action, reward, interface.state_id, last_step
         # Adjust the next observation if None (final step)
-        last_step: bool = False
-        if agent_observation_next is None:
-            last_step = True
+        if last_step:
             if self._observation_space_type == SpaceType.discrete:
                 agent_observation_next = 0
             else:
                 agent_observation_next = numpy.zeros(self._observation_space_shape, dtype=float)
-        # After each weight step interval update the target network weights with the main network weights
-        if train_step_absolute % self._weight_copy_step_interval == 0:
-            self._model.copy_weight(session)
-        # Save the current step in the buffer
-        self._model.buffer.store(agent_observation_current, agent_action, reward, agent_observation_next, last_step)
+        return agent_observation_current, agent_action, reward, agent_observation_next, last_step
+
+    def _update_model(self,
+                      logger: logging.Logger,
+                      session,
+                      train_step_absolute: int):
+        """
+        Update the model with the group of updates due at the current step, updating the buffer priorities after each one.
+
+        :param logger: the logger used to print the agent information, warnings and errors
+        :param session: the session of tensorflow currently running
+        :param train_step_absolute: the absolute current train step, at which the summary is written
+        """
+        # Run the updates required to keep the given updates per step on average since the start of the training
+        updates_due: int = self._get_updates_due(train_step_absolute)
+        if updates_due <= 0:
+            return
+        for _ in range(updates_due):
+            self._run_update(session)
+        self.updates += updates_due
+        self.weights_version += 1
+        # Write the summary at the absolute current step, if required by the summary policy
+        self._summary_policy.write(self._summary_writer, train_step_absolute)
+
+    def _get_updates_due(self,
+                         train_step_absolute: int) -> int:
+        """
+        Get the number of updates still due to keep the given updates per step on average since the start of the
+        training, up to the given absolute train step.
+
+        :param train_step_absolute: the absolute train step
+        :return: the number of updates due, not positive if none
+        """
+        return int(round((train_step_absolute + 1) * self.updates_per_step)) - self.updates
+
+    def store_transitions(self,
+                          logger: logging.Logger,
+                          session,
+                          interface: TicTacToePassThroughInterface,
+                          transitions: numpy.ndarray):
+        """
+        Store in the buffer the given transitions collected by the actors of an actor pool.
+
+        :param logger: the logger used to print the agent information, warnings and errors
+        :param session: the session of tensorflow currently running
+        :param interface: the interface of the agent, used to translate the transitions
+        :param transitions: the array of records of the state id, environment action, reward, next state id and episode completion flag of each transition
+        """
+        # Translate all the transitions at once
+        state_ids: numpy.ndarray = transitions["state_id"].astype(int)
+        next_state_ids: numpy.ndarray = transitions["next_state_id"].astype(int)
+        agent_actions: numpy.ndarray = interface.environment_actions_to_agent_actions(logger, session, transitions["action"].astype(int), state_ids)
+        # Save each step in the replay buffer, if any, by the ids of its states
+        if self._replay_buffer is not None:
+            for index in range(transitions.size):
+                self._buffer.store(state_ids[index], agent_actions[index], float(transitions["reward"][index]), next_state_ids[index], bool(transitions["done"][index]))
+            return
+        observations: numpy.ndarray = interface.environment_states_to_observations(logger, session, STATE_OBSERVATIONS[state_ids], state_ids)
+        next_observations: numpy.ndarray = interface.environment_states_to_observations(logger, session, STATE_OBSERVATIONS[next_state_ids], next_state_ids)
+        # Save each step in the buffer, with an empty next observation at final steps
+        empty_observation: numpy.ndarray = numpy.zeros(self._observation_space_shape, dtype=float)
+        for index in range(transitions.size):
+            last_step: bool = bool(transitions["done"][index])
+            self._model.buffer.store(observations[index], agent_actions[index], float(transitions["reward"][index]),
+                                     empty_observation if last_step else next_observations[index], last_step)
+
+    def _run_update(self,
+                    session):
+        """
+        Update the model once with a batch sampled from the buffer, update the buffer with the computed absolute errors
+        and record the results of the update in the summary policy.
+
+        :param session: the session of tensorflow currently running
+        """
         # Update the model and save current loss and absolute errors
-        summary, self._current_loss, self._current_absolute_errors = self._model.update(session, self._model.buffer.get(self._batch_size))
+        summary, self._current_loss, self._current_absolute_errors = self._model.update(session, self._buffer.get(self._batch_size))
+        # Record the results of the update before updating the buffer, since the buffer of the model changes the absolute errors in place
+        self._summary_policy.record(summary, self._current_loss, self._current_absolute_errors)
         # Update the buffer with the computed absolute error
-        self._model.buffer.update(self._current_absolute_errors)
-        # Update the summary at the absolute current step
-        self._summary_writer.add_summary(summary, train_step_absolute)
+        self._buffer.update(self._current_absolute_errors)
+
+    def start_learner(self,
+                      logger: logging.Logger,
+                      session):
+        """
+        Start the learner thread updating the model, if asynchronous and not already running.
+
+        :param logger: the logger used to print the agent information, warnings and errors
+        :param session: the session of tensorflow currently running
+        """
+        if not self.asynchronous or self._learner_thread is not None:
+            return
+        self._learner_stop.clear()
+        self._learner_error = None
+        # Note: no updates are due until the first transition is stored
+        self._last_train_step_absolute = -1
+        self._learner_thread = threading.Thread(target=self._learn, args=(session,), name=self._name + "_learner", daemon=True)
+        self._learner_thread.start()
+        logger.info("Learner thread started")
+
+    def stop_learner(self,
+                     logger: logging.Logger):
+        """
+        Stop the learner thread, if running, after it stored all the queued transitions in the buffer. The batch
+        prefetching, if any, is stopped as well, discarding the prefetched batch, and the pending summaries are written.
+
+        :param logger: the logger used to print the agent information, warnings and errors
+        """
+        if self._learner_thread is not None:
+            self._learner_stop.set()
+            self._learner_thread.join()
+            self._learner_thread = None
+            logger.info("Learner thread stopped after " + str(self.updates) + " updates")
+        # Stop the batch prefetching only once the learner thread, if any, does not get batches anymore
+        if self._batch_prefetcher is not None:
+            self._batch_prefetcher.stop()
+        # Write the summaries still pending and stop the background summary writer, if any
+        self._summary_policy.stop(self._summary_writer)
+        # Raise the error of the learner thread, if any, in the acting thread
+        if self._learner_error is not None:
+            raise self._learner_error
+
+    def _push_transition(self,
+                         logger: logging.Logger,
+                         session,
+                         transition: ()):
+        """
+        Push the given transition to the learner thread, starting it if required and waiting if the queue is full.
+
+        :param logger: the logger used to print the agent information, warnings and errors
+        :param session: the session of tensorflow currently running
+        :param transition: the tuple of the record of the step to store in the buffer and of the absolute train step
+        """
+        self.start_learner(logger, session)
+        while True:
+            # Raise the error of the learner thread, if any, instead of waiting forever on a full queue
+            if self._learner_error is not None:
+                self.stop_learner(logger)
+            try:
+                self._transition_queue.put(transition, timeout=1.0)
+                return
+            except queue.Full:
+                continue
+
+    def _store_queued_transitions(self,
+                                  timeout: float = None):
+        """
+        Move all the transitions currently in the queue to the buffer, waiting for the first one if a timeout is given.
+
+        :param timeout: the optional seconds to wait for the first transition, if the queue is empty
+        """
+        while True:
+            try:
+                if timeout is not None:
+                    step_record, self._last_train_step_absolute = self._transition_queue.get(timeout=timeout)
+                    timeout = None
+                else:
+                    step_record, self._last_train_step_absolute = self._transition_queue.get_nowait()
+            except queue.Empty:
+                return
+            self._buffer.store(*step_record)
+
+    def _learn(self,
+               session):
+        """
+        Update the model until stopped, storing the queued transitions in the buffer before each update and waiting for
+        new transitions when no update is due.
+
+        :param session: the session of tensorflow currently running
+        """
+        try:
+            while not self._learner_stop.is_set():
+                self._store_queued_transitions()
+                # Wait for new transitions if the updates due at the last stored step have all been run
+                if self._get_updates_due(self._last_train_step_absolute) <= 0:
+                    self._store_queued_transitions(timeout=0.1)
+                    continue
+                self._run_update(session)
+                self.updates += 1
+                # After each weight copy interval of updates update the target network weights with the main network weights
+                if self.updates % self._weight_copy_step_interval == 0:
+                    self._model.copy_weight(session)
+                # After each publish interval of updates publish the weights and write the summary at the last pushed step
+                if self.updates % self.publish_interval == 0:
+                    self._publish_weights(session)
+                    self._summary_policy.write(self._summary_writer, self._last_train_step_absolute)
+            # Store the transitions still in the queue and publish the last weights
+            self._store_queued_transitions()
+            self._publish_weights(session)
+        except Exception as error:
+            self._learner_error = error
 
     def complete_step_inference(self,
                                 logger: logging.Logger,
@@ -204,6 +575,18 @@ class DDDQLTicTacToeAgent(Agent):
                                    inference_episode_volley: int):
         pass
 
+    @property
+    def _buffer(self):
+        """
+        The buffer in which the steps are stored: the batch prefetcher of the replay buffer, if any, the replay buffer,
+        if any, otherwise the buffer of the model.
+        """
+        if self._batch_prefetcher is not None:
+            return self._batch_prefetcher
+        if self._replay_buffer is not None:
+            return self._replay_buffer
+        return self._model.buffer
+
     @property
     def trainable_variables(self):
         # Return the trainable variables of the agent model in experiment/agent _scope
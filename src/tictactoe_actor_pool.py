@@ -0,0 +1,316 @@
+#
+# Copyright (C) 2019 Luca Pasqualini
+# University of Siena - Artificial Intelligence Laboratory - SAILab
+#
+#
+# TicTacToeRL project is licensed under a BSD 3-Clause.
+#
+# You should have received a copy of the license along with this
+# work. If not, see <https://opensource.org/licenses/BSD-3-Clause>.
+
+# Import packages
+
+import logging
+import numpy
+import random
+import time
+import typing
+import multiprocessing
+
+# Note: shared memory requires python 3.8 or later, the actor pool cannot be started without it
+try:
+    from multiprocessing import shared_memory
+except ImportError:
+    shared_memory = None
+
+# Import required src
+
+from src.tictactoe_state_index import STATES, STATE_OBSERVATIONS
+
+# Note: the agent and the interface are only imported for type checking, so that the actor processes (which import
+# this module) do not import the agent model and its tensorflow graph definitions
+if typing.TYPE_CHECKING:
+    from src.dddql_tictactoe_agent import DDDQLTicTacToeAgent
+    from src.tictactoe_pass_through_interface import TicTacToePassThroughInterface
+
+# Define the record of a transition in the shared ring buffer
+# Note: states are stored as state ids and actions as environment actions, so that each record only takes 10 bytes
+TRANSITION_DTYPE: numpy.dtype = numpy.dtype([("state_id", numpy.int16),
+                                            ("action", numpy.int8),
+                                            ("reward", numpy.float32),
+                                            ("next_state_id", numpy.int16),
+                                            ("done", numpy.bool_)])
+
+
+def _attach_arrays(ring_memory, control_memory,
+                   actors_number: int, capacity: int):
+    """
+    Get the numpy arrays backed by the given shared memory blocks, without copying them.
+
+    :param ring_memory: the shared memory block of the ring buffer
+    :param control_memory: the shared memory block of the counters, the times, the policy version and the policy
+    :param actors_number: the number of actors
+    :param capacity: the capacity of the ring buffer segment of each actor
+    :return: the (actors, capacity) ring buffer, the (actors,) write counters, the (actors,) running times, the (1,) policy version and the (STATES,) policy
+    """
+    ring: numpy.ndarray = numpy.ndarray((actors_number, capacity), dtype=TRANSITION_DTYPE, buffer=ring_memory.buf)
+    counters: numpy.ndarray = numpy.ndarray(actors_number, dtype=numpy.int64, buffer=control_memory.buf)
+    times: numpy.ndarray = numpy.ndarray(actors_number, dtype=numpy.float64, buffer=control_memory.buf, offset=8 * actors_number)
+    policy_version: numpy.ndarray = numpy.ndarray(1, dtype=numpy.int64, buffer=control_memory.buf, offset=16 * actors_number)
+    policy: numpy.ndarray = numpy.ndarray(STATES, dtype=numpy.int16, buffer=control_memory.buf, offset=16 * actors_number + 8)
+    return ring, counters, times, policy_version, policy
+
+
+def _run_actor(actor: int,
+               environment_class, environment_kwargs: {},
+               ring_memory_name: str, control_memory_name: str,
+               actors_number: int, capacity: int,
+               epsilon: float, seed: int,
+               stop_event):
+    """
+    Run an actor process, playing episodes on its own environment and writing the transitions in its ring buffer segment
+    until stopped.
+
+    The actor plays the last published greedy policy with epsilon-greedy exploration, and randomly until the first
+    policy is published. The policy is synchronized at the start of each episode.
+
+    :param actor: the index of the actor
+    :param environment_class: the class of the Tic Tac Toe environment to run
+    :param environment_kwargs: the keyword arguments of the environment constructor
+    :param ring_memory_name: the name of the shared memory block of the ring buffer
+    :param control_memory_name: the name of the shared memory block of the counters, the times and the policy
+    :param actors_number: the number of actors
+    :param capacity: the capacity of the ring buffer segment of each actor
+    :param epsilon: the probability of a random action of the actor
+    :param seed: the seed of the actor random generators
+    :param stop_event: the event stopping the actor
+    """
+    logger: logging.Logger = logging.getLogger("actor_" + str(actor))
+    ring_memory = shared_memory.SharedMemory(ring_memory_name)
+    control_memory = shared_memory.SharedMemory(control_memory_name)
+    try:
+        ring, counters, times, policy_version, policy = _attach_arrays(ring_memory, control_memory, actors_number, capacity)
+        segment: numpy.ndarray = ring[actor]
+        # Seed both the actor and the environment random generators (the environment chooses the starting player)
+        random.seed(seed)
+        random_generator: numpy.random.Generator = numpy.random.default_rng(seed)
+        environment = environment_class(**environment_kwargs)
+        environment.setup(logger)
+        environment.initialize(logger, None)
+        local_policy: numpy.ndarray = numpy.zeros(STATES, dtype=numpy.int16)
+        local_policy_version: int = 0
+        start_time: float = time.perf_counter()
+        while not stop_event.is_set():
+            # Synchronize the policy if a new one was published
+            # Note: the version is odd while the policy is being written, so the copy is retried if it changed meanwhile
+            version: int = int(policy_version[0])
+            if version != local_policy_version and version % 2 == 0:
+                numpy.copyto(local_policy, policy)
+                if int(policy_version[0]) == version:
+                    local_policy_version = version
+            # Play an episode
+            environment.reset(logger, None)
+            state_id: int = environment.state_id
+            episode_done: bool = False
+            while not episode_done:
+                if local_policy_version == 0 or random_generator.random() < epsilon:
+                    action: int = environment.get_random_action(logger, None)
+                else:
+                    action: int = int(local_policy[state_id])
+                _, reward, episode_done = environment.step(logger, action, None)
+                next_state_id: int = environment.state_id
+                # Write the transition in the ring buffer and only then make it visible by increasing the counter
+                segment[counters[actor] % capacity] = (state_id, action, reward, next_state_id, episode_done)
+                counters[actor] += 1
+                times[actor] = time.perf_counter() - start_time
+                state_id = next_state_id
+        environment.close(logger, None)
+    finally:
+        ring_memory.close()
+        control_memory.close()
+
+
+class TicTacToeActorPool:
+    """
+    Pool of actor processes, each one playing on its own copy of a Tic Tac Toe environment and writing its transitions in
+    its segment of a ring buffer in shared memory, read by the learner without pickling.
+
+    The agent policy is synchronized with the actors by publishing the table of its greedy actions at all the states,
+    computed in a single forward pass. Each actor explores with its own epsilon, as in Ape-X: the actor i of N uses
+    epsilon ** (1 + alpha * i / (N - 1)). The environment has to be constructible in another process (e.g. it cannot
+    be a self-play environment, which requires the agent).
+    """
+
+    def __init__(self,
+                 environment_class,
+                 environment_kwargs: {},
+                 actors_number: int,
+                 capacity: int = 65536,
+                 epsilon: float = 0.4,
+                 alpha: float = 7.0,
+                 seed: int = None):
+        # Define actor pool attributes
+        self.environment_class = environment_class
+        self.environment_kwargs: {} = environment_kwargs
+        self.actors_number: int = actors_number
+        self.capacity: int = capacity
+        self.epsilons: numpy.ndarray = epsilon ** (1 + alpha * numpy.arange(actors_number) / max(actors_number - 1, 1))
+        # Define internal actor pool attributes
+        self._random_generator: numpy.random.Generator = numpy.random.default_rng(seed)
+        self._seeds: numpy.ndarray = numpy.random.SeedSequence(seed).generate_state(actors_number)
+        self._read_counters: numpy.ndarray = numpy.zeros(actors_number, dtype=numpy.int64)
+        self._context = multiprocessing.get_context("spawn")
+        self._stop_event = None
+        self._processes: [] = []
+        self._ring_memory = None
+        self._control_memory = None
+        self._ring: numpy.ndarray = None
+        self._counters: numpy.ndarray = None
+        self._times: numpy.ndarray = None
+        self._policy_version: numpy.ndarray = None
+        self._policy: numpy.ndarray = None
+
+    def start(self,
+              logger: logging.Logger) -> bool:
+        """
+        Allocate the shared memory and start the actor processes.
+
+        :param logger: the logger used to print the actor pool information, warnings and errors
+        :return: True if the actors are started, False otherwise
+        """
+        if shared_memory is None:
+            logger.error("Shared memory is not available (python 3.8 or later is required), the actor pool cannot be started")
+            return False
+        self._ring_memory = shared_memory.SharedMemory(create=True, size=self.actors_number * self.capacity * TRANSITION_DTYPE.itemsize)
+        self._control_memory = shared_memory.SharedMemory(create=True, size=16 * self.actors_number + 8 + 2 * STATES)
+        self._ring, self._counters, self._times, self._policy_version, self._policy = _attach_arrays(self._ring_memory, self._control_memory, self.actors_number, self.capacity)
+        self._counters[:] = 0
+        self._times[:] = 0.0
+        self._policy_version[0] = 0
+        self._read_counters[:] = 0
+        self._stop_event = self._context.Event()
+        for actor in range(self.actors_number):
+            process = self._context.Process(target=_run_actor,
+                                            args=(actor, self.environment_class, self.environment_kwargs,
+                                                  self._ring_memory.name, self._control_memory.name,
+                                                  self.actors_number, self.capacity,
+                                                  float(self.epsilons[actor]), int(self._seeds[actor]),
+                                                  self._stop_event),
+                                            name="actor_" + str(actor), daemon=True)
+            process.start()
+            self._processes.append(process)
+        logger.info("Actor pool of " + str(self.actors_number) + " actors started")
+        return True
+
+    def stop(self,
+             logger: logging.Logger):
+        """
+        Stop the actor processes, report their throughput and release the shared memory.
+
+        :param logger: the logger used to print the actor pool information, warnings and errors
+        """
+        if len(self._processes) == 0:
+            return
+        self._stop_event.set()
+        for process in self._processes:
+            process.join()
+        self._processes = []
+        self.report(logger)
+        # Release the arrays backed by the shared memory before closing it
+        self._ring = self._counters = self._times = self._policy_version = self._policy = None
+        for memory in (self._ring_memory, self._control_memory):
+            memory.close()
+            memory.unlink()
+        self._ring_memory = self._control_memory = None
+
+    def publish_policy(self,
+                       logger: logging.Logger,
+                       session,
+                       agent: "DDDQLTicTacToeAgent",
+                       interface: "TicTacToePassThroughInterface"):
+        """
+        Publish the greedy policy of the given agent to the actors.
+
+        :param logger: the logger used to print the actor pool information, warnings and errors
+        :param session: the session of tensorflow currently running
+        :param agent: the agent whose policy is published
+        :param interface: the interface of the agent
+        """
+        # Compute the greedy environment actions of the agent at all the states in a single batch
+        # Note: actions at final states are meaningless, since they are never played
+        state_ids: numpy.ndarray = numpy.arange(STATES)
+        observations: numpy.ndarray = interface.environment_states_to_observations(logger, session, STATE_OBSERVATIONS, state_ids)
+        agent_actions: numpy.ndarray = agent.act_inference_batch(logger, session, observations, interface.get_action_masks(logger, session, state_ids))
+        environment_actions: numpy.ndarray = interface.agent_actions_to_environment_actions(logger, session, agent_actions, state_ids)
+        # Write the policy between two increases of the version, so that the actors never copy it while it is written
+        self._policy_version[0] += 1
+        self._policy[:] = environment_actions
+        self._policy_version[0] += 1
+
+    def collect(self) -> numpy.ndarray:
+        """
+        Collect the transitions written by all the actors since the last collection.
+
+        Transitions overwritten before being collected are lost.
+
+        :return: an array of TRANSITION_DTYPE records
+        """
+        counters: numpy.ndarray = self._counters.copy()
+        segments: [] = []
+        for actor in range(self.actors_number):
+            # Skip the transitions already overwritten and the slot which may be being written
+            first: int = max(int(self._read_counters[actor]), int(counters[actor]) - self.capacity + 1)
+            written: numpy.ndarray = numpy.arange(first, counters[actor])
+            segment: numpy.ndarray = self._ring[actor, written % self.capacity]
+            # Drop the transitions whose slot has been overwritten (or is being written) during the gather
+            segments.append(segment[written > self._counters[actor] - self.capacity])
+        self._read_counters[:] = counters
+        return numpy.concatenate(segments)
+
+    def sample(self,
+               batch_size: int) -> numpy.ndarray:
+        """
+        Sample uniformly a batch of the transitions currently in the ring buffer of all the actors.
+
+        The samples whose slot is overwritten by its actor while the batch is gathered are drawn again, so that no
+        partially written transition is returned.
+
+        :param batch_size: the number of transitions to sample
+        :return: an array of TRANSITION_DTYPE records, empty if no actor has written any transition yet
+        """
+        transitions: numpy.ndarray = numpy.zeros(batch_size, dtype=TRANSITION_DTYPE)
+        pending: numpy.ndarray = numpy.arange(batch_size)
+        while pending.size > 0:
+            # Count the transitions available in each segment, excluding the slot which may be being written
+            counters: numpy.ndarray = self._counters.copy()
+            available: numpy.ndarray = numpy.minimum(counters, self.capacity - 1)
+            offsets: numpy.ndarray = numpy.cumsum(available)
+            if offsets[-1] == 0:
+                return numpy.zeros(0, dtype=TRANSITION_DTYPE)
+            samples: numpy.ndarray = self._random_generator.integers(0, offsets[-1], pending.size)
+            # Map each sample to its actor and to its slot, going back from the last transition written by the actor
+            actors: numpy.ndarray = numpy.searchsorted(offsets, samples, side="right")
+            backs: numpy.ndarray = samples - (offsets[actors] - available[actors])
+            written: numpy.ndarray = counters[actors] - 1 - backs
+            transitions[pending] = self._ring[actors, written % self.capacity]
+            # Read the counters again and draw again the samples whose slot has been overwritten (or is being written) during the gather
+            pending = pending[written <= self._counters[actors] - self.capacity]
+        return transitions
+
+    def report(self,
+               logger: logging.Logger):
+        """
+        Report the number of transitions and the throughput of each actor and of the whole pool.
+
+        :param logger: the logger used to print the actor pool information, warnings and errors
+        """
+        for actor in range(self.actors_number):
+            logger.info("Actor " + str(actor) + " (epsilon " + str(round(float(self.epsilons[actor]), 4)) + "): " + str(int(self._counters[actor])) + " steps, " + str(round(float(self.steps_per_second[actor]), 1)) + " steps/sec")
+        logger.info("Actor pool: " + str(int(self._counters.sum())) + " steps, " + str(round(float(self.steps_per_second.sum()), 1)) + " steps/sec")
+
+    @property
+    def steps_per_second(self) -> numpy.ndarray:
+        """
+        The (actors,) array of the throughput of each actor since its start.
+        """
+        return numpy.divide(self._counters, self._times, out=numpy.zeros(self.actors_number), where=self._times > 0)
@@ -0,0 +1,136 @@
+#
+# Copyright (C) 2019 Luca Pasqualini
+# University of Siena - Artificial Intelligence Laboratory - SAILab
+#
+#
+# TicTacToeRL project is licensed under a BSD 3-Clause.
+#
+# You should have received a copy of the license along with this
+# work. If not, see <https://opensource.org/licenses/BSD-3-Clause>.
+
+# Import packages
+
+import numpy
+import threading
+from concurrent.futures import ThreadPoolExecutor, Future
+
+# Import required src
+
+from src.tictactoe_replay_buffer import TicTacToeReplayBuffer
+
+
+class TicTacToeBatchPrefetcher:
+    """
+    Double-buffered batch prefetcher wrapping a Tic Tac Toe replay buffer, with the same store, get and update methods.
+
+    Each time a minibatch is got, the next one is sampled by a background thread while the caller updates the model
+    with the current one, so that at most two minibatches exist at any time: the one in use and the one prefetched.
+    All the accesses to the replay buffer are serialized by a lock.
+
+    Staleness policy: the prefetched minibatch is sampled before the priorities of the minibatch in use are updated, so
+    its transitions and importance sampling weights lag one update behind. Priority updates are always applied at once
+    to the indexes of the minibatch they were computed on (the last update of an index wins), except for the transitions
+    overwritten by newer ones after the sampling, which keep the max priority they were stored with. The annealing of
+    the importance sampling value is only advanced when a minibatch is got, so discarded minibatches do not advance it.
+    """
+
+    def __init__(self,
+                 replay_buffer: TicTacToeReplayBuffer):
+        # Define internal prefetcher attributes
+        self._replay_buffer: TicTacToeReplayBuffer = replay_buffer
+        self._lock: threading.Lock = threading.Lock()
+        self._executor: ThreadPoolExecutor = None
+        self._prefetched_batch: Future = None
+        self._prefetched_amount: int = None
+        # Note: the indexes of the minibatch in use are kept with the number of transitions stored when it was sampled
+        self._last_sampled_indexes: numpy.ndarray = None
+        self._last_sampled_stored: int = None
+
+    def store(self,
+              state_id: int, action: int, reward: float, next_state_id: int, last_step: bool):
+        """
+        Store the given transition in the replay buffer.
+
+        :param state_id: the id of the current state
+        :param action: the agent action
+        :param reward: the reward
+        :param next_state_id: the id of the next state
+        :param last_step: the flag stating if the transition is the last step of its episode
+        """
+        with self._lock:
+            self._replay_buffer.store(state_id, action, reward, next_state_id, last_step)
+
+    def get(self,
+            amount: int = 0) -> []:
+        """
+        Get the prefetched minibatch, or sample it now if none of the given amount is prefetched, and start prefetching
+        the next one. The priorities of its transitions are updated by the next update.
+
+        :param amount: the number of transitions to sample, all the capacity if not positive or above it
+        :return: the list of the arrays of current observations, actions, rewards, next observations, last step flags and importance sampling weights
+        """
+        if self._prefetched_batch is not None and self._prefetched_amount == amount:
+            minibatch, self._last_sampled_indexes, self._last_sampled_stored = self._prefetched_batch.result()
+        else:
+            self.discard()
+            minibatch, self._last_sampled_indexes, self._last_sampled_stored = self._sample(amount)
+        # Advance the annealing for the consumed minibatch only, before sampling the next one with the next value
+        with self._lock:
+            self._replay_buffer.anneal()
+        # Sample the next minibatch in the background while the current one is in use
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="batch_prefetcher")
+        self._prefetched_batch = self._executor.submit(self._sample, amount)
+        self._prefetched_amount = amount
+        return minibatch
+
+    def update(self,
+               absolute_errors: numpy.ndarray):
+        """
+        Update the priorities of the transitions of the last got minibatch with the given absolute errors.
+
+        :param absolute_errors: the array of the absolute errors of the last got transitions for each action
+        """
+        if self._last_sampled_indexes is None:
+            return
+        with self._lock:
+            self._replay_buffer.update_priorities(self._last_sampled_indexes, absolute_errors, self._last_sampled_stored)
+        self._last_sampled_indexes = None
+
+    def discard(self):
+        """
+        Discard the prefetched minibatch, if any, waiting for its sampling to complete, without advancing the annealing.
+        """
+        if self._prefetched_batch is None:
+            return
+        self._prefetched_batch.result()
+        self._prefetched_batch = None
+        self._prefetched_amount = None
+
+    def stop(self):
+        """
+        Discard the prefetched minibatch, if any, and stop the background thread. It is started again by the next get.
+        """
+        self.discard()
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def _sample(self,
+                amount: int) -> ():
+        """
+        Sample a minibatch from the replay buffer.
+
+        :param amount: the number of transitions to sample
+        :return: the tuple of the minibatch, the indexes of its transitions and the number of transitions stored when sampled
+        """
+        with self._lock:
+            minibatch, indexes = self._replay_buffer.sample(amount)
+            return minibatch, indexes, self._replay_buffer.stored
+
+    @property
+    def size(self) -> int:
+        """
+        The number of transitions currently stored in the replay buffer.
+        """
+        return self._replay_buffer.size
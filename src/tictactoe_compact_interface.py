@@ -0,0 +1,177 @@
+#
+# Copyright (C) 2019 Luca Pasqualini
+# University of Siena - Artificial Intelligence Laboratory - SAILab
+#
+#
+# TicTacToeRL project is licensed under a BSD 3-Clause.
+#
+# You should have received a copy of the license along with this
+# work. If not, see <https://opensource.org/licenses/BSD-3-Clause>.
+
+# Import packages
+
+import logging
+import numpy
+import random
+
+# Import usienarl
+
+from usienarl import SpaceType
+
+# Import required src
+
+from src.tictactoe_environment import TicTacToeEnvironment, Player
+from src.tictactoe_pass_through_interface import TicTacToePassThroughInterface
+from src.tictactoe_state_index import STATE_POSITION_ACTION_MASKS
+from src.tictactoe_symmetry import STATE_TRANSFORMS, BOARD_PERMUTATIONS, INVERSE_BOARD_PERMUTATIONS
+
+
+class TicTacToeCompactInterface(TicTacToePassThroughInterface):
+    """
+    Compact interface for all Tic Tac Toe environments, in which the agent actions are the 9 positions of the board.
+
+    The environment action is the agent position played by the current player of the environment. Agents generated
+    with this interface have a 9 actions head, so agents saved with the pass-through interface (18 actions) must still
+    be used with the pass-through interface. With the canonical encoding the positions are the ones of the canonical
+    form of the state.
+    """
+
+    def __init__(self,
+                 environment: TicTacToeEnvironment,
+                 encoding: str = "signed"):
+        # Generate the base pass-through interface
+        super(TicTacToeCompactInterface, self).__init__(environment, encoding)
+
+    def agent_action_to_environment_action(self,
+                                           logger: logging.Logger,
+                                           session,
+                                           agent_action):
+        # Map the position back from the canonical form of the state, if required
+        if self._canonical:
+            agent_action = int(BOARD_PERMUTATIONS[self.state_transform, agent_action])
+        # Play the position with the current player
+        return 2 * agent_action + (1 if self._tictactoe_environment.current_player == Player.x else 0)
+
+    def environment_action_to_agent_action(self,
+                                           logger: logging.Logger,
+                                           session,
+                                           environment_action):
+        # Map the position of the environment action to the canonical form of the state, if required
+        if self._canonical:
+            return int(INVERSE_BOARD_PERMUTATIONS[self.state_transform, environment_action // 2])
+        # Just return the position of the environment action
+        return environment_action // 2
+
+    def get_random_agent_action(self,
+                                logger: logging.Logger,
+                                session):
+        # Choose a random position in the currently possible positions
+        return random.choice(self.get_possible_actions(logger, session))
+
+    def get_possible_actions(self,
+                             logger: logging.Logger,
+                             session) -> []:
+        """
+        Get the possible agent actions from the environment current state available actions.
+
+        Since agent actions are positions, this is the read-only list of the possible positions maintained by the environment
+        (mapped to the canonical form of the state with the canonical encoding).
+
+        :param logger: the logger used to print the interface information, warnings and errors
+        :param session: the session of tensorflow currently running, if any
+        :return: a list of agent actions which the agent can execute
+        """
+        if self._canonical:
+            return INVERSE_BOARD_PERMUTATIONS[self.state_transform, self._tictactoe_environment.get_possible_positions(logger, session)].tolist()
+        return self._tictactoe_environment.get_possible_positions(logger, session)
+
+    def get_action_mask(self,
+                        logger: logging.Logger,
+                        session) -> numpy.ndarray:
+        """
+        Get an array representing the agent action mask (-infinity masked out actions, 1.0 available actions).
+
+        Since agent actions are positions, this is the read-only position mask maintained by the environment (mapped to
+        the canonical form of the state with the canonical encoding).
+
+        :param logger: the logger used to print the interface information, warnings and errors
+        :param session: the session of tensorflow currently running, if any
+        :return: an array of values where 1.0 means available action at that index, -infinity means instead not available
+        """
+        if self._canonical:
+            return self._tictactoe_environment.get_position_mask(logger, session)[BOARD_PERMUTATIONS[self.state_transform]]
+        return self._tictactoe_environment.get_position_mask(logger, session)
+
+    def get_action_masks(self,
+                         logger: logging.Logger,
+                         session,
+                         state_ids: numpy.ndarray) -> numpy.ndarray:
+        """
+        Get the agent action masks (-infinity masked out actions, 1.0 available actions) at a batch of states.
+
+        Since agent actions are positions, these are the position masks of the states.
+
+        :param logger: the logger used to print the interface information, warnings and errors
+        :param session: the session of tensorflow currently running, if any
+        :param state_ids: the (N,) array of the ids of the states, in which the agent player is playing
+        :return: the (N, 9) array of the action masks
+        """
+        position_masks: numpy.ndarray = STATE_POSITION_ACTION_MASKS[state_ids]
+        # Map the position masks to the canonical form of the states, if required
+        if self._canonical:
+            return numpy.take_along_axis(position_masks, BOARD_PERMUTATIONS[STATE_TRANSFORMS[state_ids]], axis=1)
+        return position_masks
+
+    def agent_actions_to_environment_actions(self,
+                                             logger: logging.Logger,
+                                             session,
+                                             agent_actions: numpy.ndarray,
+                                             state_ids: numpy.ndarray) -> numpy.ndarray:
+        """
+        Translate a batch of agent actions to a batch of environment actions.
+
+        Since agent actions are positions, they are played by the agent player.
+
+        :param logger: the logger used to print the interface information, warnings and errors
+        :param session: the session of tensorflow currently running, if any
+        :param agent_actions: the (N,) array of the agent actions
+        :param state_ids: the (N,) array of the ids of the states at which the actions are taken by the agent player
+        :return: the (N,) array of the environment actions
+        """
+        # Map the positions back from the canonical form of the states, if required
+        if self._canonical:
+            agent_actions = BOARD_PERMUTATIONS[STATE_TRANSFORMS[state_ids], agent_actions]
+        # Play the positions with the agent player
+        return 2 * agent_actions + self._agent_player_offset
+
+    def environment_actions_to_agent_actions(self,
+                                             logger: logging.Logger,
+                                             session,
+                                             environment_actions: numpy.ndarray,
+                                             state_ids: numpy.ndarray) -> numpy.ndarray:
+        """
+        Translate a batch of environment actions to a batch of agent actions.
+
+        Since agent actions are positions, these are the positions of the environment actions.
+
+        :param logger: the logger used to print the interface information, warnings and errors
+        :param session: the session of tensorflow currently running, if any
+        :param environment_actions: the (N,) array of the environment actions
+        :param state_ids: the (N,) array of the ids of the states at which the actions are taken by the agent player
+        :return: the (N,) array of the agent actions
+        """
+        # Map the positions to the canonical form of the states, if required
+        if self._canonical:
+            return INVERSE_BOARD_PERMUTATIONS[STATE_TRANSFORMS[state_ids], environment_actions // 2]
+        # Just return the positions of the environment actions
+        return environment_actions // 2
+
+    @property
+    def agent_action_space_type(self) -> SpaceType:
+        # The agent actions are discrete positions
+        return SpaceType.discrete
+
+    @property
+    def agent_action_space_shape(self):
+        # The agent actions are the positions of the board
+        return 9,
@@ -0,0 +1,87 @@
+#
+# Copyright (C) 2019 Luca Pasqualini
+# University of Siena - Artificial Intelligence Laboratory - SAILab
+#
+#
+# TicTacToeRL project is licensed under a BSD 3-Clause.
+#
+# You should have received a copy of the license along with this
+# work. If not, see <https://opensource.org/licenses/BSD-3-Clause>.
+
+# Import packages
+
+import logging
+import numpy
+
+# Import usienarl
+
+from usienarl import Config, SpaceType
+from usienarl.td_models import DuelingDeepQLearning
+from usienarl.td_models.dueling_deep_q_learning import Estimator
+
+
+class TicTacToeDuelingDeepQLearning(DuelingDeepQLearning):
+    """
+    Dueling Double Deep Q-Learning model exposing its main network and the configuration of its networks, used by the
+    Tic Tac Toe agents to predict batches of observations and to define copies of the main network.
+
+    The main network is checked when the model is generated, so that a change of the base model fails the generation
+    with a clear error instead of breaking the agent while acting.
+    """
+
+    def __init__(self,
+                 name: str,
+                 learning_rate: float, discount_factor: float,
+                 buffer_capacity: int,
+                 minimum_sample_probability: float, random_sample_trade_off: float,
+                 importance_sampling_value: float, importance_sampling_value_increment: float,
+                 hidden_layers_config: Config,
+                 error_clipping: bool = True):
+        # Define the configuration of the networks
+        self.hidden_layers_config: Config = hidden_layers_config
+        self.error_clipping: bool = error_clipping
+        # Generate the base model
+        super(TicTacToeDuelingDeepQLearning, self).__init__(name,
+                                                            learning_rate, discount_factor,
+                                                            buffer_capacity,
+                                                            minimum_sample_probability, random_sample_trade_off,
+                                                            importance_sampling_value, importance_sampling_value_increment,
+                                                            hidden_layers_config, error_clipping)
+
+    def generate(self,
+                 logger: logging.Logger,
+                 scope: str,
+                 observation_space_type: SpaceType, observation_space_shape,
+                 agent_action_space_type: SpaceType, agent_action_space_shape) -> bool:
+        # Generate the base model and check if it's successful, stop if not successful
+        if not super(TicTacToeDuelingDeepQLearning, self).generate(logger, scope,
+                                                                   observation_space_type, observation_space_shape,
+                                                                   agent_action_space_type, agent_action_space_shape):
+            return False
+        # Check that the base model defined its main network as expected
+        main_network = getattr(self, "_main_network", None)
+        if not isinstance(main_network, Estimator) or not all(hasattr(main_network, attribute) for attribute in ("inputs", "mask", "outputs", "weight_parameters")):
+            logger.error("Error during generation of model: the main network estimator of the base model is not available")
+            return False
+        return True
+
+    def get_all_action_values_batch(self,
+                                    session,
+                                    observations_current,
+                                    masks) -> numpy.ndarray:
+        """
+        Get all the actions values according to the model at each of the given current observations, in a single forward pass.
+
+        :param session: the session of tensorflow currently running
+        :param observations_current: the (N, *observation_space_shape) batch of the current observations
+        :param masks: the (N, *agent_action_space_shape) batch of the masks of each observation (-infinity to remove, 1.0 to pass-through)
+        :return: the (N, *agent_action_space_shape) array of the action values
+        """
+        return session.run(self.main_network.outputs, feed_dict={self.main_network.inputs: observations_current, self.main_network.mask: masks})
+
+    @property
+    def main_network(self) -> Estimator:
+        """
+        The estimator of the main network, defined when the model is generated.
+        """
+        return self._main_network
@@ -0,0 +1,100 @@
+#
+# Copyright (C) 2019 Luca Pasqualini
+# University of Siena - Artificial Intelligence Laboratory - SAILab
+#
+#
+# TicTacToeRL project is licensed under a BSD 3-Clause.
+#
+# You should have received a copy of the license along with this
+# work. If not, see <https://opensource.org/licenses/BSD-3-Clause>.
+
+# Import packages
+
+import numpy
+
+# Import required src
+
+from src.tictactoe_state_index import STATE_BOARDS, STATE_OBSERVATIONS, _read_only
+from src.tictactoe_symmetry import STATE_TRANSFORMS, BOARD_PERMUTATIONS
+
+# Define the observation encodings of all the reachable states
+# Note: each encoding is a read-only table of shape (2, STATES, ...) indexed by the offset of the observing player (0 for
+# O, 1 for X) and by the state id, so that an observation is a row view of the table and a batch of observations is a
+# gather of its rows. Encodings not depending on the observing player share the same rows for both offsets.
+#   - signed: 1 for X cells, -1 for O cells, 0 for empty cells (the default observation of the environments)
+#   - planes2: the one-hot plane of the X cells followed by the one-hot plane of the O cells
+#   - planes3: the one-hot planes of the empty cells, of the X cells and of the O cells
+#   - relative: 1 for the cells of the observing player, -1 for the cells of its opponent, 0 for empty cells
+#   - canonical: the relative encoding of the canonical form of the state (see the symmetry tables)
+
+
+def _player_independent(table: numpy.ndarray) -> numpy.ndarray:
+    """
+    Make an encoding table of shape (STATES, ...) not depending on the observing player, without copying it.
+
+    :param table: the table of the encoding of each state
+    :return: a read-only view of shape (2, STATES, ...) of the table
+    """
+    return numpy.broadcast_to(table, (2, *table.shape))
+
+
+def _generate_planes(boards: numpy.ndarray,
+                     values: []) -> numpy.ndarray:
+    """
+    Generate the one-hot planes of the given boards, one plane for each of the given cell values.
+
+    :param boards: the (STATES, 9) array of the boards of all the states
+    :param values: the list of the cell values of each plane
+    :return: a (STATES, 9 * len(values)) array with the concatenated planes of each state
+    """
+    return numpy.concatenate([(boards == value).astype(numpy.int8) for value in values], axis=1)
+
+
+STATE_RELATIVE_BOARDS: numpy.ndarray = _read_only(numpy.stack([-STATE_BOARDS, STATE_BOARDS]))
+STATE_CANONICAL_RELATIVE_BOARDS: numpy.ndarray = _read_only(numpy.take_along_axis(STATE_RELATIVE_BOARDS, BOARD_PERMUTATIONS[STATE_TRANSFORMS][numpy.newaxis], axis=2))
+
+ENCODINGS: {} = {
+    "signed": _player_independent(STATE_OBSERVATIONS),
+    "planes2": _player_independent(_read_only(_generate_planes(STATE_BOARDS, [1, -1]))),
+    "planes3": _player_independent(_read_only(_generate_planes(STATE_BOARDS, [0, 1, -1]))),
+    "relative": STATE_RELATIVE_BOARDS,
+    "canonical": STATE_CANONICAL_RELATIVE_BOARDS
+}
+
+
+def get_encoding_shape(encoding: str):
+    """
+    Get the shape of the observations of the given encoding.
+
+    :param encoding: the name of the encoding
+    :return: the shape of one observation
+    """
+    return ENCODINGS[encoding].shape[2:]
+
+
+def get_observation(encoding: str,
+                    state_id: int,
+                    player_offset: int) -> numpy.ndarray:
+    """
+    Get the observation of the given state with the given encoding, as a read-only view (no array is allocated).
+
+    :param encoding: the name of the encoding
+    :param state_id: the id of the state
+    :param player_offset: the offset of the observing player (0 for O, 1 for X)
+    :return: the read-only observation of the state
+    """
+    return ENCODINGS[encoding][player_offset, state_id]
+
+
+def get_observations(encoding: str,
+                     state_ids: numpy.ndarray,
+                     player_offset: int) -> numpy.ndarray:
+    """
+    Get the observations of the given states with the given encoding, gathering the rows of the encoding table.
+
+    :param encoding: the name of the encoding
+    :param state_ids: an array of shape (N,) with the id of each state
+    :param player_offset: the offset of the observing player (0 for O, 1 for X)
+    :return: an array of shape (N, ...) with the observation of each state
+    """
+    return ENCODINGS[encoding][player_offset].take(state_ids, axis=0)
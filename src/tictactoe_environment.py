@@ -13,14 +13,18 @@
 import logging
 import numpy
 import random
-import time
 import enum
-import copy
 import math
 
 # Import usienarl
 
-from usienarl import Environment, SpaceType
+from usienarl import SpaceType
+
+# Import required src
+
+from src.tictactoe_tables import FINAL_STATES, WINNERS, ACTION_CODE_INCREMENTS
+from src.tictactoe_state_index import STATE_IDS, STATE_OBSERVATIONS
+from src.tictactoe_observable_environment import ObservableTicTacToeEnvironment
 
 
 # Define player type class
@@ -31,7 +35,12 @@ class Player(enum.Enum):
     none = 0
 
 
-class TicTacToeEnvironment(Environment):
+# Define the table of (final flag, winner) of each board code
+
+FINAL_STATE_TABLE: [] = [(bool(final), Player(int(winner))) for final, winner in zip(FINAL_STATES, WINNERS)]
+
+
+class TicTacToeEnvironment(ObservableTicTacToeEnvironment):
     """
     Tic-Tac-Toe abstract environment.
 
@@ -47,6 +56,9 @@ class TicTacToeEnvironment(Environment):
         - 5 => O in 2
         - 2n => X in n
         - 2n+1 => O in n
+
+    The board before each move of the environment player (the intermediate state) is saved and rendered as described in
+    the observable environment.
     """
 
     def __init__(self,
@@ -70,10 +82,21 @@ class TicTacToeEnvironment(Environment):
         # Define internal attributes
         self._move: int = 0
         self._episode_done: bool = False
+        self._state_code: int = 0
+        # Define the action masks and the possible actions of each player, updated at each move
+        # Note: the mask of the none player is never updated and it has no possible actions
+        self._action_masks: {} = {player: -math.inf * numpy.ones(self.action_space_shape, dtype=float) for player in Player}
+        self._action_mask_views: {} = {player: self._action_masks[player].view() for player in Player}
+        for action_mask_view in self._action_mask_views.values():
+            action_mask_view.flags.writeable = False
+        self._possible_actions: {} = {player: [] for player in Player}
+        # Define the position mask and the possible positions, shared by both players and updated at each move
+        self._position_mask: numpy.ndarray = -math.inf * numpy.ones(9, dtype=float)
+        self._position_mask_view: numpy.ndarray = self._position_mask.view()
+        self._position_mask_view.flags.writeable = False
+        self._possible_positions: [] = []
         # Define internal empty attributes
         self._state: numpy.ndarray = None
-        self._intermediate_state: numpy.ndarray = None
-        self._flipped_state: numpy.ndarray = None
         # Generate the base environment
         super(TicTacToeEnvironment, self).__init__(name)
 
@@ -87,11 +110,6 @@ class TicTacToeEnvironment(Environment):
                    session):
         pass
 
-    def close(self,
-              logger: logging.Logger,
-              session):
-        pass
-
     def reset(self,
               logger: logging.Logger,
               session):
@@ -102,8 +120,17 @@ class TicTacToeEnvironment(Environment):
         self._move: int = 0
         self._episode_done = False
         # Reset state
+        self._state_code = 0
         self._state = numpy.array([Player.none, Player.none, Player.none, Player.none, Player.none, Player.none, Player.none, Player.none, Player.none])
-        self._flipped_state = self._state.copy()
+        # Reset action masks and possible actions: every position is available
+        self._action_masks[Player.o][0::2] = 1.0
+        self._action_masks[Player.o][1::2] = -math.inf
+        self._action_masks[Player.x][0::2] = -math.inf
+        self._action_masks[Player.x][1::2] = 1.0
+        self._possible_actions[Player.o] = list(range(0, 9 * 2, 2))
+        self._possible_actions[Player.x] = list(range(1, 9 * 2, 2))
+        self._position_mask[:] = 1.0
+        self._possible_positions = list(range(9))
         # Choose a random starting player
         self.current_player = Player.o
         if random.uniform(0, 1) <= 0.5:
@@ -112,28 +139,13 @@ class TicTacToeEnvironment(Environment):
         if self.current_player == self.environment_player:
             # Increase move count
             self._move += 1
-            # Save the current representation of the board for rendering purpose
-            self._intermediate_state = copy.deepcopy(self._state)
-            # Get the environment player action
-            environment_player_action: int = self.get_environment_player_first_action(logger, session)
-            position, player = divmod(environment_player_action, 2)
-            # Set the player to its defined value and update the state
-            if player == 0:
-                player = Player.o
-                flipped_player = Player.x
-            else:
-                player = Player.x
-                flipped_player = Player.o
-            self._state[position] = player
-            self._flipped_state[position] = flipped_player
-            # Update the last player and current player
-            self.last_player = self.current_player
-            if self.current_player == Player.x:
-                self.current_player = Player.o
-            else:
-                self.current_player = Player.x
+            # Save the current representation of the board for rendering purpose, if required
+            if self._intermediate_state_required:
+                self._save_intermediate_state(logger)
+            # Get the environment player action and update the state
+            self._apply_action(self.get_environment_player_first_action(logger, session))
         # Return the first state encoded
-        return self._encode_state_int(self._state)
+        return self._encode_current_state()
 
     def step(self,
              logger: logging.Logger,
@@ -142,52 +154,22 @@ class TicTacToeEnvironment(Environment):
         # Increase move count
         self._move += 1
         # Change the state with the given action
-        position, player = divmod(action, 2)
-        # Set the player to its defined value and update the state
-        if player == 0:
-            player = Player.o
-            flipped_player = Player.x
-        else:
-            player = Player.x
-            flipped_player = Player.o
-        self._state[position] = player
-        self._flipped_state[position] = flipped_player
-        # Update the last player and current player
-        self.last_player = self.current_player
-        if self.current_player == Player.x:
-            self.current_player = Player.o
-        else:
-            self.current_player = Player.x
+        self._apply_action(action)
         # Reset the current intermediate state
         self._intermediate_state = None
         # Check for winner and episode completion flag
-        self._episode_done, self.winner = self._check_if_final(self._state)
+        self._episode_done, self.winner = self._check_if_final_current()
         # If the current player is the environment player, let it decide how to play
         if not self._episode_done and self.current_player == self.environment_player:
             # Increase move count
             self._move += 1
-            # Save the current representation of the board for rendering purpose
-            self._intermediate_state = copy.deepcopy(self._state)
-            # Get the environment player action
-            environment_player_action: int = self.get_environment_player_action(logger, session)
-            position, player = divmod(environment_player_action, 2)
-            # Set the player to its defined value and update the state
-            if player == 0:
-                player = Player.o
-                flipped_player = Player.x
-            else:
-                player = Player.x
-                flipped_player = Player.o
-            self._state[position] = player
-            self._flipped_state[position] = flipped_player
-            # Update the last player and current player
-            self.last_player = self.current_player
-            if self.current_player == Player.x:
-                self.current_player = Player.o
-            else:
-                self.current_player = Player.x
+            # Save the current representation of the board for rendering purpose, if required
+            if self._intermediate_state_required:
+                self._save_intermediate_state(logger)
+            # Get the environment player action and update the state
+            self._apply_action(self.get_environment_player_action(logger, session))
             # Check for winner and episode completion flag
-            self._episode_done, self.winner = self._check_if_final(self._state)
+            self._episode_done, self.winner = self._check_if_final_current()
         # Assign rewards
         reward: float = 0.0
         if self._episode_done:
@@ -198,31 +180,7 @@ class TicTacToeEnvironment(Environment):
             else:
                 reward = self.draw_reward
         # Return the encoded state, the reward and the episode completion flag
-        return self._encode_state_int(self._state), reward, self._episode_done
-
-    def render(self,
-               logger: logging.Logger,
-               session):
-        # Print the intermediate board, if any
-        if self._intermediate_state is not None:
-            self._print_board(self._intermediate_state)
-            # Print separator
-            print("_________")
-            time.sleep(1.0)
-        # Print the current state
-        self._print_board(self._state)
-        # Print separator
-        print("_________")
-        # Print end of episode footer and results
-        if self._episode_done:
-            print("MATCH END")
-            print("Played moves: " + str(self._move))
-            if self.winner != Player.none:
-                print("Winner player is " + ("X" if self.winner == Player.x else "O"))
-            else:
-                print("There is no winner: it's a draw!")
-            print("_________")
-        time.sleep(1.0)
+        return self._encode_current_state(), reward, self._episode_done
 
     def get_random_action(self,
                           logger: logging.Logger,
@@ -230,6 +188,13 @@ class TicTacToeEnvironment(Environment):
         # Choose a random action in the currently possible actions
         return random.choice(self.get_possible_actions(logger, session))
 
+    @property
+    def state_id(self) -> int:
+        """
+        The id of the current state in the state index, updated after each reset and step.
+        """
+        return int(STATE_IDS[self._state_code])
+
     @property
     def state_space_type(self):
         return SpaceType.continuous
@@ -252,22 +217,13 @@ class TicTacToeEnvironment(Environment):
         """
         Return all the possible action at the current state in the environment wrapped in a numpy array mask.
 
+        The mask is a read-only view updated by the environment at each move: copy it to keep it across moves.
+
         :param logger: the logger used to print the environment information, warnings and errors
         :param session: the session of tensorflow currently running, if any
         :return: an array of -infinity (for unavailable actions) and 1.0 (for available actions)
         """
-        # Get all the possible action mask according to current board state
-        mask: numpy.ndarray = -math.inf * numpy.ones(self.action_space_shape, dtype=float)
-        for action in range(*self.action_space_shape):
-            position, player = divmod(action, 2)
-            # Set the player to its defined value
-            if player == 0:
-                player = Player.o
-            else:
-                player = Player.x
-            if self._state[position] == Player.none and player == self.current_player:
-                mask[action] = 1.0
-        return mask
+        return self._action_mask_views[self.current_player]
 
     def get_possible_actions(self,
                              logger: logging.Logger,
@@ -275,100 +231,93 @@ class TicTacToeEnvironment(Environment):
         """
         Return a list of the indices of all the possible actions at the current state of the environment.
 
+        The list is updated by the environment at each move and it must not be modified: copy it to keep it across moves.
+
         :param logger: the logger used to print the environment information, warnings and errors
         :param session: the session of tensorflow currently running, if any
         :return: a list of indices containing the possible actions
         """
-        # Get the mask
-        mask: numpy.ndarray = self.get_action_mask(logger, session)
-        # Return the list of possible actions from the mask indices
-        return numpy.where(mask > 0.0)[0].tolist()
+        return self._possible_actions[self.current_player]
 
-    @staticmethod
-    def _check_if_final(state: numpy.ndarray):
+    def get_position_mask(self,
+                          logger: logging.Logger,
+                          session) -> numpy.ndarray:
+        """
+        Return all the empty positions at the current state in the environment wrapped in a numpy array mask.
+
+        The mask is a read-only view updated by the environment at each move: copy it to keep it across moves.
+
+        :param logger: the logger used to print the environment information, warnings and errors
+        :param session: the session of tensorflow currently running, if any
+        :return: an array of 9 values, -infinity (for occupied positions) and 1.0 (for empty positions)
+        """
+        return self._position_mask_view
+
+    def get_possible_positions(self,
+                               logger: logging.Logger,
+                               session) -> []:
+        """
+        Return a list of all the empty positions at the current state of the environment.
+
+        The list is updated by the environment at each move and it must not be modified: copy it to keep it across moves.
+
+        :param logger: the logger used to print the environment information, warnings and errors
+        :param session: the session of tensorflow currently running, if any
+        :return: a list of the empty positions
+        """
+        return self._possible_positions
+
+    def _apply_action(self,
+                      action: int):
+        """
+        Apply the given action to the board and pass the turn to the other player.
+
+        :param action: the action to apply
+        """
+        position, player = divmod(action, 2)
+        # Set the player to its defined value and update the state and its code
+        self._state_code += ACTION_CODE_INCREMENTS[action]
+        if player == 0:
+            self._state[position] = Player.o
+        else:
+            self._state[position] = Player.x
+        # Remove the position from the action masks, the possible actions of both players and the possible positions
+        self._action_masks[Player.o][2 * position] = -math.inf
+        self._action_masks[Player.x][2 * position + 1] = -math.inf
+        self._possible_actions[Player.o].remove(2 * position)
+        self._possible_actions[Player.x].remove(2 * position + 1)
+        self._position_mask[position] = -math.inf
+        self._possible_positions.remove(position)
+        # Update the last player and current player
+        self.last_player = self.current_player
+        if self.current_player == Player.x:
+            self.current_player = Player.o
+        else:
+            self.current_player = Player.x
+
+    def _check_if_final_current(self):
         """
-        Check if the given state is final and also return the winner.
+        Check if the current state is final and also return the winner.
 
         :return: True if final, False otherwise and the winner
         """
-        # Check if state is final and compute winner
-        winner: Player = Player.none
-        episode_done: bool = False
-        if state[0] != Player.none and state[0] == state[1] == state[2]:
-            episode_done = True
-            winner = state[0]
-        if state[0] != Player.none and state[0] == state[3] == state[6]:
-            episode_done = True
-            winner = state[0]
-        if state[0] != Player.none and state[0] == state[4] == state[8]:
-            episode_done = True
-            winner = state[0]
-        if state[2] != Player.none and state[2] == state[5] == state[8]:
-            episode_done = True
-            winner = state[2]
-        if state[2] != Player.none and state[2] == state[4] == state[6]:
-            episode_done = True
-            winner = state[2]
-        if state[1] != Player.none and state[1] == state[4] == state[7]:
-            episode_done = True
-            winner = state[1]
-        if state[3] != Player.none and state[3] == state[4] == state[5]:
-            episode_done = True
-            winner = state[3]
-        if state[6] != Player.none and state[6] == state[7] == state[8]:
-            episode_done = True
-            winner = state[6]
-        # Check for draw: no empty element in the board and no winner
-        if winner == Player.none:
-            empty_found: bool = False
-            for element in state:
-                if element == Player.none:
-                    empty_found = True
-                    break
-            if not empty_found:
-                episode_done = True
-        # Return completion flag and winner
-        return episode_done, winner
-
-    @staticmethod
-    def _print_board(state: numpy.ndarray):
+        return FINAL_STATE_TABLE[self._state_code]
+
+    def _encode_current_state(self) -> numpy.ndarray:
         """
-        Print the given state of the board.
+        Encode the current state of the board with an integer sequence.
+
+        :return: the encoded current state, as a read-only row of the state index observations
         """
-        # Get all the rows in the board state
-        first_row: [] = []
-        second_row: [] = []
-        third_row: [] = []
-        for i in range(state.size):
-            # Convert the state to its graphical representation
-            graphical_element: str = "-"
-            if state[i] == Player.x:
-                graphical_element = "X"
-            elif state[i] == Player.o:
-                graphical_element = "O"
-            if i < 3:
-                first_row.append(graphical_element)
-            elif 3 <= i < 6:
-                second_row.append(graphical_element)
-            else:
-                third_row.append(graphical_element)
-        # Print each row
-        print(' '.join(first_row))
-        print(' '.join(second_row))
-        print(' '.join(third_row))
-
-    @staticmethod
-    def _encode_state_int(state: numpy.ndarray):
+        return STATE_OBSERVATIONS[STATE_IDS[self._state_code]]
+
+    def _get_state(self) -> numpy.ndarray:
         """
-        Encode the given state of the board (expressed in player occupied cells) with an integer sequence.
+        Get the current state of the board expressed in player occupied cells.
 
-        :param state: the state to encode
-        :return: the encoded state
+        :return: the current state as an array of players
         """
-        encoded_state: numpy.ndarray = numpy.zeros(state.size, dtype=int)
-        for i in range(state.size):
-            encoded_state[i] = state[i].value
-        return encoded_state
+        return self._state
 
     def get_environment_player_first_action(self,
                                             logger: logging.Logger,
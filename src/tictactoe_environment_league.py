@@ -0,0 +1,152 @@
+#
+# Copyright (C) 2019 Luca Pasqualini
+# University of Siena - Artificial Intelligence Laboratory - SAILab
+#
+#
+# TicTacToeRL project is licensed under a BSD 3-Clause.
+#
+# You should have received a copy of the license along with this
+# work. If not, see <https://opensource.org/licenses/BSD-3-Clause>.
+
+# Import packages
+
+import tensorflow
+import logging
+import numpy
+import collections
+import glob
+import os
+
+# Import src
+
+from src.tictactoe_environment import TicTacToeEnvironment, Player
+from src.tictactoe_random_stream import RandomStream
+from src.tictactoe_policy_table import compile_opponent_policy
+
+
+class TicTacToeEnvironmentLeague(TicTacToeEnvironment):
+    """
+    Tic-Tac-Toe environment in which the environment player is sampled, at each episode, from a league of agents saved
+    in the metagraph folders matching the given pattern. The pattern is matched recursively ("**" matches any number of
+    folders), so that the default pattern finds both the single iteration experiments, saved at
+    experiments/<script>_<date>/<experiment>/metagraph, and the multiple iterations experiments, saved at
+    experiments/<script>_<date>/<experiment>/<iteration>/metagraph.
+
+    Each saved agent is loaded lazily the first time it is sampled, in its own graph and session, and compiled into a
+    table of its greedy actions at each state: then its graph and session are released. At most the given number of
+    compiled agents are kept, discarding the least recently used. Agents which cannot be loaded play randomly.
+    """
+
+    def __init__(self,
+                 name: str,
+                 environment_player: Player,
+                 agent_player_win_reward: float,
+                 environment_player_win_reward: float,
+                 draw_reward: float,
+                 metagraph_pattern: str = os.path.join("experiments", "**", "metagraph"),
+                 league_size_max: int = 8,
+                 seed: int = None):
+        # Define environment attributes
+        self.metagraph_paths: [] = sorted(glob.glob(metagraph_pattern, recursive=True))
+        self.league_size_max: int = league_size_max
+        self.current_metagraph_path: str = None
+        self.loaded_agents: int = 0
+        # Define internal environment attributes
+        self._random_stream: RandomStream = RandomStream(seed)
+        self._policies: collections.OrderedDict = collections.OrderedDict()
+        self._policy: numpy.ndarray = None
+        # Generate the base tic tac toe environment
+        super(TicTacToeEnvironmentLeague, self).__init__(name, environment_player, agent_player_win_reward, environment_player_win_reward, draw_reward)
+
+    def setup(self,
+              logger: logging.Logger) -> bool:
+        # The environment setup is successful only if there is at least one saved agent
+        if len(self.metagraph_paths) == 0:
+            logger.error("No saved agent found for the league")
+            return False
+        logger.info("League of " + str(len(self.metagraph_paths)) + " saved agents")
+        return True
+
+    def reset(self,
+              logger: logging.Logger,
+              session):
+        # Sample the environment player of the episode from the league
+        self.current_metagraph_path = self.metagraph_paths[self._random_stream.integer(len(self.metagraph_paths))]
+        self._policy = self._get_policy(logger, self.current_metagraph_path)
+        # Reset the base tic tac toe environment
+        return super(TicTacToeEnvironmentLeague, self).reset(logger, session)
+
+    def get_environment_player_first_action(self,
+                                            logger: logging.Logger,
+                                            session) -> int:
+        # Just return a random action
+        return self.get_random_action(logger, session)
+
+    def get_environment_player_action(self,
+                                      logger: logging.Logger,
+                                      session) -> int:
+        # Play randomly if the agent could not be loaded, otherwise look up its action at the current state
+        if self._policy is None:
+            return self.get_random_action(logger, session)
+        return int(self._policy[self.state_id])
+
+    def _get_policy(self,
+                    logger: logging.Logger,
+                    metagraph_path: str) -> numpy.ndarray:
+        """
+        Get the compiled policy of the agent saved at the given path, loading it if not in the league cache.
+
+        :param logger: the logger used to print the environment information, warnings and errors
+        :param metagraph_path: the path of the metagraph folder of the saved agent
+        :return: the table of the actions of the agent at each state id, None if the agent cannot be loaded
+        """
+        if metagraph_path in self._policies:
+            self._policies.move_to_end(metagraph_path)
+            return self._policies[metagraph_path]
+        policy: numpy.ndarray = self._load_policy(logger, metagraph_path)
+        self._policies[metagraph_path] = policy
+        # Discard the least recently used policy if the cache is full
+        if len(self._policies) > self.league_size_max:
+            self._policies.popitem(last=False)
+        return policy
+
+    def _load_policy(self,
+                     logger: logging.Logger,
+                     metagraph_path: str) -> numpy.ndarray:
+        """
+        Load the agent saved at the given path in its own graph and session and compile its policy.
+
+        :param logger: the logger used to print the environment information, warnings and errors
+        :param metagraph_path: the path of the metagraph folder of the saved agent
+        :return: the table of the actions of the agent at each state id, None if the agent cannot be loaded
+        """
+        meta_paths: [] = glob.glob(os.path.join(metagraph_path, "*.meta"))
+        checkpoint_path: str = tensorflow.train.latest_checkpoint(metagraph_path)
+        if len(meta_paths) == 0 or checkpoint_path is None:
+            logger.error("No saved agent can be accessed at " + metagraph_path + ", it will play randomly")
+            return None
+        graph = tensorflow.Graph()
+        with graph.as_default():
+            try:
+                saver = tensorflow.train.import_meta_graph(meta_paths[0])
+                with tensorflow.Session(graph=graph) as session:
+                    saver.restore(session, checkpoint_path)
+                    # Find the main network of the agent by the name of its inputs
+                    # Note: the q-values are the value plus the centered advantage (named outputs) of the dueling network
+                    inputs_name: str = [operation.name for operation in graph.get_operations() if operation.name.endswith("/MainNetwork/inputs")][0]
+                    scope: str = inputs_name[:-len("inputs")]
+                    inputs = graph.get_tensor_by_name(inputs_name + ":0")
+                    values = graph.get_tensor_by_name(scope + "value/BiasAdd:0")
+                    advantages = graph.get_tensor_by_name(scope + "outputs:0")
+
+                    def q_values_function(observations: numpy.ndarray, masks: numpy.ndarray) -> numpy.ndarray:
+                        state_values, centered_advantages = session.run([values, advantages], feed_dict={inputs: observations})
+                        return state_values + centered_advantages + masks
+
+                    policy: numpy.ndarray = compile_opponent_policy(q_values_function, self.environment_player)
+            except (IndexError, KeyError, ValueError, tensorflow.errors.OpError) as error:
+                logger.error("Saved agent at " + metagraph_path + " cannot be loaded (" + str(error) + "), it will play randomly")
+                return None
+        self.loaded_agents += 1
+        logger.info("Saved agent at " + metagraph_path + " loaded and compiled in the league")
+        return policy
@@ -0,0 +1,59 @@
+#
+# Copyright (C) 2019 Luca Pasqualini
+# University of Siena - Artificial Intelligence Laboratory - SAILab
+#
+#
+# TicTacToeRL project is licensed under a BSD 3-Clause.
+#
+# You should have received a copy of the license along with this
+# work. If not, see <https://opensource.org/licenses/BSD-3-Clause>.
+
+# Import packages
+
+import logging
+import numpy
+
+# Import src
+
+from src.tictactoe_environment import TicTacToeEnvironment, Player
+from src.tictactoe_minimax import get_optimal_positions
+
+
+class TicTacToeEnvironmentOptimal(TicTacToeEnvironment):
+    """
+    Tic-Tac-Toe environment in which the environment player plays perfectly, following the minimax solution of the game.
+
+    The game is solved once per process (or loaded from the given solution file) and each move is then a table lookup.
+    Ties among optimal positions are broken randomly with a generator seeded by the given seed.
+    """
+
+    def __init__(self,
+                 name: str,
+                 environment_player: Player,
+                 agent_player_win_reward: float,
+                 environment_player_win_reward: float,
+                 draw_reward: float,
+                 seed: int = None,
+                 solution_path: str = None):
+        # Define environment specific attributes
+        self._optimal_positions: numpy.ndarray = get_optimal_positions(solution_path)
+        self._random_generator: numpy.random.Generator = numpy.random.default_rng(seed)
+        # Generate the base tic tac toe environment
+        super(TicTacToeEnvironmentOptimal, self).__init__(name, environment_player, agent_player_win_reward, environment_player_win_reward, draw_reward)
+
+    def get_environment_player_first_action(self,
+                                            logger: logging.Logger,
+                                            session) -> int:
+        return self.get_environment_player_action(logger, session)
+
+    def get_environment_player_action(self,
+                                      logger: logging.Logger,
+                                      session) -> int:
+        # Check if the environment player is the one expected to play
+        if self.current_player != self.environment_player:
+            logger.error("Environment player asked to play when it's not its turn!")
+            return self.get_random_action(logger, session)
+        # Choose randomly among the optimal positions of the environment player at the current state
+        player_offset: int = 1 if self.environment_player == Player.x else 0
+        optimal_positions: numpy.ndarray = numpy.flatnonzero(self._optimal_positions[self.state_id, player_offset])
+        return 2 * int(optimal_positions[self._random_generator.integers(optimal_positions.size)]) + player_offset
@@ -15,29 +15,42 @@ import logging
 # Import src
 
 from src.tictactoe_environment import TicTacToeEnvironment, Player
+from src.tictactoe_state_index import STATE_LEGAL_POSITIONS, STATE_LEGAL_POSITIONS_NUMBER
+from src.tictactoe_random_stream import RandomStream
 
 
 class TicTacToeEnvironmentRandom(TicTacToeEnvironment):
     """
     Tic-Tac-Toe environment in which the environment player plays with a random policy.
+
+    The environment player draws its moves from its own random stream, seeded by the given seed, choosing among the
+    legal positions of the current state.
     """
 
+    # Legal positions of each state id, as lists for fast scalar access
+    _LEGAL_POSITIONS: [] = [positions[:number] for positions, number in zip(STATE_LEGAL_POSITIONS.tolist(), STATE_LEGAL_POSITIONS_NUMBER.tolist())]
+
     def __init__(self,
                  name: str,
                  environment_player: Player,
                  agent_player_win_reward: float,
                  environment_player_win_reward: float,
-                 draw_reward: float):
+                 draw_reward: float,
+                 seed: int = None):
+        # Define environment specific attributes
+        self._random_stream: RandomStream = RandomStream(seed)
         # Generate the base tic tac toe environment
         super(TicTacToeEnvironmentRandom, self).__init__(name, environment_player, agent_player_win_reward, environment_player_win_reward, draw_reward)
 
     def get_environment_player_first_action(self,
                                             logger: logging.Logger,
                                             session) -> int:
-        # Just return a random action
-        return self.get_random_action(logger, session)
+        return self.get_environment_player_action(logger, session)
 
     def get_environment_player_action(self,
                                       logger: logging.Logger,
                                       session) -> int:
-        return self.get_random_action(logger, session)
+        # Choose a random legal position of the current state with the random stream
+        legal_positions: [] = self._LEGAL_POSITIONS[self.state_id]
+        player_offset: int = 1 if self.current_player == Player.x else 0
+        return 2 * legal_positions[self._random_stream.integer(len(legal_positions))] + player_offset
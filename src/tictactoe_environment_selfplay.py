@@ -11,12 +11,16 @@
 # Import packages
 
 import logging
+import numpy
 
 # Import src
 
 from src.tictactoe_environment import TicTacToeEnvironment, Player
+from src.tictactoe_state_index import STATES, STATE_BOARDS, STATE_ACTION_MASKS, STATE_POSITION_ACTION_MASKS
+from src.tictactoe_symmetry import CANONICAL_STATES, STATE_CANONICAL_IDS, STATE_TRANSFORMS, BOARD_PERMUTATIONS, INVERSE_ACTION_PERMUTATIONS
 from src.dddql_tictactoe_agent import DDDQLTicTacToeAgent
 from src.tictactoe_pass_through_interface import TicTacToePassThroughInterface
+from src.tictactoe_compact_interface import TicTacToeCompactInterface
 
 
 class TicTacToeEnvironmentSelfPlay(TicTacToeEnvironment):
@@ -24,6 +28,15 @@ class TicTacToeEnvironmentSelfPlay(TicTacToeEnvironment):
     Tic-Tac-Toe environment in which the environment player is the same agent.
 
     Then environment player sees the state as the inverse of the real state since it was trained to be the agent player.
+    The flipped observation is written in a preallocated buffer and the agent chooses among the actions of the agent
+    player, so the state of the environment is never changed to let the agent play.
+
+    The action of the environment player at each state is cached, and the cache is cleared each time the weights of the
+    agent change. If canonical, the agent plays on the canonical form of each state and the cache is keyed by canonical
+    id, so symmetric states share the same cached action.
+
+    If compact, the agent is expected to use the compact interface (9 position actions), otherwise the pass-through
+    interface (18 actions).
     """
 
     def __init__(self,
@@ -32,12 +45,41 @@ class TicTacToeEnvironmentSelfPlay(TicTacToeEnvironment):
                  agent_player_win_reward: float,
                  environment_player_win_reward: float,
                  draw_reward: float,
-                 agent: DDDQLTicTacToeAgent):
+                 agent: DDDQLTicTacToeAgent,
+                 canonical: bool = False,
+                 compact: bool = False):
         # Define environment attributes
+        self.canonical: bool = canonical
+        self.compact: bool = compact
+        self.cache_hits: int = 0
+        self.cache_misses: int = 0
         self._agent: DDDQLTicTacToeAgent = agent
-        self._interface: TicTacToePassThroughInterface = TicTacToePassThroughInterface(self)
+        # Define the cache of the environment player actions, -1 for actions not cached yet, and the weights version of the agent it refers to
+        self._action_cache: numpy.ndarray = numpy.full(CANONICAL_STATES if canonical else STATES, -1, dtype=int)
+        self._action_cache_weights_version: int = agent.weights_version
         # Generate the base tic tac toe environment
         super(TicTacToeEnvironmentSelfPlay, self).__init__(name, environment_player, agent_player_win_reward, environment_player_win_reward, draw_reward)
+        # Define the interface used to convert the agent actions, which requires the players to be defined
+        if self.compact:
+            self._interface: TicTacToePassThroughInterface = TicTacToeCompactInterface(self)
+        else:
+            self._interface: TicTacToePassThroughInterface = TicTacToePassThroughInterface(self)
+        # Define the batch of one flipped observation and the batch of one agent player action mask fed to the agent
+        self._flipped_observation: numpy.ndarray = numpy.zeros((1, *self.state_space_shape), dtype=int)
+        self._flipped_action_mask: numpy.ndarray = numpy.zeros((1, *self._interface.agent_action_space_shape), dtype=float)
+
+    def initialize(self,
+                   logger: logging.Logger,
+                   session):
+        # Clear the action cache, since the agent weights are going to be initialized or restored
+        self._clear_action_cache()
+
+    def close(self,
+              logger: logging.Logger,
+              session):
+        # Report the total action cache usage
+        logger.info("Self-play action cache: " + str(self.cache_hits) + " hits, " + str(self.cache_misses) + " misses")
+        super(TicTacToeEnvironmentSelfPlay, self).close(logger, session)
 
     def get_environment_player_first_action(self,
                                             logger: logging.Logger,
@@ -48,34 +90,58 @@ class TicTacToeEnvironmentSelfPlay(TicTacToeEnvironment):
     def get_environment_player_action(self,
                                       logger: logging.Logger,
                                       session) -> int:
-        # Compute the observation for the agent using the pass-through interface on the flipped version of the state
-        observation_current = self._interface.environment_state_to_observation(logger, session, self._encode_state_int(self._flipped_state))
-        # Get the agent action
-        # Give the illusion of playing for the agent player
-        if self.current_player == Player.x:
-            self.current_player = Player.o
+        # Clear the action cache if the agent weights changed since it was filled
+        if self._agent.weights_version != self._action_cache_weights_version:
+            self._clear_action_cache()
+        # Look up the action at the current state in the cache, computing it if not cached yet
+        state_id: int = self.state_id
+        transform: int = STATE_TRANSFORMS[state_id] if self.canonical else 0
+        cache_key: int = STATE_CANONICAL_IDS[state_id] if self.canonical else state_id
+        environment_action: int = self._action_cache[cache_key]
+        if environment_action >= 0:
+            self.cache_hits += 1
         else:
-            self.current_player = Player.x
-        if self.last_player == Player.x:
-            self.last_player = Player.o
-        elif self.last_player == Player.o:
-            self.last_player = Player.x
-        agent_action: int = self._agent.act_inference(logger, session, self._interface, observation_current)
-        # Revert back the environment player
-        if self.current_player == Player.x:
-            self.current_player = Player.o
-        else:
-            self.current_player = Player.x
-        if self.last_player == Player.x:
-            self.last_player = Player.o
-        elif self.last_player == Player.o:
-            self.last_player = Player.x
+            self.cache_misses += 1
+            environment_action = self._compute_environment_player_action(logger, session, state_id, transform)
+            self._action_cache[cache_key] = environment_action
+        # Map the action back from the transformed state, if any
+        return int(INVERSE_ACTION_PERMUTATIONS[transform, environment_action])
+
+    def _compute_environment_player_action(self,
+                                           logger: logging.Logger,
+                                           session,
+                                           state_id: int,
+                                           transform: int) -> int:
+        """
+        Compute the action of the environment player with the agent at the given state transformed by the given transform.
+
+        :param logger: the logger used to print the environment information, warnings and errors
+        :param session: the session of tensorflow currently running, if any
+        :param state_id: the id of the state
+        :param transform: the transform to apply to the state (0 for the identity)
+        :return: the action of the environment player on the transformed state
+        """
+        # Write the flipped version of the transformed state in the observation buffer (both interfaces pass states through)
+        numpy.negative(STATE_BOARDS[state_id, BOARD_PERMUTATIONS[transform]], out=self._flipped_observation[0], casting="unsafe")
+        # Get the agent action on the empty positions, the compact interface plays it with the environment player
+        if self.compact:
+            self._flipped_action_mask[0] = STATE_POSITION_ACTION_MASKS[state_id, BOARD_PERMUTATIONS[transform]]
+            agent_action: int = int(self._agent.act_inference_batch(logger, session, self._flipped_observation, self._flipped_action_mask)[0])
+            return self._interface.agent_action_to_environment_action(logger, session, agent_action)
+        # Get the agent action with the mask of the agent player, as if the agent was playing for the agent player
+        agent_player_offset: int = 1 if self.agent_player == Player.x else 0
+        self._flipped_action_mask[0] = STATE_ACTION_MASKS[state_id, agent_player_offset, INVERSE_ACTION_PERMUTATIONS[transform]]
+        agent_action: int = int(self._agent.act_inference_batch(logger, session, self._flipped_observation, self._flipped_action_mask)[0])
         # Get the environment flipped action using the pass-through interface
         environment_action_flipped: int = self._interface.agent_action_to_environment_action(logger, session, agent_action)
         # Flip back the environment action
         if self.environment_player == Player.x:
-            environment_action: int = environment_action_flipped + 1
-        else:
-            environment_action: int = environment_action_flipped - 1
-        # Return the action
-        return environment_action
+            return environment_action_flipped + 1
+        return environment_action_flipped - 1
+
+    def _clear_action_cache(self):
+        """
+        Clear the action cache, binding it to the current weights version of the agent.
+        """
+        self._action_cache[:] = -1
+        self._action_cache_weights_version = self._agent.weights_version
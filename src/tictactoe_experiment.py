@@ -11,6 +11,7 @@
 # Import packages
 
 import logging
+import time
 
 # Import usienarl
 
@@ -25,6 +26,16 @@ class TicTacToeExperiment(Experiment):
     """
     Tic Tac Toe Experiment which is both validated and passed when the validation average total reward is above
     the given threshold.
+
+    The training steps per second of each training volley are reported, together with the wall-clock time of training
+    (excluding warmup, validation and test) and the training steps required to reach the threshold. If the environment
+    caches its actions (e.g. self-play environments), the action cache hits and misses of each volley are reported too.
+
+    The learner thread of asynchronous agents is stopped at the end of each training volley, so that the agent is saved
+    and validated with fixed weights.
+
+    The environment is closed (e.g. closing its renderer, printing the queued frames and closing the recorded files) at
+    the end of each conducted or watched experiment.
     """
 
     def __init__(self,
@@ -35,9 +46,86 @@ class TicTacToeExperiment(Experiment):
                  interface: Interface):
         # Define benchmark experiment attributes
         self._validation_threshold: float = validation_threshold
+        # Define the training wall-clock time attributes
+        self.training_time: float = 0.0
+        self.training_time_to_threshold: float = None
         # Generate the base experiment
         super(TicTacToeExperiment, self).__init__(name, environment, agent, interface)
 
+    def setup(self,
+              summary_path: str, metagraph_path: str,
+              logger: logging.Logger,
+              iteration: int = -1) -> bool:
+        # Reset the training wall-clock time attributes, since the trained steps are reset by the base experiment
+        self.training_time = 0.0
+        self.training_time_to_threshold = None
+        # Setup the base experiment
+        return super(TicTacToeExperiment, self).setup(summary_path, metagraph_path, logger, iteration)
+
+    def conduct(self,
+                training_episodes_per_volley: int, validation_episodes_per_volley: int,
+                training_episodes_max: int, episode_length_max: int,
+                test_episodes_per_cycle: int, test_cycles: int,
+                logger: logging.Logger,
+                render_during_training: bool = False, render_during_validation: bool = False, render_during_test: bool = False,
+                checkpoint_path: str = None, plot_sample_density: int = 1):
+        # Conduct the experiment and close the environment when it's over
+        try:
+            return super(TicTacToeExperiment, self).conduct(training_episodes_per_volley, validation_episodes_per_volley,
+                                                            training_episodes_max, episode_length_max,
+                                                            test_episodes_per_cycle, test_cycles,
+                                                            logger,
+                                                            render_during_training, render_during_validation, render_during_test,
+                                                            checkpoint_path, plot_sample_density)
+        finally:
+            self._environment.close(logger, None)
+
+    def watch(self,
+              episode_length_max: int,
+              test_episodes_per_cycle: int, test_cycles: int,
+              logger: logging.Logger,
+              checkpoint_path: str,
+              render: bool = True,
+              plot_sample_density: int = 1):
+        # Watch the experiment and close the environment when it's over
+        try:
+            super(TicTacToeExperiment, self).watch(episode_length_max,
+                                                   test_episodes_per_cycle, test_cycles,
+                                                   logger,
+                                                   checkpoint_path,
+                                                   render,
+                                                   plot_sample_density)
+        finally:
+            self._environment.close(logger, None)
+
+    def _train(self,
+               logger: logging.Logger,
+               episodes: int, episode_length: int, episodes_max: int,
+               session,
+               render: bool = False):
+        # Execute the training volley measuring its wall-clock time and steps
+        start_time: float = time.perf_counter()
+        start_steps: int = self._trained_steps
+        # Save the action cache counters of the environment, if it caches its actions (e.g. self-play environments)
+        start_cache_hits: int = getattr(self._environment, "cache_hits", None)
+        start_cache_misses: int = getattr(self._environment, "cache_misses", None)
+        try:
+            volley_rewards: [] = super(TicTacToeExperiment, self)._train(logger, episodes, episode_length, episodes_max, session, render)
+        finally:
+            # Stop the learner thread of the agent, if any
+            stop_learner = getattr(self._agent, "stop_learner", None)
+            if stop_learner is not None:
+                stop_learner(logger)
+        volley_time: float = time.perf_counter() - start_time
+        self.training_time += volley_time
+        # Report the training speed of the volley
+        if volley_time > 0:
+            logger.info("Training speed: " + str(round((self._trained_steps - start_steps) / volley_time, 1)) + " steps/sec")
+        # Report the action cache usage of the volley, if any
+        if start_cache_hits is not None and start_cache_misses is not None:
+            logger.info("Environment action cache: " + str(self._environment.cache_hits - start_cache_hits) + " hits, " + str(self._environment.cache_misses - start_cache_misses) + " misses")
+        return volley_rewards
+
     def _is_validated(self,
                       logger: logging.Logger,
                       last_average_validation_total_reward: float, last_average_validation_scaled_reward: float,
@@ -45,6 +133,10 @@ class TicTacToeExperiment(Experiment):
                       last_validation_volley_rewards: [], last_training_volley_rewards: []) -> bool:
         # Check if average validation reward (score) is over validation threshold
         if last_average_validation_total_reward >= self._validation_threshold:
+            # Report the training wall-clock time required to reach the threshold the first time
+            if self.training_time_to_threshold is None:
+                self.training_time_to_threshold = self.training_time
+                logger.info("Validation threshold reached after " + str(round(self.training_time, 2)) + " seconds of training (" + str(self._trained_steps) + " steps)")
             return True
         return False
 
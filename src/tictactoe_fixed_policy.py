@@ -0,0 +1,65 @@
+#
+# Copyright (C) 2019 Luca Pasqualini
+# University of Siena - Artificial Intelligence Laboratory - SAILab
+#
+#
+# TicTacToeRL project is licensed under a BSD 3-Clause.
+#
+# You should have received a copy of the license along with this
+# work. If not, see <https://opensource.org/licenses/BSD-3-Clause>.
+
+# Import packages
+
+import numpy
+
+# Import required src
+
+from src.tictactoe_tables import WIN_LINES
+from src.tictactoe_state_index import STATES, STATE_BOARDS, STATE_FINAL, _read_only
+
+# Define the fixed policy tables
+# Note: the fixed policy wins if possible, otherwise blocks the other player if possible, otherwise plays randomly.
+# When more positions can win (or block) the lowest one is chosen. Tables are indexed by state id and player offset
+# (0 for O, 1 for X), and hold no winning or blocking positions at final states.
+
+
+def _generate_winning_positions() -> numpy.ndarray:
+    """
+    Generate the table of the empty positions completing a line for each player at each state.
+
+    :return: a (STATES, 2, 9) boolean array, True at each position making the player win
+    """
+    lines: numpy.ndarray = STATE_BOARDS[:, numpy.array(WIN_LINES)]
+    line_sums: numpy.ndarray = lines.sum(axis=2, dtype=int)
+    # The only empty cell of each line is the one completing it
+    empty_cells: numpy.ndarray = numpy.take_along_axis(numpy.array(WIN_LINES)[numpy.newaxis], numpy.argmax(lines == 0, axis=2)[:, :, numpy.newaxis], axis=2)[:, :, 0]
+    winning_positions: numpy.ndarray = numpy.zeros((STATES, 2, 9), dtype=bool)
+    for player_offset, player_value in enumerate((-1, 1)):
+        # A line can be completed if it holds two cells of the player and an empty cell
+        completable_states, completable_lines = numpy.nonzero((line_sums == 2 * player_value) & ~STATE_FINAL[:, numpy.newaxis])
+        winning_positions[completable_states, player_offset, empty_cells[completable_states, completable_lines]] = True
+    return winning_positions
+
+
+STATE_WINNING_POSITIONS: numpy.ndarray = _read_only(_generate_winning_positions())
+# The positions blocking a player are the ones which would make the other player win
+STATE_BLOCKING_POSITIONS: numpy.ndarray = _read_only(STATE_WINNING_POSITIONS[:, ::-1].copy())
+# Position chosen by the fixed policy, -1 when it has to play randomly
+FIXED_POLICY_POSITIONS: numpy.ndarray = numpy.where(STATE_BLOCKING_POSITIONS.any(axis=2), numpy.argmax(STATE_BLOCKING_POSITIONS, axis=2), -1)
+FIXED_POLICY_POSITIONS = numpy.where(STATE_WINNING_POSITIONS.any(axis=2), numpy.argmax(STATE_WINNING_POSITIONS, axis=2), FIXED_POLICY_POSITIONS)
+FIXED_POLICY_POSITIONS = _read_only(FIXED_POLICY_POSITIONS.astype(numpy.int8))
+
+
+def get_fixed_policy_actions(state_ids: numpy.ndarray,
+                             player_offsets,
+                             random_actions: numpy.ndarray) -> numpy.ndarray:
+    """
+    Get the actions of the fixed policy at the given states.
+
+    :param state_ids: an array of shape (N,) with the id of each state
+    :param player_offsets: the offset of the playing player (0 for O, 1 for X) or an array of shape (N,) of offsets
+    :param random_actions: an array of shape (N,) with the actions to play where the fixed policy plays randomly
+    :return: an array of shape (N,) with the action of the fixed policy at each state
+    """
+    positions: numpy.ndarray = FIXED_POLICY_POSITIONS[state_ids, player_offsets]
+    return numpy.where(positions >= 0, 2 * positions.astype(int) + player_offsets, random_actions)
@@ -0,0 +1,98 @@
+#
+# Copyright (C) 2019 Luca Pasqualini
+# University of Siena - Artificial Intelligence Laboratory - SAILab
+#
+#
+# TicTacToeRL project is licensed under a BSD 3-Clause.
+#
+# You should have received a copy of the license along with this
+# work. If not, see <https://opensource.org/licenses/BSD-3-Clause>.
+
+# Import packages
+
+import os
+import numpy
+
+# Import required src
+
+from src.tictactoe_tables import FINAL_STATES, WINNERS
+from src.tictactoe_state_index import STATES, STATE_CODES, _read_only
+from src.tictactoe_symmetry import CANONICAL_CODES
+
+# Define the minimax solution
+# Note: the game is solved with negamax over (board code, player digit) pairs, where the player digit is the code digit
+# of the player to move (1 for X, 2 for O). Scores are given from the point of view of the player to move: a win scores
+# the number of empty cells plus one (so sooner wins score more), a loss the opposite and a draw zero. Scores are
+# memoized in a transposition table keyed by canonical board code, since symmetric boards share the same score.
+
+_optimal_positions: numpy.ndarray = None
+
+
+def _negamax(code: int,
+             player_digit: int,
+             transposition_table: {}) -> int:
+    """
+    Compute the score of the given board for the given player to move, assuming both players play perfectly.
+
+    :param code: the code of the board
+    :param player_digit: the code digit of the player to move (1 for X, 2 for O)
+    :param transposition_table: the dictionary of the scores already computed, keyed by canonical code and player digit
+    :return: the score of the board for the player to move
+    """
+    key: () = (int(CANONICAL_CODES[code]), player_digit)
+    if key in transposition_table:
+        return transposition_table[key]
+    empty_positions: [] = [position for position in range(9) if (code // 3 ** position) % 3 == 0]
+    if FINAL_STATES[code]:
+        # The player to move can only have lost (the other player made the last move) or drawn
+        score: int = -(len(empty_positions) + 1) if WINNERS[code] != 0 else 0
+    else:
+        score: int = max([-_negamax(code + player_digit * 3 ** position, 3 - player_digit, transposition_table) for position in empty_positions])
+    transposition_table[key] = score
+    return score
+
+
+def solve() -> numpy.ndarray:
+    """
+    Solve the game, computing the optimal positions of each player at each state.
+
+    :return: a read-only (STATES, 2, 9) boolean array indexed by state id and player offset (0 for O, 1 for X), True at each optimal position
+    """
+    transposition_table: {} = {}
+    optimal_positions: numpy.ndarray = numpy.zeros((STATES, 2, 9), dtype=bool)
+    for state_id, code in enumerate(STATE_CODES.tolist()):
+        # There are no positions to play at final states
+        if FINAL_STATES[code]:
+            continue
+        for player_offset, player_digit in enumerate((2, 1)):
+            # Score each empty position and keep the ones with the best score
+            scores: numpy.ndarray = numpy.full(9, numpy.iinfo(numpy.int64).min)
+            for position in range(9):
+                if (code // 3 ** position) % 3 == 0:
+                    scores[position] = -_negamax(code + player_digit * 3 ** position, 3 - player_digit, transposition_table)
+            optimal_positions[state_id, player_offset] = scores == scores.max()
+    return _read_only(optimal_positions)
+
+
+def get_optimal_positions(path: str = None) -> numpy.ndarray:
+    """
+    Get the optimal positions of each player at each state, solving the game only once per process.
+
+    If a path is given, the solution is loaded from it when the file exists and the game is not solved yet, otherwise
+    the solution is saved to it, also when it was already computed or loaded by a previous call.
+
+    :param path: the optional path of the numpy file storing the solution
+    :return: a read-only (STATES, 2, 9) boolean array indexed by state id and player offset (0 for O, 1 for X), True at each optimal position
+    """
+    global _optimal_positions
+    path_exists: bool = path is not None and os.path.isfile(path)
+    # Load or compute the solution, if not done yet
+    if _optimal_positions is None:
+        if path_exists:
+            _optimal_positions = _read_only(numpy.load(path))
+        else:
+            _optimal_positions = solve()
+    # Save the solution to the given path, if not already there
+    if path is not None and not path_exists:
+        numpy.save(path, _optimal_positions)
+    return _optimal_positions
@@ -0,0 +1,101 @@
+#
+# Copyright (C) 2019 Luca Pasqualini
+# University of Siena - Artificial Intelligence Laboratory - SAILab
+#
+#
+# TicTacToeRL project is licensed under a BSD 3-Clause.
+#
+# You should have received a copy of the license along with this
+# work. If not, see <https://opensource.org/licenses/BSD-3-Clause>.
+
+# Import packages
+
+import numpy
+
+# Define the m,n,k board utilities
+# Note: an m,n,k board has m rows and n columns, stored as a flat array of m*n cells with 0 for empty cells, 1 for X
+# cells and -1 for O cells. A player wins by occupying k consecutive cells along a row, a column or a diagonal. Since
+# only the last move can complete a line, win detection only checks the 4 lines of 2k-1 cells through the last move.
+
+DIRECTIONS: () = ((0, 1), (1, 0), (1, 1), (1, -1))
+
+
+def generate_line_cells(rows: int,
+                        columns: int,
+                        win_length: int) -> numpy.ndarray:
+    """
+    Generate the table of the cells of the lines through each position, along each direction.
+
+    :param rows: the number of rows of the board
+    :param columns: the number of columns of the board
+    :param win_length: the number of consecutive cells required to win
+    :return: a (rows*columns, 4, 2*win_length-1) array of flat cell indices, with rows*columns for cells outside the board
+    """
+    line_cells: numpy.ndarray = numpy.full((rows * columns, len(DIRECTIONS), 2 * win_length - 1), rows * columns, dtype=numpy.int64)
+    offsets: numpy.ndarray = numpy.arange(-(win_length - 1), win_length)
+    for position in range(rows * columns):
+        row, column = divmod(position, columns)
+        for direction, (row_step, column_step) in enumerate(DIRECTIONS):
+            line_rows: numpy.ndarray = row + offsets * row_step
+            line_columns: numpy.ndarray = column + offsets * column_step
+            inside: numpy.ndarray = (line_rows >= 0) & (line_rows < rows) & (line_columns >= 0) & (line_columns < columns)
+            line_cells[position, direction, inside] = line_rows[inside] * columns + line_columns[inside]
+    return line_cells
+
+
+def is_winning_move(board: numpy.ndarray,
+                    rows: int,
+                    columns: int,
+                    win_length: int,
+                    position: int) -> bool:
+    """
+    Check if the move just played in the given position completed a line of its player.
+
+    It walks at most win_length-1 cells on each side of the position along each direction.
+
+    :param board: the flat board of shape (rows*columns,)
+    :param rows: the number of rows of the board
+    :param columns: the number of columns of the board
+    :param win_length: the number of consecutive cells required to win
+    :param position: the position of the last move
+    :return: True if the last move won, False otherwise
+    """
+    value: int = board[position]
+    row, column = divmod(position, columns)
+    for row_step, column_step in DIRECTIONS:
+        length: int = 1
+        # Count the consecutive cells of the player on both sides of the position
+        for side in (1, -1):
+            line_row, line_column = row + side * row_step, column + side * column_step
+            while length < win_length and 0 <= line_row < rows and 0 <= line_column < columns and board[line_row * columns + line_column] == value:
+                length += 1
+                line_row, line_column = line_row + side * row_step, line_column + side * column_step
+        if length >= win_length:
+            return True
+    return False
+
+
+def get_winning_moves(boards: numpy.ndarray,
+                      board_indices: numpy.ndarray,
+                      positions: numpy.ndarray,
+                      line_cells: numpy.ndarray,
+                      win_length: int) -> numpy.ndarray:
+    """
+    Check, for each of the given boards, if the move just played in the given position completed a line of its player.
+
+    Only the cells of the lines through each position are gathered: they are compared with the player of the move and
+    convolved with a box filter of length win_length, where a window summing to win_length is a complete line.
+
+    :param boards: the (N, rows*columns+1) array of flat boards, with an always empty last cell used by the line cells outside the board
+    :param board_indices: the (M,) array of the indices of the boards to check
+    :param positions: the (M,) array of the positions of the last moves on the boards to check
+    :param line_cells: the table of the cells of the lines through each position, see generate_line_cells
+    :param win_length: the number of consecutive cells required to win
+    :return: a (M,) boolean array, True where the last move won
+    """
+    values: numpy.ndarray = boards[board_indices, positions]
+    owned_cells: numpy.ndarray = boards[board_indices[:, numpy.newaxis, numpy.newaxis], line_cells[positions]] == values[:, numpy.newaxis, numpy.newaxis]
+    # Sum each window of win_length cells along each line with cumulative sums
+    cumulative_cells: numpy.ndarray = numpy.cumsum(owned_cells, axis=2)
+    window_sums: numpy.ndarray = cumulative_cells[:, :, win_length - 1:] - numpy.pad(cumulative_cells, ((0, 0), (0, 0), (1, 0)))[:, :, :-win_length]
+    return numpy.any(window_sums == win_length, axis=(1, 2))
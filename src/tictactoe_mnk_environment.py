@@ -0,0 +1,293 @@
+#
+# Copyright (C) 2019 Luca Pasqualini
+# University of Siena - Artificial Intelligence Laboratory - SAILab
+#
+#
+# TicTacToeRL project is licensed under a BSD 3-Clause.
+#
+# You should have received a copy of the license along with this
+# work. If not, see <https://opensource.org/licenses/BSD-3-Clause>.
+
+# Import packages
+
+import logging
+import numpy
+import math
+
+# Import usienarl
+
+from usienarl import SpaceType
+
+# Import required src
+
+from src.tictactoe_environment import Player
+from src.tictactoe_mnk_board import is_winning_move
+from src.tictactoe_random_stream import RandomStream
+from src.tictactoe_observable_environment import ObservableTicTacToeEnvironment
+
+# Define the table of the player of each cell value
+# Note: the value -1 of the O cells indexes the last element of the table
+
+_CELL_PLAYERS: numpy.ndarray = numpy.array([Player.none, Player.x, Player.o], dtype=object)
+
+
+class MNKTicTacToeEnvironment(ObservableTicTacToeEnvironment):
+    """
+    m,n,k-game abstract environment, generalizing Tic-Tac-Toe (the 3,3,3-game) to a board of the given number of rows
+    and columns, won by the first player occupying the given number of consecutive cells along a line.
+
+    The state is a vector of rows*columns cells, in row-major order, with the same values of the Tic-Tac-Toe
+    environment (0 for empty, 1 for X and -1 for O) and the action 2n is the O player in n, the action 2n+1 is the X
+    player in n.
+
+    Each move costs O(win_length): only the lines through the last move are checked for a win and the board, the
+    action masks and the empty positions are updated in place. The encoded state is a copy of the board.
+
+    The board before each move of the environment player (the intermediate state) is saved and rendered as described in
+    the observable environment, with the boards given to the renderer as (rows, columns) arrays of players.
+    """
+
+    def __init__(self,
+                 name: str,
+                 rows: int,
+                 columns: int,
+                 win_length: int,
+                 environment_player: Player,
+                 agent_player_win_reward: float,
+                 environment_player_win_reward: float,
+                 draw_reward: float,
+                 seed: int = None):
+        # Define attributes
+        self.rows: int = rows
+        self.columns: int = columns
+        self.win_length: int = win_length
+        self.winner: Player = Player.none
+        self.last_player: Player = Player.none
+        self.current_player: Player = Player.none
+        self.environment_player: Player = environment_player
+        if self.environment_player == Player.x:
+            self.agent_player: Player = Player.o
+        else:
+            self.agent_player: Player = Player.x
+        self.agent_player_win_reward: float = agent_player_win_reward
+        self.environment_player_win_reward: float = environment_player_win_reward
+        self.draw_reward: float = draw_reward
+        # Define internal attributes
+        self._cells: int = rows * columns
+        self._move: int = 0
+        self._episode_done: bool = False
+        self._random_stream: RandomStream = RandomStream(seed)
+        self._board: numpy.ndarray = numpy.zeros(self._cells, dtype=int)
+        # Define the empty positions and the index of each position in them, to remove positions in constant time
+        self._empty_positions: [] = []
+        self._empty_position_indices: [] = [0] * self._cells
+        # Define the action masks of each player, updated at each move
+        # Note: the mask of the none player is never updated
+        self._action_masks: {} = {player: -math.inf * numpy.ones(self.action_space_shape, dtype=float) for player in Player}
+        self._action_mask_views: {} = {player: self._action_masks[player].view() for player in Player}
+        for action_mask_view in self._action_mask_views.values():
+            action_mask_view.flags.writeable = False
+        # Generate the base environment
+        super(MNKTicTacToeEnvironment, self).__init__(name)
+
+    def setup(self,
+              logger: logging.Logger) -> bool:
+        # The environment setup is successful only if a line fits the board
+        if self.win_length > max(self.rows, self.columns):
+            logger.error("Win length " + str(self.win_length) + " does not fit a " + str(self.rows) + "x" + str(self.columns) + " board")
+            return False
+        return True
+
+    def initialize(self,
+                   logger: logging.Logger,
+                   session):
+        pass
+
+    def reset(self,
+              logger: logging.Logger,
+              session):
+        # Reset attributes
+        self.winner = Player.none
+        self.last_player = Player.none
+        # Reset internal attributes
+        self._move = 0
+        self._episode_done = False
+        # Reset state, empty positions and action masks: every position is available
+        self._board[:] = Player.none.value
+        self._intermediate_state = None
+        self._empty_positions = list(range(self._cells))
+        self._empty_position_indices = list(range(self._cells))
+        self._action_masks[Player.o][0::2] = 1.0
+        self._action_masks[Player.o][1::2] = -math.inf
+        self._action_masks[Player.x][0::2] = -math.inf
+        self._action_masks[Player.x][1::2] = 1.0
+        # Choose a random starting player
+        self.current_player = Player.o
+        if self._random_stream.uniform() <= 0.5:
+            self.current_player = Player.x
+        # If the current player is the environment player, let it decide how to play
+        if self.current_player == self.environment_player:
+            self._move += 1
+            # Save the current representation of the board for rendering purpose, if required
+            if self._intermediate_state_required:
+                self._save_intermediate_state(logger)
+            self._apply_action(self.get_environment_player_first_action(logger, session))
+        # Return the first state encoded
+        return self._encode_current_state()
+
+    def step(self,
+             logger: logging.Logger,
+             action,
+             session):
+        # Increase move count, change the state with the given action and check for winner and episode completion flag
+        self._move += 1
+        self._episode_done, self.winner = self._check_if_final_current(self._apply_action(action))
+        self._intermediate_state = None
+        # If the current player is the environment player, let it decide how to play
+        if not self._episode_done and self.current_player == self.environment_player:
+            self._move += 1
+            # Save the current representation of the board for rendering purpose, if required
+            if self._intermediate_state_required:
+                self._save_intermediate_state(logger)
+            self._episode_done, self.winner = self._check_if_final_current(self._apply_action(self.get_environment_player_action(logger, session)))
+        # Assign rewards
+        reward: float = 0.0
+        if self._episode_done:
+            if self.winner == Player.x:
+                reward = self.agent_player_win_reward
+            elif self.winner == Player.o:
+                reward = self.environment_player_win_reward
+            else:
+                reward = self.draw_reward
+        # Return the encoded state, the reward and the episode completion flag
+        return self._encode_current_state(), reward, self._episode_done
+
+    def get_random_action(self,
+                          logger: logging.Logger,
+                          session):
+        # Choose a random empty position for the current player
+        position: int = self._empty_positions[self._random_stream.integer(len(self._empty_positions))]
+        return 2 * position + (1 if self.current_player == Player.x else 0)
+
+    @property
+    def state_space_type(self):
+        return SpaceType.continuous
+
+    @property
+    def state_space_shape(self):
+        return self.rows * self.columns,
+
+    @property
+    def action_space_type(self):
+        return SpaceType.discrete
+
+    @property
+    def action_space_shape(self):
+        return self.rows * self.columns * 2,
+
+    def get_action_mask(self,
+                        logger: logging.Logger,
+                        session) -> numpy.ndarray:
+        """
+        Return all the possible action at the current state in the environment wrapped in a numpy array mask.
+
+        The mask is a read-only view updated by the environment at each move: copy it to keep it across moves.
+
+        :param logger: the logger used to print the environment information, warnings and errors
+        :param session: the session of tensorflow currently running, if any
+        :return: an array of -infinity (for unavailable actions) and 1.0 (for available actions)
+        """
+        return self._action_mask_views[self.current_player]
+
+    def get_possible_actions(self,
+                             logger: logging.Logger,
+                             session) -> []:
+        """
+        Return a list of the indices of all the possible actions at the current state of the environment, in no
+        particular order.
+
+        :param logger: the logger used to print the environment information, warnings and errors
+        :param session: the session of tensorflow currently running, if any
+        :return: a list of indices containing the possible actions
+        """
+        player_offset: int = 1 if self.current_player == Player.x else 0
+        return [2 * position + player_offset for position in self._empty_positions]
+
+    def _apply_action(self,
+                      action: int) -> int:
+        """
+        Apply the given action to the board and pass the turn to the other player.
+
+        :param action: the action to apply
+        :return: the position of the action
+        """
+        position, player = divmod(action, 2)
+        self._board[position] = Player.o.value if player == 0 else Player.x.value
+        # Remove the position from the empty positions, moving the last empty position in its place
+        index: int = self._empty_position_indices[position]
+        last_position: int = self._empty_positions.pop()
+        if last_position != position:
+            self._empty_positions[index] = last_position
+            self._empty_position_indices[last_position] = index
+        # Remove the position from the action masks of both players
+        self._action_masks[Player.o][2 * position] = -math.inf
+        self._action_masks[Player.x][2 * position + 1] = -math.inf
+        # Update the last player and current player
+        self.last_player = self.current_player
+        if self.current_player == Player.x:
+            self.current_player = Player.o
+        else:
+            self.current_player = Player.x
+        return position
+
+    def _check_if_final_current(self,
+                                position: int):
+        """
+        Check if the current state is final and also return the winner, given the position of the last move.
+
+        :param position: the position of the last move
+        :return: True if final, False otherwise and the winner
+        """
+        if is_winning_move(self._board, self.rows, self.columns, self.win_length, position):
+            return True, self.last_player
+        return len(self._empty_positions) == 0, Player.none
+
+    def _encode_current_state(self) -> numpy.ndarray:
+        """
+        Encode the current state of the board with an integer sequence.
+
+        :return: the encoded current state, as a copy of the board
+        """
+        return self._board.copy()
+
+    def _get_state(self) -> numpy.ndarray:
+        """
+        Get the current state of the board expressed in player occupied cells.
+
+        :return: the current state as a (rows, columns) array of players
+        """
+        return _CELL_PLAYERS[self._board].reshape(self.rows, self.columns)
+
+    def get_environment_player_first_action(self,
+                                            logger: logging.Logger,
+                                            session) -> int:
+        """
+        Get the first action from the environment player, if any.
+
+        :param logger: the logger used to print the environment information, warnings and errors
+        :param session: the session of tensorflow currently running, if any
+        :return: the action of the environment agent at the first state
+        """
+        raise NotImplementedError()
+
+    def get_environment_player_action(self,
+                                      logger: logging.Logger,
+                                      session) -> int:
+        """
+        Get the action from the environment player, if any.
+
+        :param logger: the logger used to print the environment information, warnings and errors
+        :param session: the session of tensorflow currently running, if any
+        :return: the action of the environment agent at the current state
+        """
+        raise NotImplementedError()
@@ -0,0 +1,47 @@
+#
+# Copyright (C) 2019 Luca Pasqualini
+# University of Siena - Artificial Intelligence Laboratory - SAILab
+#
+#
+# TicTacToeRL project is licensed under a BSD 3-Clause.
+#
+# You should have received a copy of the license along with this
+# work. If not, see <https://opensource.org/licenses/BSD-3-Clause>.
+
+# Import packages
+
+import logging
+
+# Import src
+
+from src.tictactoe_mnk_environment import MNKTicTacToeEnvironment, Player
+
+
+class MNKTicTacToeEnvironmentRandom(MNKTicTacToeEnvironment):
+    """
+    m,n,k-game environment in which the environment player plays with a random policy.
+    """
+
+    def __init__(self,
+                 name: str,
+                 rows: int,
+                 columns: int,
+                 win_length: int,
+                 environment_player: Player,
+                 agent_player_win_reward: float,
+                 environment_player_win_reward: float,
+                 draw_reward: float,
+                 seed: int = None):
+        # Generate the base m,n,k-game environment
+        super(MNKTicTacToeEnvironmentRandom, self).__init__(name, rows, columns, win_length, environment_player, agent_player_win_reward, environment_player_win_reward, draw_reward, seed)
+
+    def get_environment_player_first_action(self,
+                                            logger: logging.Logger,
+                                            session) -> int:
+        # Just return a random action
+        return self.get_random_action(logger, session)
+
+    def get_environment_player_action(self,
+                                      logger: logging.Logger,
+                                      session) -> int:
+        return self.get_random_action(logger, session)
@@ -0,0 +1,246 @@
+#
+# Copyright (C) 2019 Luca Pasqualini
+# University of Siena - Artificial Intelligence Laboratory - SAILab
+#
+#
+# TicTacToeRL project is licensed under a BSD 3-Clause.
+#
+# You should have received a copy of the license along with this
+# work. If not, see <https://opensource.org/licenses/BSD-3-Clause>.
+
+# Import packages
+
+import logging
+import numpy
+import math
+
+# Import required src
+
+from src.tictactoe_environment import Player
+from src.tictactoe_mnk_board import generate_line_cells, get_winning_moves
+
+
+class VectorMNKTicTacToeEnvironment:
+    """
+    m,n,k-game abstract vectorized environment, stepping a batch of N boards at once.
+
+    Each board, observation and action follows the same conventions of the m,n,k-game environment. Wins are detected
+    with a batched kernel checking only the lines through the last move of each board. Boards reaching a final state
+    are automatically reset, so the observation returned for them is the first state of their next episode.
+
+    Each move costs O(win_length) per board: the observations, the action masks of the agent player and the empty
+    positions are updated in place at the moved cell, and only the cells of the lines through it are checked for a win.
+    """
+
+    def __init__(self,
+                 name: str,
+                 rows: int,
+                 columns: int,
+                 win_length: int,
+                 environment_player: Player,
+                 agent_player_win_reward: float,
+                 environment_player_win_reward: float,
+                 draw_reward: float,
+                 boards_number: int,
+                 seed: int = None):
+        # Define attributes
+        self.name: str = name
+        self.rows: int = rows
+        self.columns: int = columns
+        self.win_length: int = win_length
+        self.boards_number: int = boards_number
+        self.environment_player: Player = environment_player
+        if self.environment_player == Player.x:
+            self.agent_player: Player = Player.o
+        else:
+            self.agent_player: Player = Player.x
+        self.agent_player_win_reward: float = agent_player_win_reward
+        self.environment_player_win_reward: float = environment_player_win_reward
+        self.draw_reward: float = draw_reward
+        self.current_players: numpy.ndarray = numpy.zeros(self.boards_number, dtype=numpy.int8)
+        self.winners: numpy.ndarray = numpy.zeros(self.boards_number, dtype=numpy.int8)
+        # Define internal attributes
+        self._cells: int = rows * columns
+        self._random_generator: numpy.random.Generator = numpy.random.default_rng(seed)
+        self._line_cells: numpy.ndarray = generate_line_cells(rows, columns, win_length)
+        self._agent_player_offset: int = 1 if self.agent_player == Player.x else 0
+        # Note: the last cell of each board is always empty, it is the cell of the line cells outside the board
+        self._boards: numpy.ndarray = numpy.zeros((self.boards_number, self._cells + 1), dtype=numpy.int8)
+        self._moves: numpy.ndarray = numpy.zeros(self.boards_number, dtype=numpy.int64)
+        self._all_boards: numpy.ndarray = numpy.arange(self.boards_number)
+        # Define the observations and the action masks of the agent player, updated at each move, with their read-only views
+        self._observations: numpy.ndarray = numpy.zeros((self.boards_number, self._cells), dtype=int)
+        self._observations_view: numpy.ndarray = self._observations.view()
+        self._observations_view.flags.writeable = False
+        self._first_action_mask: numpy.ndarray = -math.inf * numpy.ones(self._cells * 2, dtype=float)
+        self._first_action_mask[self._agent_player_offset::2] = 1.0
+        self._action_masks: numpy.ndarray = numpy.tile(self._first_action_mask, (self.boards_number, 1))
+        self._action_masks_view: numpy.ndarray = self._action_masks.view()
+        self._action_masks_view.flags.writeable = False
+        # Define the empty positions of each board, with their number and the index of each position in them, to remove positions in constant time
+        self._empty_positions: numpy.ndarray = numpy.tile(numpy.arange(self._cells), (self.boards_number, 1))
+        self._empty_position_indices: numpy.ndarray = self._empty_positions.copy()
+        self._empty_positions_number: numpy.ndarray = numpy.full(self.boards_number, self._cells, dtype=numpy.int64)
+
+    def reset(self,
+              logger: logging.Logger,
+              session):
+        """
+        Reset all the boards of the environment.
+
+        :param logger: the logger used to print the environment information, warnings and errors
+        :param session: the session of tensorflow currently running, if any
+        :return: the (N, rows*columns) array of the first encoded states and the (N, 2*rows*columns) array of the action masks
+        """
+        self.winners[:] = 0
+        self._reset_boards(logger, session, self._all_boards)
+        return self.get_observations(), self.get_action_masks()
+
+    def step(self,
+             logger: logging.Logger,
+             actions: numpy.ndarray,
+             session):
+        """
+        Execute the given actions, one for each board, and let the environment player reply where required.
+
+        :param logger: the logger used to print the environment information, warnings and errors
+        :param actions: the (N,) array of the actions to execute, each one valid for the current player of its board
+        :param session: the session of tensorflow currently running, if any
+        :return: the (N, rows*columns) array of the encoded states, the (N,) array of rewards, the (N,) array of episode completion flags and the (N, 2*rows*columns) array of the action masks
+        """
+        # Change all the boards with the given actions and check for winners and episode completion flags
+        winners: numpy.ndarray = self._apply_actions(self._all_boards, numpy.asarray(actions))
+        episodes_done: numpy.ndarray = (winners != Player.none.value) | (self._moves == self._cells)
+        # Let the environment player play on all the boards not completed in which it's its turn
+        environment_player_boards: numpy.ndarray = numpy.flatnonzero(~episodes_done & (self.current_players == self.environment_player.value))
+        if environment_player_boards.size > 0:
+            winners[environment_player_boards] = self._apply_actions(environment_player_boards, self.get_environment_player_actions(logger, session, environment_player_boards))
+            episodes_done = (winners != Player.none.value) | (self._moves == self._cells)
+        self.winners = winners
+        # Assign rewards
+        rewards: numpy.ndarray = numpy.zeros(self.boards_number, dtype=float)
+        rewards[episodes_done & (self.winners == Player.x.value)] = self.agent_player_win_reward
+        rewards[episodes_done & (self.winners == Player.o.value)] = self.environment_player_win_reward
+        rewards[episodes_done & (self.winners == Player.none.value)] = self.draw_reward
+        # Reset all the completed boards
+        completed_boards: numpy.ndarray = numpy.flatnonzero(episodes_done)
+        if completed_boards.size > 0:
+            self._reset_boards(logger, session, completed_boards)
+        # Return the encoded states, the rewards, the episode completion flags and the action masks
+        return self.get_observations(), rewards, episodes_done, self.get_action_masks()
+
+    def get_observations(self) -> numpy.ndarray:
+        """
+        Get the encoded current state of all the boards.
+
+        The observations are a read-only view updated by the environment at each move: copy them to keep them across moves.
+
+        :return: a (N, rows*columns) integer array with the encoded state of each board
+        """
+        return self._observations_view
+
+    def get_action_masks(self) -> numpy.ndarray:
+        """
+        Return all the possible actions of the agent player at the current state of each board wrapped in a numpy array
+        mask. After each reset and step the agent player is the current player of all the boards.
+
+        The masks are a read-only view updated by the environment at each move: copy them to keep them across moves.
+
+        :return: a (N, 2*rows*columns) array of -infinity (for unavailable actions) and 1.0 (for available actions)
+        """
+        return self._action_masks_view
+
+    def get_random_actions(self,
+                           boards: numpy.ndarray = None) -> numpy.ndarray:
+        """
+        Get a random action of the current player in the given boards, chosen uniformly among the possible ones.
+
+        :param boards: the indices of the boards in which to choose, all the boards if None
+        :return: an array with a random possible action for each given board
+        """
+        if boards is None:
+            boards = self._all_boards
+        # Choose a random index in the empty positions of each board
+        indices: numpy.ndarray = (self._random_generator.random(boards.size) * self._empty_positions_number[boards]).astype(numpy.int64)
+        return 2 * self._empty_positions[boards, indices] + (self.current_players[boards] == Player.x.value)
+
+    def _apply_actions(self,
+                       boards: numpy.ndarray,
+                       actions: numpy.ndarray) -> numpy.ndarray:
+        """
+        Apply the given actions to the given boards, pass the turn to the other player and check the boards for winners.
+
+        :param boards: the indices of the boards in which to apply the actions
+        :param actions: the actions to apply, one for each given board
+        :return: the array of the winner values of the given boards (0 where there is no winner)
+        """
+        positions, players = numpy.divmod(actions, 2)
+        values: numpy.ndarray = numpy.where(players == 0, Player.o.value, Player.x.value)
+        self._boards[boards, positions] = values
+        self._observations[boards, positions] = values
+        self._action_masks[boards, 2 * positions + self._agent_player_offset] = -math.inf
+        self._moves[boards] += 1
+        # Remove the positions from the empty positions, moving the last empty position of each board in their place
+        indices: numpy.ndarray = self._empty_position_indices[boards, positions]
+        self._empty_positions_number[boards] -= 1
+        last_positions: numpy.ndarray = self._empty_positions[boards, self._empty_positions_number[boards]]
+        self._empty_positions[boards, indices] = last_positions
+        self._empty_position_indices[boards, last_positions] = indices
+        # Only the lines through the positions just played can be complete
+        winning_moves: numpy.ndarray = get_winning_moves(self._boards, boards, positions, self._line_cells, self.win_length)
+        winners: numpy.ndarray = numpy.where(winning_moves, self.current_players[boards], Player.none.value).astype(numpy.int8)
+        self.current_players[boards] = -self.current_players[boards]
+        return winners
+
+    def _reset_boards(self,
+                      logger: logging.Logger,
+                      session,
+                      boards: numpy.ndarray):
+        """
+        Reset the given boards, choosing a random starting player and letting the environment player play first if chosen.
+
+        :param logger: the logger used to print the environment information, warnings and errors
+        :param session: the session of tensorflow currently running, if any
+        :param boards: the indices of the boards to reset
+        """
+        self._boards[boards] = Player.none.value
+        self._moves[boards] = 0
+        self._observations[boards] = Player.none.value
+        self._action_masks[boards] = self._first_action_mask
+        self._empty_positions[boards] = numpy.arange(self._cells)
+        self._empty_position_indices[boards] = numpy.arange(self._cells)
+        self._empty_positions_number[boards] = self._cells
+        # Choose a random starting player
+        self.current_players[boards] = numpy.where(self._random_generator.random(boards.size) <= 0.5, Player.x.value, Player.o.value)
+        # Let the environment player play first where it is the starting player
+        environment_player_boards: numpy.ndarray = boards[self.current_players[boards] == self.environment_player.value]
+        if environment_player_boards.size > 0:
+            self._apply_actions(environment_player_boards, self.get_environment_player_first_actions(logger, session, environment_player_boards))
+
+    def get_environment_player_first_actions(self,
+                                             logger: logging.Logger,
+                                             session,
+                                             boards: numpy.ndarray) -> numpy.ndarray:
+        """
+        Get the first action from the environment player on the given boards.
+
+        :param logger: the logger used to print the environment information, warnings and errors
+        :param session: the session of tensorflow currently running, if any
+        :param boards: the indices of the boards in which the environment player has to play
+        :return: an array with the action of the environment player for each given board
+        """
+        raise NotImplementedError()
+
+    def get_environment_player_actions(self,
+                                       logger: logging.Logger,
+                                       session,
+                                       boards: numpy.ndarray) -> numpy.ndarray:
+        """
+        Get the action from the environment player on the given boards.
+
+        :param logger: the logger used to print the environment information, warnings and errors
+        :param session: the session of tensorflow currently running, if any
+        :param boards: the indices of the boards in which the environment player has to play
+        :return: an array with the action of the environment player for each given board
+        """
+        raise NotImplementedError()
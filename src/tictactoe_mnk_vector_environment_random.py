@@ -0,0 +1,51 @@
+#
+# Copyright (C) 2019 Luca Pasqualini
+# University of Siena - Artificial Intelligence Laboratory - SAILab
+#
+#
+# TicTacToeRL project is licensed under a BSD 3-Clause.
+#
+# You should have received a copy of the license along with this
+# work. If not, see <https://opensource.org/licenses/BSD-3-Clause>.
+
+# Import packages
+
+import logging
+import numpy
+
+# Import src
+
+from src.tictactoe_mnk_vector_environment import VectorMNKTicTacToeEnvironment, Player
+
+
+class VectorMNKTicTacToeEnvironmentRandom(VectorMNKTicTacToeEnvironment):
+    """
+    m,n,k-game vectorized environment in which the environment player plays with a random policy on all the boards.
+    """
+
+    def __init__(self,
+                 name: str,
+                 rows: int,
+                 columns: int,
+                 win_length: int,
+                 environment_player: Player,
+                 agent_player_win_reward: float,
+                 environment_player_win_reward: float,
+                 draw_reward: float,
+                 boards_number: int,
+                 seed: int = None):
+        # Generate the base vectorized m,n,k-game environment
+        super(VectorMNKTicTacToeEnvironmentRandom, self).__init__(name, rows, columns, win_length, environment_player, agent_player_win_reward, environment_player_win_reward, draw_reward, boards_number, seed)
+
+    def get_environment_player_first_actions(self,
+                                             logger: logging.Logger,
+                                             session,
+                                             boards: numpy.ndarray) -> numpy.ndarray:
+        # Just return random actions
+        return self.get_random_actions(boards)
+
+    def get_environment_player_actions(self,
+                                       logger: logging.Logger,
+                                       session,
+                                       boards: numpy.ndarray) -> numpy.ndarray:
+        return self.get_random_actions(boards)
@@ -0,0 +1,116 @@
+#
+# Copyright (C) 2019 Luca Pasqualini
+# University of Siena - Artificial Intelligence Laboratory - SAILab
+#
+#
+# TicTacToeRL project is licensed under a BSD 3-Clause.
+#
+# You should have received a copy of the license along with this
+# work. If not, see <https://opensource.org/licenses/BSD-3-Clause>.
+
+# Import packages
+
+import logging
+import numpy
+
+# Import usienarl
+
+from usienarl import Environment
+
+# Import required src
+
+from src.tictactoe_observer import TicTacToeObserver
+from src.tictactoe_renderer import TicTacToeRenderer, TicTacToeAsyncTerminalRenderer
+
+
+class ObservableTicTacToeEnvironment(Environment):
+    """
+    Abstract environment of the Tic-Tac-Toe games (of any board size) notifying their intermediate states to the
+    attached observers and rendering through the attached renderer.
+
+    The board before each move of the environment player (the intermediate state) is saved only when an observer
+    (e.g. a renderer) is attached, otherwise no snapshot of the board is taken. Rendering is delegated to the attached
+    renderer. If no renderer is attached when rendering for the first time, a non-blocking terminal renderer is attached.
+
+    The environment is expected to define the winner, _move and _episode_done attributes and the _get_state method.
+    """
+
+    def __init__(self,
+                 name: str):
+        # Define the observers and the flag stating if intermediate states are required
+        self._observers: [] = []
+        self._intermediate_state_required: bool = False
+        # Define internal empty attributes
+        self._intermediate_state: numpy.ndarray = None
+        self._renderer: TicTacToeRenderer = None
+        # Generate the base environment
+        super(ObservableTicTacToeEnvironment, self).__init__(name)
+
+    def close(self,
+              logger: logging.Logger,
+              session):
+        # Close the renderer, if any
+        if self._renderer is not None:
+            self._renderer.close(logger)
+
+    def render(self,
+               logger: logging.Logger,
+               session):
+        # Attach the default renderer if no renderer is attached
+        # Note: the intermediate state of the step just executed was not saved, since no observer was attached
+        if self._renderer is None:
+            self.attach_renderer(TicTacToeAsyncTerminalRenderer())
+        # Render the intermediate board, if any, and the current board
+        self._renderer.render(logger, self._intermediate_state, self._get_state(), self._episode_done, self._move, self.winner)
+
+    def attach_renderer(self,
+                        renderer: TicTacToeRenderer):
+        """
+        Attach the given renderer to the environment, replacing the current one (if any) without closing it.
+
+        :param renderer: the renderer to attach
+        """
+        if self._renderer is not None:
+            self.detach_observer(self._renderer)
+        self._renderer = renderer
+        self.attach_observer(self._renderer)
+
+    def attach_observer(self,
+                        observer: TicTacToeObserver):
+        """
+        Attach the given observer to the environment, which will save and notify intermediate states from now on.
+
+        :param observer: the observer to attach
+        """
+        self._observers.append(observer)
+        self._intermediate_state_required = True
+
+    def detach_observer(self,
+                        observer: TicTacToeObserver):
+        """
+        Detach the given observer from the environment. If no observers are left, intermediate states are no longer saved.
+
+        :param observer: the observer to detach
+        """
+        self._observers.remove(observer)
+        self._intermediate_state_required = len(self._observers) > 0
+
+    def _save_intermediate_state(self,
+                                 logger: logging.Logger):
+        """
+        Save a copy of the current state of the board as the intermediate state and notify it to all the observers.
+
+        :param logger: the logger used to print the environment information, warnings and errors
+        """
+        # Copy the board (a shallow copy is enough since players are immutable)
+        self._intermediate_state = self._get_state().copy()
+        for observer in self._observers:
+            observer.notify_intermediate_state(logger, self, self._intermediate_state)
+
+    def _get_state(self) -> numpy.ndarray:
+        """
+        Get the current state of the board expressed in player occupied cells.
+
+        :return: the current state as an array of players
+        """
+        raise NotImplementedError()
@@ -0,0 +1,36 @@
+#
+# Copyright (C) 2019 Luca Pasqualini
+# University of Siena - Artificial Intelligence Laboratory - SAILab
+#
+#
+# TicTacToeRL project is licensed under a BSD 3-Clause.
+#
+# You should have received a copy of the license along with this
+# work. If not, see <https://opensource.org/licenses/BSD-3-Clause>.
+
+# Import packages
+
+import logging
+import numpy
+
+
+class TicTacToeObserver:
+    """
+    Observer of a Tic-Tac-Toe environment.
+
+    The environment takes a snapshot of the board before each move of the environment player (the intermediate state)
+    only when at least one observer is attached, notifying it to all the attached observers.
+    """
+
+    def notify_intermediate_state(self,
+                                  logger: logging.Logger,
+                                  environment,
+                                  intermediate_state: numpy.ndarray):
+        """
+        Notify the board as it was before the move of the environment player.
+
+        :param logger: the logger used to print the observer information, warnings and errors
+        :param environment: the observed Tic-Tac-Toe environment
+        :param intermediate_state: the snapshot of the board expressed in player occupied cells, it must not be modified
+        """
+        raise NotImplementedError()
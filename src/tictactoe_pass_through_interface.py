@@ -12,7 +12,6 @@
 
 import logging
 import numpy
-import math
 
 # Import usienarl
 
@@ -20,18 +19,31 @@ from usienarl import Interface, SpaceType
 
 # Import required src
 
-from src.tictactoe_environment import TicTacToeEnvironment
+from src.tictactoe_environment import TicTacToeEnvironment, Player
+from src.tictactoe_encodings import ENCODINGS, get_encoding_shape
+from src.tictactoe_state_index import STATE_ACTION_MASKS
+from src.tictactoe_symmetry import STATE_TRANSFORMS, ACTION_PERMUTATIONS, INVERSE_ACTION_PERMUTATIONS
 
 
 class TicTacToePassThroughInterface(Interface):
     """
     Default pass-through interface for all Tic Tac Toe environments.
+
+    The observation is the environment state with the signed encoding (default) or it is looked up, as a read-only row,
+    in the table of the given encoding seen by the agent player (see the encodings). With the canonical encoding the
+    agent acts on the canonical form of the state, so its actions and action masks are mapped to and from that form.
     """
 
     def __init__(self,
-                 environment: TicTacToeEnvironment):
+                 environment: TicTacToeEnvironment,
+                 encoding: str = "signed"):
         # Define specific tic tac toe environment variable
         self._tictactoe_environment: TicTacToeEnvironment = environment
+        # Define the encoding attributes
+        self.encoding: str = encoding
+        self._agent_player_offset: int = 1 if environment.agent_player == Player.x else 0
+        self._encoding_table: numpy.ndarray = ENCODINGS[encoding][self._agent_player_offset]
+        self._canonical: bool = encoding == "canonical"
         # Generate the base interface
         super(TicTacToePassThroughInterface, self).__init__(environment)
 
@@ -39,6 +51,9 @@ class TicTacToePassThroughInterface(Interface):
                                            logger: logging.Logger,
                                            session,
                                            agent_action):
+        # Map the agent action back from the canonical form of the state, if required
+        if self._canonical:
+            return int(INVERSE_ACTION_PERMUTATIONS[self.state_transform, agent_action])
         # Just return the agent action
         return agent_action
 
@@ -46,6 +61,9 @@ class TicTacToePassThroughInterface(Interface):
                                            logger: logging.Logger,
                                            session,
                                            environment_action):
+        # Map the environment action to the canonical form of the state, if required
+        if self._canonical:
+            return int(ACTION_PERMUTATIONS[self.state_transform, environment_action])
         # Just return the environment action
         return environment_action
 
@@ -53,6 +71,9 @@ class TicTacToePassThroughInterface(Interface):
                                          logger: logging.Logger,
                                          session,
                                          environment_state):
+        # Look up the current state in the encoding table, if the encoding is not the one of the environment state
+        if self.encoding != "signed":
+            return self._encoding_table[self._tictactoe_environment.state_id]
         # Just return the environment state
         return environment_state
 
@@ -62,15 +83,16 @@ class TicTacToePassThroughInterface(Interface):
         """
         Get the possible agent actions from the environment current state available actions.
 
+        Since agent actions are environment actions, this is the read-only list maintained by the environment (mapped to
+        the canonical form of the state with the canonical encoding).
+
         :param logger: the logger used to print the interface information, warnings and errors
         :param session: the session of tensorflow currently running, if any
         :return: a list of agent actions which the agent can execute
         """
-        environment_actions: [] = self._tictactoe_environment.get_possible_actions(logger, session)
-        agent_actions: [] = []
-        for environment_action in environment_actions:
-            agent_actions.append(self.environment_action_to_agent_action(logger, session, environment_action))
-        return agent_actions
+        if self._canonical:
+            return ACTION_PERMUTATIONS[self.state_transform, self._tictactoe_environment.get_possible_actions(logger, session)].tolist()
+        return self._tictactoe_environment.get_possible_actions(logger, session)
 
     def get_action_mask(self,
                         logger: logging.Logger,
@@ -78,19 +100,108 @@ class TicTacToePassThroughInterface(Interface):
         """
         Get an array representing the agent action mask (-infinity masked out actions, 1.0 available actions).
 
+        Since agent actions are environment actions, this is the read-only mask maintained by the environment (mapped to
+        the canonical form of the state with the canonical encoding).
+
         :param logger: the logger used to print the interface information, warnings and errors
         :param session: the session of tensorflow currently running, if any
         :return: an array of values where 1.0 means available action at that index, -infinity means instead not available
         """
-        # Get the possible actions
-        possible_actions: [] = self.get_possible_actions(logger, session)
-        # Generate a numpy array of -infinity
-        mask: numpy.ndarray = -math.inf * numpy.ones(self.agent_action_space_shape, dtype=float)
-        # Set to one all indexes contained in the possible action list
-        for action_index in possible_actions:
-            mask[action_index] = 1.0
-        # Return the mask
-        return mask
+        if self._canonical:
+            return self._tictactoe_environment.get_action_mask(logger, session)[INVERSE_ACTION_PERMUTATIONS[self.state_transform]]
+        return self._tictactoe_environment.get_action_mask(logger, session)
+
+    def environment_states_to_observations(self,
+                                           logger: logging.Logger,
+                                           session,
+                                           environment_states: numpy.ndarray,
+                                           state_ids: numpy.ndarray) -> numpy.ndarray:
+        """
+        Translate a batch of environment states (e.g. of a vectorized environment) to a batch of agent observations.
+
+        :param logger: the logger used to print the interface information, warnings and errors
+        :param session: the session of tensorflow currently running, if any
+        :param environment_states: the (N, 9) array of the environment states
+        :param state_ids: the (N,) array of the ids of the environment states
+        :return: the (N, ...) array of the observations
+        """
+        # Gather the states in the encoding table, if the encoding is not the one of the environment states
+        if self.encoding != "signed":
+            return self._encoding_table.take(state_ids, axis=0)
+        # Just return the environment states
+        return environment_states
+
+    def get_action_masks(self,
+                         logger: logging.Logger,
+                         session,
+                         state_ids: numpy.ndarray) -> numpy.ndarray:
+        """
+        Get the agent action masks (-infinity masked out actions, 1.0 available actions) at a batch of states.
+
+        :param logger: the logger used to print the interface information, warnings and errors
+        :param session: the session of tensorflow currently running, if any
+        :param state_ids: the (N,) array of the ids of the states, in which the agent player is playing
+        :return: the (N, 18) array of the action masks
+        """
+        action_masks: numpy.ndarray = STATE_ACTION_MASKS[state_ids, self._agent_player_offset]
+        # Map the action masks to the canonical form of the states, if required
+        if self._canonical:
+            return numpy.take_along_axis(action_masks, INVERSE_ACTION_PERMUTATIONS[STATE_TRANSFORMS[state_ids]], axis=1)
+        return action_masks
+
+    def agent_actions_to_environment_actions(self,
+                                             logger: logging.Logger,
+                                             session,
+                                             agent_actions: numpy.ndarray,
+                                             state_ids: numpy.ndarray) -> numpy.ndarray:
+        """
+        Translate a batch of agent actions to a batch of environment actions.
+
+        :param logger: the logger used to print the interface information, warnings and errors
+        :param session: the session of tensorflow currently running, if any
+        :param agent_actions: the (N,) array of the agent actions
+        :param state_ids: the (N,) array of the ids of the states at which the actions are taken by the agent player
+        :return: the (N,) array of the environment actions
+        """
+        # Map the agent actions back from the canonical form of the states, if required
+        if self._canonical:
+            return INVERSE_ACTION_PERMUTATIONS[STATE_TRANSFORMS[state_ids], agent_actions]
+        # Just return the agent actions
+        return agent_actions
+
+    def environment_actions_to_agent_actions(self,
+                                             logger: logging.Logger,
+                                             session,
+                                             environment_actions: numpy.ndarray,
+                                             state_ids: numpy.ndarray) -> numpy.ndarray:
+        """
+        Translate a batch of environment actions to a batch of agent actions.
+
+        :param logger: the logger used to print the interface information, warnings and errors
+        :param session: the session of tensorflow currently running, if any
+        :param environment_actions: the (N,) array of the environment actions
+        :param state_ids: the (N,) array of the ids of the states at which the actions are taken by the agent player
+        :return: the (N,) array of the agent actions
+        """
+        # Map the environment actions to the canonical form of the states, if required
+        if self._canonical:
+            return ACTION_PERMUTATIONS[STATE_TRANSFORMS[state_ids], environment_actions]
+        # Just return the environment actions
+        return environment_actions
+
+    @property
+    def state_id(self) -> int:
+        """
+        The id of the current state of the environment in the state index.
+        """
+        return self._tictactoe_environment.state_id
+
+    @property
+    def state_transform(self) -> int:
+        """
+        The transform leading the current state of the environment to its canonical form.
+        """
+        return int(STATE_TRANSFORMS[self.state_id])
 
     @property
     def observation_space_type(self) -> SpaceType:
@@ -99,8 +210,10 @@ class TicTacToePassThroughInterface(Interface):
 
     @property
     def observation_space_shape(self):
-        # Just return the environment state space shape
-        return self._environment.state_space_shape
+        # Return the environment state space shape if the observation is the environment state
+        if self.encoding == "signed":
+            return self._environment.state_space_shape
+        return get_encoding_shape(self.encoding)
 
     @property
     def agent_action_space_type(self) -> SpaceType:
@@ -0,0 +1,40 @@
+#
+# Copyright (C) 2019 Luca Pasqualini
+# University of Siena - Artificial Intelligence Laboratory - SAILab
+#
+#
+# TicTacToeRL project is licensed under a BSD 3-Clause.
+#
+# You should have received a copy of the license along with this
+# work. If not, see <https://opensource.org/licenses/BSD-3-Clause>.
+
+# Import packages
+
+import numpy
+
+# Import required src
+
+from src.tictactoe_environment import Player
+from src.tictactoe_state_index import STATE_OBSERVATIONS, STATE_ACTION_MASKS, _read_only
+
+
+def compile_opponent_policy(q_values_function,
+                            environment_player: Player) -> numpy.ndarray:
+    """
+    Compile the greedy policy of an agent, trained as the agent player, into a table of the actions it plays as the
+    environment player at each state.
+
+    As in self-play, the agent sees the flipped state and chooses among the actions of the agent player, then its action
+    is flipped back to the environment player. All the states are evaluated in a single batch.
+
+    :param q_values_function: the function mapping a (STATES, 9) array of observations and a (STATES, 18) array of action masks to the (STATES, 18) array of the masked q-values
+    :param environment_player: the player the agent plays as
+    :return: a read-only (STATES,) array with the action of the environment player at each state id (meaningless at final states)
+    """
+    agent_player_offset: int = 0 if environment_player == Player.x else 1
+    q_values: numpy.ndarray = q_values_function(-STATE_OBSERVATIONS, STATE_ACTION_MASKS[:, agent_player_offset])
+    agent_actions: numpy.ndarray = numpy.argmax(q_values, axis=1)
+    # Flip back the actions to the environment player
+    if environment_player == Player.x:
+        return _read_only((agent_actions + 1).astype(numpy.int16))
+    return _read_only((agent_actions - 1).astype(numpy.int16))
@@ -0,0 +1,64 @@
+#
+# Copyright (C) 2019 Luca Pasqualini
+# University of Siena - Artificial Intelligence Laboratory - SAILab
+#
+#
+# TicTacToeRL project is licensed under a BSD 3-Clause.
+#
+# You should have received a copy of the license along with this
+# work. If not, see <https://opensource.org/licenses/BSD-3-Clause>.
+
+# Import packages
+
+import numpy
+
+
+class RandomStream:
+    """
+    Seedable stream of random numbers drawn from its own numpy generator.
+
+    Single uniforms are served from blocks drawn at once, to avoid calling the generator at each draw.
+    """
+
+    def __init__(self,
+                 seed: int = None,
+                 block_size: int = 4096):
+        # Define attributes
+        self.block_size: int = block_size
+        # Define internal attributes
+        self._generator: numpy.random.Generator = numpy.random.default_rng(seed)
+        self._uniforms: [] = []
+        self._index: int = 0
+
+    def uniform(self) -> float:
+        """
+        Get the next uniform in [0, 1), drawing a new block if the current one is exhausted.
+
+        :return: the uniform float
+        """
+        if self._index >= len(self._uniforms):
+            self._uniforms = self._generator.random(self.block_size).tolist()
+            self._index = 0
+        uniform: float = self._uniforms[self._index]
+        self._index += 1
+        return uniform
+
+    def integer(self,
+                high: int) -> int:
+        """
+        Get the next integer uniformly distributed in [0, high).
+
+        :param high: the exclusive upper bound of the integer
+        :return: the integer
+        """
+        return int(self.uniform() * high)
+
+    def uniforms(self,
+                 size: int) -> numpy.ndarray:
+        """
+        Get an array of uniforms in [0, 1), drawn directly from the generator.
+
+        :param size: the number of uniforms
+        :return: an array of shape (size,) of uniform floats
+        """
+        return self._generator.random(size)
@@ -0,0 +1,240 @@
+#
+# Copyright (C) 2019 Luca Pasqualini
+# University of Siena - Artificial Intelligence Laboratory - SAILab
+#
+#
+# TicTacToeRL project is licensed under a BSD 3-Clause.
+#
+# You should have received a copy of the license along with this
+# work. If not, see <https://opensource.org/licenses/BSD-3-Clause>.
+
+# Import packages
+
+import logging
+import threading
+import queue
+import numpy
+import time
+
+# Import required src
+
+from src.tictactoe_observer import TicTacToeObserver
+
+# Define the graphical representation of each player value
+
+_SYMBOLS: {} = {1: "X", -1: "O", 0: "-"}
+
+
+def _board_to_rows(state: numpy.ndarray) -> []:
+    """
+    Convert the given state of the board to its graphical representation.
+
+    :param state: the state of the board expressed in player occupied cells, flat for a 3x3 board or of shape (rows, columns)
+    :return: a list of strings, one for each row of the board
+    """
+    board: numpy.ndarray = state.reshape(3, 3) if state.ndim == 1 else state
+    return [' '.join([_SYMBOLS[player.value] for player in row]) for row in board]
+
+
+def _board_to_string(state: numpy.ndarray) -> str:
+    """
+    Convert the given state of the board to a string of one character for each cell, in row-major order.
+
+    :param state: the state of the board expressed in player occupied cells, of any shape
+    :return: the string of the cells of the board
+    """
+    return ''.join([_SYMBOLS[player.value] for player in state.flat])
+
+
+def _frame_to_text(intermediate_state: numpy.ndarray, state: numpy.ndarray,
+                   episode_done: bool, move: int, winner) -> str:
+    """
+    Convert the given frame to the text printed on the terminal.
+
+    :param intermediate_state: the state of the board before the move of the environment player, if any
+    :param state: the current state of the board
+    :param episode_done: the flag stating if the episode is completed
+    :param move: the number of moves played in the episode
+    :param winner: the winner player, if any
+    :return: the text of the frame
+    """
+    # Separate the boards with a line as wide as the board, at least the width of the 3x3 board one
+    separator: str = "_" * max(9, 2 * (state.shape[1] if state.ndim == 2 else 3) - 1)
+    lines: [] = []
+    if intermediate_state is not None:
+        lines += _board_to_rows(intermediate_state) + [separator]
+    lines += _board_to_rows(state) + [separator]
+    if episode_done:
+        lines += ["MATCH END", "Played moves: " + str(move)]
+        if winner.value != 0:
+            lines.append("Winner player is " + _SYMBOLS[winner.value])
+        else:
+            lines.append("There is no winner: it's a draw!")
+        lines.append(separator)
+    return "\n".join(lines)
+
+
+class TicTacToeRenderer(TicTacToeObserver):
+    """
+    Abstract renderer of Tic-Tac-Toe environments (also of m,n,k-game environments, rendering (rows, columns) boards).
+
+    When a renderer is attached to an environment, rendering the environment renders a frame made by the board before
+    the move of the environment player (if any), the current board and the episode results (when completed).
+    Since renderers are observers, the environment saves intermediate states as long as a renderer is attached.
+    """
+
+    def notify_intermediate_state(self,
+                                  logger: logging.Logger,
+                                  environment,
+                                  intermediate_state: numpy.ndarray):
+        # Intermediate states are rendered along with the frame
+        pass
+
+    def render(self,
+               logger: logging.Logger,
+               intermediate_state: numpy.ndarray, state: numpy.ndarray,
+               episode_done: bool, move: int, winner):
+        """
+        Render the given frame.
+
+        :param logger: the logger used to print the renderer information, warnings and errors
+        :param intermediate_state: the state of the board before the move of the environment player, None if not any
+        :param state: the current state of the board expressed in player occupied cells, it must not be kept after rendering
+        :param episode_done: the flag stating if the episode is completed
+        :param move: the number of moves played in the episode
+        :param winner: the winner player, if any
+        """
+        raise NotImplementedError()
+
+    def close(self,
+              logger: logging.Logger):
+        """
+        Close the renderer, releasing all its resources.
+
+        :param logger: the logger used to print the renderer information, warnings and errors
+        """
+        pass
+
+
+class TicTacToeSlowWatchRenderer(TicTacToeRenderer):
+    """
+    Renderer printing each frame on the terminal and waiting after each board, blocking the environment.
+
+    It is meant to watch an agent playing.
+    """
+
+    def __init__(self,
+                 delay: float = 1.0):
+        # Define renderer attributes
+        self.delay: float = delay
+
+    def render(self,
+               logger: logging.Logger,
+               intermediate_state: numpy.ndarray, state: numpy.ndarray,
+               episode_done: bool, move: int, winner):
+        # Print the intermediate board, if any, and wait
+        if intermediate_state is not None:
+            print(_frame_to_text(None, intermediate_state, False, move, winner))
+            time.sleep(self.delay)
+        # Print the current board, with the results if the episode is completed, and wait
+        print(_frame_to_text(None, state, episode_done, move, winner))
+        time.sleep(self.delay)
+
+
+class TicTacToeAsyncTerminalRenderer(TicTacToeRenderer):
+    """
+    Renderer printing frames on the terminal from its own thread at the given frame rate.
+
+    Rendering never blocks the environment: frames are queued and, if the queue is full, the frame is dropped.
+    """
+
+    def __init__(self,
+                 fps: float = 10.0,
+                 queue_size: int = 64):
+        # Define renderer attributes
+        self.fps: float = fps
+        self.dropped_frames: int = 0
+        # Define internal renderer attributes
+        self._frames: queue.Queue = queue.Queue(queue_size)
+        self._thread: threading.Thread = None
+
+    def render(self,
+               logger: logging.Logger,
+               intermediate_state: numpy.ndarray, state: numpy.ndarray,
+               episode_done: bool, move: int, winner):
+        # Start the printing thread, if not already started
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._print_frames, daemon=True)
+            self._thread.start()
+        # Queue the text of the frame, dropping it if the queue is full
+        try:
+            self._frames.put_nowait(_frame_to_text(intermediate_state, state, episode_done, move, winner))
+        except queue.Full:
+            self.dropped_frames += 1
+
+    def close(self,
+              logger: logging.Logger):
+        # Stop the printing thread after all the queued frames are printed
+        if self._thread is not None:
+            self._frames.put(None)
+            self._thread.join()
+            self._thread = None
+        if self.dropped_frames > 0:
+            logger.info("Terminal renderer dropped " + str(self.dropped_frames) + " frames")
+
+    def _print_frames(self):
+        """
+        Print the queued frames at the renderer frame rate until a None frame is found.
+        """
+        while True:
+            frame: str = self._frames.get()
+            if frame is None:
+                break
+            print(frame)
+            time.sleep(1.0 / self.fps)
+
+
+class TicTacToeRecorderRenderer(TicTacToeRenderer):
+    """
+    Headless renderer recording the rendered games to a file.
+
+    Each completed game is written as a line with the winner (X, O or - for a draw), the number of moves and the
+    sequence of rendered boards, each one written as a string of one character for each cell in row-major order (X, O
+    or -), e.g. 9 characters for a 3x3 board:
+        - X;7;X--------,X-O------,...
+    """
+
+    def __init__(self,
+                 path: str):
+        # Define renderer attributes
+        self.path: str = path
+        self.recorded_games: int = 0
+        # Define internal renderer attributes
+        self._file = None
+        self._boards: [] = []
+
+    def render(self,
+               logger: logging.Logger,
+               intermediate_state: numpy.ndarray, state: numpy.ndarray,
+               episode_done: bool, move: int, winner):
+        # Open the file, if not already opened
+        if self._file is None:
+            self._file = open(self.path, "a")
+        # Add the boards to the record of the current game
+        if intermediate_state is not None:
+            self._boards.append(_board_to_string(intermediate_state))
+        self._boards.append(_board_to_string(state))
+        # Write the record if the game is completed, flushing it so that the completed games are never lost
+        if episode_done:
+            self._file.write(_SYMBOLS[winner.value] + ";" + str(move) + ";" + ",".join(self._boards) + "\n")
+            self._file.flush()
+            self._boards = []
+            self.recorded_games += 1
+
+    def close(self,
+              logger: logging.Logger):
+        # Close the file, if opened
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            logger.info("Recorded " + str(self.recorded_games) + " games to " + self.path)
@@ -0,0 +1,182 @@
+#
+# Copyright (C) 2019 Luca Pasqualini
+# University of Siena - Artificial Intelligence Laboratory - SAILab
+#
+#
+# TicTacToeRL project is licensed under a BSD 3-Clause.
+#
+# You should have received a copy of the license along with this
+# work. If not, see <https://opensource.org/licenses/BSD-3-Clause>.
+
+# Import packages
+
+import numpy
+
+# Import required src
+
+from src.tictactoe_environment import Player
+from src.tictactoe_encodings import ENCODINGS
+from src.tictactoe_sum_tree import VectorSumTree
+
+
+class TicTacToeReplayBuffer:
+    """
+    Prioritized experience replay buffer for Tic Tac Toe agents, storing each transition in preallocated ring arrays of
+    state ids (uint16), agent actions (uint8), rewards (float32) and episode completion flags, instead of observations.
+
+    Observations are rebuilt at sample time by gathering the rows of the table of the given encoding, as seen by the
+    given agent player, so they have to match the ones of the interface of the agent. Sampling and priorities follow the
+    prioritized experience replay buffer of the dueling deep q-learning model, with the same parameters, but the whole
+    minibatch is sampled and its priorities are updated with vectorized operations on the sum tree.
+    """
+
+    _MINIMUM_ALLOWED_PRIORITY: float = 1.0
+    _IMPORTANCE_SAMPLING_VALUE_UPPER_BOUND: float = 1.0
+    _ABSOLUTE_ERROR_UPPER_BOUND: float = 1.0
+
+    def __init__(self,
+                 capacity: int,
+                 minimum_sample_probability: float, random_sample_trade_off: float,
+                 importance_sampling_value: float, importance_sampling_value_increment: float,
+                 agent_player: Player = Player.x,
+                 encoding: str = "signed"):
+        # Define replay buffer attributes
+        self.capacity: int = capacity
+        self.stored: int = 0
+        # Define internal replay buffer attributes
+        self._minimum_sample_probability: float = minimum_sample_probability
+        self._random_sample_trade_off: float = random_sample_trade_off
+        self._importance_sampling_value: float = importance_sampling_value
+        self._importance_sampling_value_increment: float = importance_sampling_value_increment
+        self._observations: numpy.ndarray = ENCODINGS[encoding][1 if agent_player == Player.x else 0]
+        # Define the ring arrays of the transitions and the sum tree of their priorities, indexed by the same data index
+        self._state_ids: numpy.ndarray = numpy.zeros(capacity, dtype=numpy.uint16)
+        self._actions: numpy.ndarray = numpy.zeros(capacity, dtype=numpy.uint8)
+        self._rewards: numpy.ndarray = numpy.zeros(capacity, dtype=numpy.float32)
+        self._next_state_ids: numpy.ndarray = numpy.zeros(capacity, dtype=numpy.uint16)
+        self._last_steps: numpy.ndarray = numpy.zeros(capacity, dtype=bool)
+        self._sum_tree: VectorSumTree = VectorSumTree(capacity)
+        self._last_sampled_indexes: numpy.ndarray = None
+
+    def store(self,
+              state_id: int, action: int, reward: float, next_state_id: int, last_step: bool):
+        """
+        Store the given transition with the max priority of the stored transitions, overwriting the oldest transition
+        if the buffer is full.
+
+        :param state_id: the id of the current state
+        :param action: the agent action
+        :param reward: the reward
+        :param next_state_id: the id of the next state
+        :param last_step: the flag stating if the transition is the last step of its episode
+        """
+        # Set the max priority as the default one for this new sample, or the minimum defined if the max is zero
+        max_priority: float = self._sum_tree.max_priority
+        if max_priority <= 0:
+            max_priority = self._MINIMUM_ALLOWED_PRIORITY
+        index: int = self.stored % self.capacity
+        self._state_ids[index] = state_id
+        self._actions[index] = action
+        self._rewards[index] = reward
+        self._next_state_ids[index] = next_state_id
+        self._last_steps[index] = last_step
+        self._sum_tree.set_priority(index, max_priority)
+        self.stored += 1
+
+    def get(self,
+            amount: int = 0) -> []:
+        """
+        Sample a minibatch of transitions with probability proportional to their priority. The priorities of its
+        transitions are updated by the next update.
+
+        :param amount: the number of transitions to sample, all the capacity if not positive or above it
+        :return: the list of the arrays of current observations, actions, rewards, next observations, last step flags and importance sampling weights
+        """
+        minibatch, self._last_sampled_indexes = self.sample(amount)
+        self.anneal()
+        return minibatch
+
+    def sample(self,
+               amount: int = 0):
+        """
+        Sample a minibatch of transitions with probability proportional to their priority, also returning the indexes
+        of its transitions to update their priorities.
+
+        The importance sampling weights are computed with the next importance sampling value, but the annealing is not
+        advanced until the minibatch is consumed (see anneal), so that discarded minibatches do not advance it.
+
+        :param amount: the number of transitions to sample, all the capacity if not positive or above it
+        :return: the minibatch (as returned by get) and the (amount,) array of the indexes of its transitions
+        """
+        if amount <= 0 or amount > self.capacity:
+            amount = self.capacity
+        importance_sampling_value: float = self._next_importance_sampling_value
+        # Sample a random uniform value in each of the amount segments of the total priority and find all their leafs at once
+        total_priority: float = self._sum_tree.total_priority
+        priority_values: numpy.ndarray = numpy.random.uniform(numpy.arange(amount), numpy.arange(1, amount + 1)) * (total_priority / amount)
+        indexes: numpy.ndarray = self._sum_tree.find(priority_values)
+        # Compute the importance sampling weights normalized by the max weight
+        # Note: the weight of a transition is (N * P(j))^-b, where P(j) is the priority of its leaf over the total priority
+        # Note: only the leafs of the stored transitions are considered, since the unfilled ones have zero priority
+        min_probability: float = numpy.min(self._sum_tree.leafs[:self.size]) / total_priority
+        max_weight: float = (min_probability * amount) ** (-importance_sampling_value)
+        importance_sampling_weights: numpy.ndarray = ((self._sum_tree.get_priorities(indexes) / total_priority * amount) ** (-importance_sampling_value) / max_weight).astype(numpy.float32).reshape(amount, 1)
+        # Rebuild the minibatch by gathering the transitions and the observations of their states
+        return [self._observations[self._state_ids[indexes]], self._actions[indexes].astype(int), self._rewards[indexes].astype(float),
+                self._observations[self._next_state_ids[indexes]], self._last_steps[indexes], importance_sampling_weights], indexes
+
+    def anneal(self):
+        """
+        Advance the annealing of the importance sampling value after a sampled minibatch has been consumed.
+        """
+        self._importance_sampling_value = self._next_importance_sampling_value
+
+    def update(self,
+               absolute_errors: numpy.ndarray):
+        """
+        Update the priorities of the last sampled transitions with the given absolute errors.
+
+        :param absolute_errors: the array of the absolute errors of the last sampled transitions for each action
+        """
+        if self._last_sampled_indexes is None:
+            return
+        self.update_priorities(self._last_sampled_indexes, absolute_errors)
+        self._last_sampled_indexes = None
+
+    def update_priorities(self,
+                          indexes: numpy.ndarray,
+                          absolute_errors: numpy.ndarray,
+                          stored: int = None):
+        """
+        Update the priorities of the transitions at the given indexes with the given absolute errors.
+
+        If the number of transitions stored when the indexes were sampled is given, the transitions overwritten since
+        then are skipped, since the absolute errors refer to the transitions they replaced.
+
+        :param indexes: the (N,) array of the indexes of the transitions
+        :param absolute_errors: the (N, actions) array of the absolute errors of the transitions for each action
+        :param stored: the optional number of transitions stored when the indexes were sampled
+        """
+        # Compute the priority to store as (delta + epsilon)^alpha, with an upper bound on delta + epsilon
+        # Note: only the max along each row is kept since the absolute error is zero for the actions not chosen
+        priority_values: numpy.ndarray = numpy.amax(numpy.minimum(absolute_errors + self._minimum_sample_probability, self._ABSOLUTE_ERROR_UPPER_BOUND) ** self._random_sample_trade_off, axis=1)
+        if stored is not None and stored < self.stored:
+            # Keep only the transitions last written before the sampling
+            last_written: numpy.ndarray = self.stored - 1 - (self.stored - 1 - indexes) % self.capacity
+            kept: numpy.ndarray = last_written < stored
+            indexes, priority_values = indexes[kept], priority_values[kept]
+        self._sum_tree.update(indexes, priority_values)
+
+    @property
+    def _next_importance_sampling_value(self) -> float:
+        """
+        The importance sampling value increased of the defined increment value until the upper bound is reached.
+        """
+        return min(self._IMPORTANCE_SAMPLING_VALUE_UPPER_BOUND, self._importance_sampling_value + self._importance_sampling_value_increment)
+
+    @property
+    def size(self) -> int:
+        """
+        The number of transitions currently stored in the buffer.
+        """
+        return min(self.stored, self.capacity)
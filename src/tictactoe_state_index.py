@@ -0,0 +1,125 @@
+#
+# Copyright (C) 2019 Luca Pasqualini
+# University of Siena - Artificial Intelligence Laboratory - SAILab
+#
+#
+# TicTacToeRL project is licensed under a BSD 3-Clause.
+#
+# You should have received a copy of the license along with this
+# work. If not, see <https://opensource.org/licenses/BSD-3-Clause>.
+
+# Import packages
+
+import numpy
+import math
+
+# Import required src
+
+from src.tictactoe_tables import BOARD_CODES, CELL_POWERS, FINAL_STATES, WINNERS, encode_board
+
+# Define the state index
+# Note: a state is any board reachable by playing from the empty board, with either the X or the O player starting.
+# Each state is assigned a dense integer id, following the order of the board codes. Per-state tables are read-only
+# numpy arrays indexed by state id. Player offsets are the action parity of each player (0 for O, 1 for X).
+
+
+def _enumerate_state_codes() -> numpy.ndarray:
+    """
+    Enumerate the codes of all the boards reachable from the empty board, with either player starting.
+
+    :return: the sorted array of the codes of all the reachable boards
+    """
+    # Visit the (board code, player to move) pairs, where the player is expressed by its code digit (1 for X, 2 for O)
+    visited: set = {(0, 1), (0, 2)}
+    frontier: [] = list(visited)
+    while len(frontier) > 0:
+        code, player_digit = frontier.pop()
+        # Stop at final boards
+        if FINAL_STATES[code]:
+            continue
+        # Play each empty cell and pass the turn to the other player
+        for position in range(9):
+            if (code // 3 ** position) % 3 == 0:
+                successor: () = (code + player_digit * 3 ** position, 3 - player_digit)
+                if successor not in visited:
+                    visited.add(successor)
+                    frontier.append(successor)
+    return numpy.array(sorted({code for code, _ in visited}), dtype=numpy.int64)
+
+
+def _read_only(array: numpy.ndarray) -> numpy.ndarray:
+    """
+    Make the given array read-only.
+
+    :param array: the array to make read-only
+    :return: the same array, now read-only
+    """
+    array.flags.writeable = False
+    return array
+
+
+def _generate_legal_positions(position_masks: numpy.ndarray) -> numpy.ndarray:
+    """
+    Generate the table of the legal positions of each state.
+
+    :param position_masks: the (STATES, 9) boolean array of the empty cells of each state
+    :return: a (STATES, 9) array with the legal positions of each state in ascending order, padded with -1
+    """
+    # Sort the empty positions first, marking the occupied ones with a position past the board
+    positions: numpy.ndarray = numpy.sort(numpy.where(position_masks, numpy.arange(9), 9), axis=1)
+    return numpy.where(positions < 9, positions, -1).astype(numpy.int8)
+
+
+STATE_CODES: numpy.ndarray = _read_only(_enumerate_state_codes())
+STATES: int = STATE_CODES.size
+STATE_IDS: numpy.ndarray = numpy.full(BOARD_CODES, -1, dtype=numpy.int16)
+STATE_IDS[STATE_CODES] = numpy.arange(STATES)
+STATE_IDS = _read_only(STATE_IDS)
+STATE_BOARDS: numpy.ndarray = _read_only(numpy.array([0, 1, -1], dtype=numpy.int8)[(STATE_CODES[:, numpy.newaxis] // CELL_POWERS) % 3])
+STATE_OBSERVATIONS: numpy.ndarray = _read_only(STATE_BOARDS.astype(int))
+STATE_FINAL: numpy.ndarray = _read_only(FINAL_STATES[STATE_CODES])
+STATE_WINNERS: numpy.ndarray = _read_only(WINNERS[STATE_CODES])
+STATE_POSITION_MASKS: numpy.ndarray = _read_only(STATE_BOARDS == 0)
+STATE_ACTION_MASKS: numpy.ndarray = numpy.full((STATES, 2, 9 * 2), -math.inf)
+STATE_ACTION_MASKS[:, 0, 0::2][STATE_POSITION_MASKS] = 1.0
+STATE_ACTION_MASKS[:, 1, 1::2][STATE_POSITION_MASKS] = 1.0
+STATE_ACTION_MASKS = _read_only(STATE_ACTION_MASKS)
+STATE_POSITION_ACTION_MASKS: numpy.ndarray = _read_only(numpy.where(STATE_POSITION_MASKS, 1.0, -math.inf))
+# Legal positions of each state in ascending order, padded with -1, and their number
+STATE_LEGAL_POSITIONS_NUMBER: numpy.ndarray = _read_only(STATE_POSITION_MASKS.sum(axis=1, dtype=numpy.int8))
+STATE_LEGAL_POSITIONS: numpy.ndarray = _read_only(_generate_legal_positions(STATE_POSITION_MASKS))
+
+
+def get_state_id(board: numpy.ndarray) -> int:
+    """
+    Get the id of the given board, expressed with cell values (1 for X, -1 for O, 0 for empty).
+
+    :param board: the board of shape (9,)
+    :return: the id of the state, -1 if the board is not reachable
+    """
+    return int(STATE_IDS[encode_board(board)])
+
+
+def get_state_ids(boards: numpy.ndarray) -> numpy.ndarray:
+    """
+    Get the ids of the given boards, expressed with cell values (1 for X, -1 for O, 0 for empty).
+
+    :param boards: the boards of shape (N, 9)
+    :return: an array of shape (N,) with the id of each state, -1 where the board is not reachable
+    """
+    return STATE_IDS[encode_board(boards)]
+
+
+def get_random_actions(state_ids: numpy.ndarray,
+                       player_offsets,
+                       uniforms: numpy.ndarray) -> numpy.ndarray:
+    """
+    Get a random legal action at each of the given states, chosen with the given uniforms.
+
+    :param state_ids: an array of shape (N,) with the id of each state, none of them final
+    :param player_offsets: the offset of the playing player (0 for O, 1 for X) or an array of shape (N,) of offsets
+    :param uniforms: an array of shape (N,) of uniforms in [0, 1)
+    :return: an array of shape (N,) with a random legal action at each state
+    """
+    chosen_positions: numpy.ndarray = (uniforms * STATE_LEGAL_POSITIONS_NUMBER[state_ids]).astype(int)
+    return 2 * STATE_LEGAL_POSITIONS[state_ids, chosen_positions].astype(int) + player_offsets
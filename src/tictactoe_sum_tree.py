@@ -0,0 +1,129 @@
+#
+# Copyright (C) 2019 Luca Pasqualini
+# University of Siena - Artificial Intelligence Laboratory - SAILab
+#
+#
+# TicTacToeRL project is licensed under a BSD 3-Clause.
+#
+# You should have received a copy of the license along with this
+# work. If not, see <https://opensource.org/licenses/BSD-3-Clause>.
+
+# Import packages
+
+import numpy
+
+
+class VectorSumTree:
+    """
+    Sum tree (a binary tree in which each parent node is the sum of its child nodes) stored in a numpy array, in which
+    batches of priorities are searched and updated with numpy operations, one tree level at a time.
+
+    The tree is complete: the number of leafs is the capacity rounded up to a power of two, with the root at index 1
+    and the leaf of the data index i at the index leafs_number + i. Padding leafs always have zero priority.
+
+    A max tree with the same layout is kept next to the sum tree, so that the max priority is read at its root instead
+    of scanning all the leafs.
+    """
+
+    def __init__(self,
+                 capacity: int):
+        # Define sum tree attributes
+        self.capacity: int = capacity
+        self.depth: int = max(int(numpy.ceil(numpy.log2(capacity))), 0)
+        self.leafs_number: int = 2 ** self.depth
+        # Define internal sum tree attributes
+        # Note: the index 0 of the tree is unused
+        self._tree: numpy.ndarray = numpy.zeros(2 * self.leafs_number, dtype=numpy.float64)
+        self._max_tree: numpy.ndarray = numpy.zeros(2 * self.leafs_number, dtype=numpy.float64)
+
+    def find(self,
+             priority_values: numpy.ndarray) -> numpy.ndarray:
+        """
+        Find the data indexes of the leafs storing the given cumulative priority values, descending the tree for all
+        the values at once.
+
+        :param priority_values: the (N,) array of cumulative priority values, between zero and the total priority
+        :return: the (N,) array of data indexes
+        """
+        tree_indexes: numpy.ndarray = numpy.ones(priority_values.size, dtype=numpy.int64)
+        priority_values = numpy.array(priority_values, dtype=numpy.float64)
+        for _ in range(self.depth):
+            # Go to the right child if the value is above the priority of the left child, subtracting it
+            left_indexes: numpy.ndarray = 2 * tree_indexes
+            left_priorities: numpy.ndarray = self._tree[left_indexes]
+            right: numpy.ndarray = priority_values > left_priorities
+            priority_values -= numpy.where(right, left_priorities, 0.0)
+            tree_indexes = left_indexes + right
+        # Keep the data indexes in the capacity, in case of rounding errors on the values near the total priority
+        return numpy.minimum(tree_indexes - self.leafs_number, self.capacity - 1)
+
+    def update(self,
+               data_indexes: numpy.ndarray,
+               priority_values: numpy.ndarray):
+        """
+        Set the priorities of the leafs of the given data indexes and update their ancestors, one tree level at a time.
+
+        If a data index is repeated, its last priority value is kept.
+
+        :param data_indexes: the (N,) array of data indexes
+        :param priority_values: the (N,) array of priority values
+        """
+        tree_indexes: numpy.ndarray = numpy.asarray(data_indexes, dtype=numpy.int64) + self.leafs_number
+        self._tree[tree_indexes] = priority_values
+        self._max_tree[tree_indexes] = priority_values
+        # Recompute the sums and the maxes of the parents of the updated nodes, up to the root
+        for _ in range(self.depth):
+            tree_indexes = numpy.unique(tree_indexes // 2)
+            self._tree[tree_indexes] = self._tree[2 * tree_indexes] + self._tree[2 * tree_indexes + 1]
+            self._max_tree[tree_indexes] = numpy.maximum(self._max_tree[2 * tree_indexes], self._max_tree[2 * tree_indexes + 1])
+
+    def set_priority(self,
+                     data_index: int,
+                     priority_value: float):
+        """
+        Set the priority of the leaf of the given data index and update its ancestors, without numpy batch overhead.
+
+        :param data_index: the data index
+        :param priority_value: the priority value
+        """
+        tree_index: int = data_index + self.leafs_number
+        score_value_update: float = priority_value - self._tree[tree_index]
+        self._tree[tree_index] = priority_value
+        self._max_tree[tree_index] = priority_value
+        while tree_index > 1:
+            tree_index //= 2
+            self._tree[tree_index] += score_value_update
+            self._max_tree[tree_index] = max(self._max_tree[2 * tree_index], self._max_tree[2 * tree_index + 1])
+
+    def get_priorities(self,
+                       data_indexes: numpy.ndarray) -> numpy.ndarray:
+        """
+        Get the priorities of the leafs of the given data indexes.
+
+        :param data_indexes: the (N,) array of data indexes
+        :return: the (N,) array of priorities
+        """
+        return self._tree[self.leafs_number + numpy.asarray(data_indexes, dtype=numpy.int64)]
+
+    @property
+    def leafs(self) -> numpy.ndarray:
+        """
+        The (capacity,) read-only view of the priorities of all the leafs.
+        """
+        leafs: numpy.ndarray = self._tree[self.leafs_number:self.leafs_number + self.capacity]
+        leafs.flags.writeable = False
+        return leafs
+
+    @property
+    def total_priority(self) -> float:
+        """
+        The sum of the priorities of all the leafs, stored at the root.
+        """
+        return float(self._tree[1])
+
+    @property
+    def max_priority(self) -> float:
+        """
+        The max priority of all the leafs, stored at the root of the max tree.
+        """
+        return float(self._max_tree[1])
@@ -0,0 +1,210 @@
+#
+# Copyright (C) 2019 Luca Pasqualini
+# University of Siena - Artificial Intelligence Laboratory - SAILab
+#
+#
+# TicTacToeRL project is licensed under a BSD 3-Clause.
+#
+# You should have received a copy of the license along with this
+# work. If not, see <https://opensource.org/licenses/BSD-3-Clause>.
+
+# Import packages
+
+import tensorflow
+import numpy
+import threading
+import queue
+
+
+class TicTacToeSummaryPolicy:
+    """
+    Policy to write the summaries of the model updates of Tic Tac Toe agents, throttled to at most one each given
+    interval of steps.
+
+    If aggregating, the summary written is built from the mean, min and max of the loss and of the absolute (TD) error
+    of the transitions of all the updates recorded since the last one written, otherwise it is the summary of the last
+    update. If asynchronous, the summaries are added to the summary writer by a background thread, so that the acting
+    loop only pays for putting them in a queue.
+
+    The default policy writes the summary of the last update at each step, in the calling thread.
+    """
+
+    def __init__(self,
+                 interval: int = 1,
+                 aggregate: bool = False,
+                 asynchronous: bool = False):
+        # Define summary policy attributes
+        self.interval: int = interval
+        self.aggregate: bool = aggregate
+        self.asynchronous: bool = asynchronous
+        # Define internal summary policy attributes
+        self._last_summary = None
+        self._next_step: int = None
+        self._pending_step: int = None
+        # Define the internal attributes of the statistics of the updates recorded since the last summary written
+        self._updates: int = 0
+        self._loss_sum: float = 0.0
+        self._loss_min: float = numpy.inf
+        self._loss_max: float = -numpy.inf
+        self._absolute_errors: int = 0
+        self._absolute_error_sum: float = 0.0
+        self._absolute_error_min: float = numpy.inf
+        self._absolute_error_max: float = -numpy.inf
+        # Define the internal attributes of the background writer thread
+        self._summary_queue: queue.Queue = queue.Queue()
+        self._writer_thread: threading.Thread = None
+        self._writer_error: Exception = None
+
+    def record(self,
+               summary, loss: float, absolute_errors: numpy.ndarray):
+        """
+        Record the results of a model update.
+
+        :param summary: the summary of the update
+        :param loss: the loss of the update
+        :param absolute_errors: the (batch, actions) array of the absolute errors of the update for each action
+        """
+        self._last_summary = summary
+        self._updates += 1
+        if not self.aggregate:
+            return
+        # Update the statistics of the loss and of the absolute errors of the transitions
+        # Note: only the max along each row is kept since the absolute error is zero for the actions not chosen
+        loss = float(loss)
+        self._loss_sum += loss
+        self._loss_min = min(self._loss_min, loss)
+        self._loss_max = max(self._loss_max, loss)
+        transition_absolute_errors: numpy.ndarray = numpy.amax(absolute_errors, axis=1)
+        self._absolute_errors += transition_absolute_errors.size
+        self._absolute_error_sum += float(numpy.sum(transition_absolute_errors))
+        self._absolute_error_min = min(self._absolute_error_min, float(numpy.min(transition_absolute_errors)))
+        self._absolute_error_max = max(self._absolute_error_max, float(numpy.max(transition_absolute_errors)))
+
+    def write(self,
+              summary_writer,
+              step: int):
+        """
+        Write the summary of the updates recorded since the last one written at the given step, if at least the
+        interval of steps passed since then. Otherwise the updates are kept for the next summary.
+
+        :param summary_writer: the summary writer of the agent
+        :param step: the current step
+        """
+        if self._updates == 0:
+            return
+        self._pending_step = step
+        if self._next_step is not None and step < self._next_step:
+            return
+        self._next_step = step + self.interval
+        self._write(summary_writer, step)
+
+    def flush(self,
+              summary_writer):
+        """
+        Write the summary of the updates still not written, if any, at the last step given, and wait for the
+        background writer thread, if any, to add all the queued summaries to the summary writer. The error of the
+        background writer thread, if any, is raised.
+
+        :param summary_writer: the summary writer of the agent
+        """
+        if self._updates > 0 and self._pending_step is not None:
+            self._next_step = self._pending_step + self.interval
+            self._write(summary_writer, self._pending_step)
+        if self._writer_thread is not None:
+            self._summary_queue.join()
+        # Raise the error of the background writer thread, if any, in the calling thread
+        if self._writer_error is not None:
+            error: Exception = self._writer_error
+            self._writer_error = None
+            raise error
+
+    def stop(self,
+             summary_writer):
+        """
+        Flush the summaries and stop the background writer thread, if running. It is started again by the next summary.
+
+        :param summary_writer: the summary writer of the agent
+        """
+        try:
+            self.flush(summary_writer)
+        finally:
+            if self._writer_thread is not None:
+                self._summary_queue.put(None)
+                self._writer_thread.join()
+                self._writer_thread = None
+
+    def reset(self):
+        """
+        Reset the steps of the summaries, discarding the updates recorded since the last one written.
+        """
+        self._next_step = None
+        self._pending_step = None
+        self._reset_statistics()
+
+    def _write(self,
+               summary_writer,
+               step: int):
+        """
+        Add the summary of the updates recorded since the last one written to the summary writer at the given step,
+        directly or through the background writer thread.
+
+        :param summary_writer: the summary writer of the agent
+        :param step: the step of the summary
+        """
+        summary = self._build_aggregated_summary() if self.aggregate else self._last_summary
+        self._reset_statistics()
+        if summary is None or summary_writer is None:
+            return
+        if not self.asynchronous:
+            summary_writer.add_summary(summary, step)
+            return
+        # Start the background writer thread if not running
+        if self._writer_thread is None:
+            self._writer_thread = threading.Thread(target=self._write_queued_summaries, name="summary_writer", daemon=True)
+            self._writer_thread.start()
+        self._summary_queue.put((summary_writer, summary, step))
+
+    def _build_aggregated_summary(self):
+        """
+        Build the summary of the statistics of the loss and of the absolute errors of the recorded updates.
+
+        :return: the summary protocol buffer
+        """
+        values: [] = [tensorflow.Summary.Value(tag="loss/mean", simple_value=self._loss_sum / self._updates),
+                      tensorflow.Summary.Value(tag="loss/min", simple_value=self._loss_min),
+                      tensorflow.Summary.Value(tag="loss/max", simple_value=self._loss_max)]
+        if self._absolute_errors > 0:
+            values += [tensorflow.Summary.Value(tag="absolute_error/mean", simple_value=self._absolute_error_sum / self._absolute_errors),
+                       tensorflow.Summary.Value(tag="absolute_error/min", simple_value=self._absolute_error_min),
+                       tensorflow.Summary.Value(tag="absolute_error/max", simple_value=self._absolute_error_max)]
+        return tensorflow.Summary(value=values)
+
+    def _reset_statistics(self):
+        """
+        Reset the statistics of the recorded updates.
+        """
+        self._last_summary = None
+        self._updates = 0
+        self._loss_sum = 0.0
+        self._loss_min = numpy.inf
+        self._loss_max = -numpy.inf
+        self._absolute_errors = 0
+        self._absolute_error_sum = 0.0
+        self._absolute_error_min = numpy.inf
+        self._absolute_error_max = -numpy.inf
+
+    def _write_queued_summaries(self):
+        """
+        Add the queued summaries to their summary writers until stopped, keeping the last error, if any.
+        """
+        while True:
+            item = self._summary_queue.get()
+            try:
+                if item is None:
+                    return
+                summary_writer, summary, step = item
+                summary_writer.add_summary(summary, step)
+            except Exception as error:
+                self._writer_error = error
+            finally:
+                self._summary_queue.task_done()
@@ -0,0 +1,134 @@
+#
+# Copyright (C) 2019 Luca Pasqualini
+# University of Siena - Artificial Intelligence Laboratory - SAILab
+#
+#
+# TicTacToeRL project is licensed under a BSD 3-Clause.
+#
+# You should have received a copy of the license along with this
+# work. If not, see <https://opensource.org/licenses/BSD-3-Clause>.
+
+# Import packages
+
+import numpy
+
+# Import required src
+
+from src.tictactoe_tables import BOARD_CODES, CELL_POWERS, encode_board
+from src.tictactoe_state_index import STATE_CODES, _read_only
+
+# Define the symmetry tables
+# Note: the board has 8 symmetries (the identity, three rotations and four reflections). The transform t maps the board
+# b to the board b[BOARD_PERMUTATIONS[t]], so the piece in the cell p is moved to the cell INVERSE_BOARD_PERMUTATIONS[t, p].
+# The canonical form of a board is its transformed board with the lowest code, and canonical ids are dense integer ids
+# of the canonical forms of all the reachable states.
+
+
+def _generate_board_permutations() -> numpy.ndarray:
+    """
+    Generate the permutations of the cells of the board for each of its 8 symmetries.
+
+    :return: an array of shape (8, 9) where the row t holds, for each cell of the transformed board, its source cell
+    """
+    # Each symmetry gives the (row, column) source of the (row, column) cell of the transformed board
+    symmetries: [] = [lambda row, column: (row, column),
+                      lambda row, column: (2 - column, row),
+                      lambda row, column: (2 - row, 2 - column),
+                      lambda row, column: (column, 2 - row),
+                      lambda row, column: (column, row),
+                      lambda row, column: (row, 2 - column),
+                      lambda row, column: (2 - row, column),
+                      lambda row, column: (2 - column, 2 - row)]
+    permutations: [] = []
+    for symmetry in symmetries:
+        sources: [] = [symmetry(cell // 3, cell % 3) for cell in range(9)]
+        permutations.append([source_row * 3 + source_column for source_row, source_column in sources])
+    return numpy.array(permutations, dtype=numpy.int64)
+
+
+BOARD_PERMUTATIONS: numpy.ndarray = _read_only(_generate_board_permutations())
+INVERSE_BOARD_PERMUTATIONS: numpy.ndarray = _read_only(numpy.argsort(BOARD_PERMUTATIONS, axis=1))
+# Remapping of the 18 actions: the action 2p+s is moved to the action 2q+s, where q is the transformed cell of p
+ACTION_PERMUTATIONS: numpy.ndarray = _read_only((2 * numpy.repeat(INVERSE_BOARD_PERMUTATIONS, 2, axis=1)) + numpy.tile([0, 1], 9))
+INVERSE_ACTION_PERMUTATIONS: numpy.ndarray = _read_only((2 * numpy.repeat(BOARD_PERMUTATIONS, 2, axis=1)) + numpy.tile([0, 1], 9))
+
+
+def _generate_canonical_tables():
+    """
+    Generate the tables stating, for each board code, the code of its canonical form and the transform leading to it.
+
+    :return: the read-only array of canonical codes and the read-only array of transforms
+    """
+    # Compute the code of each transformed board of all the boards
+    digits: numpy.ndarray = (numpy.arange(BOARD_CODES)[:, numpy.newaxis] // CELL_POWERS) % 3
+    transformed_codes: numpy.ndarray = numpy.stack([digits[:, permutation] @ CELL_POWERS for permutation in BOARD_PERMUTATIONS], axis=1)
+    # The canonical form is the transformed board with the lowest code, the first transform is used on ties
+    transforms: numpy.ndarray = numpy.argmin(transformed_codes, axis=1).astype(numpy.int8)
+    canonical_codes: numpy.ndarray = transformed_codes[numpy.arange(BOARD_CODES), transforms]
+    return _read_only(canonical_codes), _read_only(transforms)
+
+
+CANONICAL_CODES, CANONICAL_TRANSFORMS = _generate_canonical_tables()
+CANONICAL_STATE_CODES: numpy.ndarray = _read_only(numpy.unique(CANONICAL_CODES[STATE_CODES]))
+CANONICAL_STATES: int = CANONICAL_STATE_CODES.size
+CANONICAL_IDS: numpy.ndarray = numpy.full(BOARD_CODES, -1, dtype=numpy.int16)
+CANONICAL_IDS[STATE_CODES] = numpy.searchsorted(CANONICAL_STATE_CODES, CANONICAL_CODES[STATE_CODES])
+CANONICAL_IDS = _read_only(CANONICAL_IDS)
+# Canonical id and transform of each state id
+STATE_CANONICAL_IDS: numpy.ndarray = _read_only(CANONICAL_IDS[STATE_CODES])
+STATE_TRANSFORMS: numpy.ndarray = _read_only(CANONICAL_TRANSFORMS[STATE_CODES])
+
+
+def canonicalize(states: numpy.ndarray):
+    """
+    Get the canonical id of the given boards, expressed with cell values (1 for X, -1 for O, 0 for empty), and the
+    transform mapping each board to its canonical form.
+
+    :param states: a board of shape (9,) or a batch of boards of shape (N, 9)
+    :return: the canonical id (-1 if the board is not reachable) and the transform, as integers or as arrays of shape (N,)
+    """
+    codes = encode_board(states)
+    if numpy.ndim(codes) == 0:
+        return int(CANONICAL_IDS[codes]), int(CANONICAL_TRANSFORMS[codes])
+    return CANONICAL_IDS[codes], CANONICAL_TRANSFORMS[codes]
+
+
+def transform_states(states: numpy.ndarray,
+                     transforms) -> numpy.ndarray:
+    """
+    Apply the given transforms to the given boards.
+
+    :param states: a board of shape (9,) or a batch of boards of shape (N, 9)
+    :param transforms: the transform to apply or an array of shape (N,) with the transform of each board
+    :return: the transformed board or batch of boards
+    """
+    states = numpy.asarray(states)
+    if states.ndim == 1:
+        return states[BOARD_PERMUTATIONS[transforms]]
+    return numpy.take_along_axis(states, BOARD_PERMUTATIONS[transforms], axis=1)
+
+
+def transform_actions(actions,
+                      transforms):
+    """
+    Map the given actions on the original boards to the actions on the boards transformed by the given transforms.
+
+    :param actions: an action or an array of shape (N,) of actions
+    :param transforms: the transform or an array of shape (N,) with the transform of each action
+    :return: the transformed action or array of actions
+    """
+    return ACTION_PERMUTATIONS[transforms, actions]
+
+
+def inverse_transform_actions(actions,
+                              transforms):
+    """
+    Map the given actions on the boards transformed by the given transforms back to the actions on the original boards.
+
+    It is used to play on a board an action chosen on its canonical form.
+
+    :param actions: an action or an array of shape (N,) of actions
+    :param transforms: the transform or an array of shape (N,) with the transform of each action
+    :return: the original action or array of actions
+    """
+    return INVERSE_ACTION_PERMUTATIONS[transforms, actions]
@@ -0,0 +1,61 @@
+#
+# Copyright (C) 2019 Luca Pasqualini
+# University of Siena - Artificial Intelligence Laboratory - SAILab
+#
+#
+# TicTacToeRL project is licensed under a BSD 3-Clause.
+#
+# You should have received a copy of the license along with this
+# work. If not, see <https://opensource.org/licenses/BSD-3-Clause>.
+
+# Import packages
+
+import numpy
+
+# Define the board code constants
+# Note: each board is identified by a base-3 code where the digit n is 0 if the cell n is empty, 1 if it is occupied
+# by the X player and 2 if it is occupied by the O player
+
+BOARD_CODES: int = 3 ** 9
+CELL_POWERS: numpy.ndarray = 3 ** numpy.arange(9)
+CELL_POWERS.flags.writeable = False
+# Lines of the board, in the same order the final state is checked, and code increment of each action
+WIN_LINES: () = ((0, 1, 2), (0, 3, 6), (0, 4, 8), (2, 5, 8), (2, 4, 6), (1, 4, 7), (3, 4, 5), (6, 7, 8))
+ACTION_CODE_INCREMENTS: [] = [(2 if action % 2 == 0 else 1) * 3 ** (action // 2) for action in range(9 * 2)]
+
+
+def _generate_final_state_tables():
+    """
+    Generate the tables stating, for each board code, if the board is final and which player is the winner.
+
+    When more lines are complete (only possible on unreachable boards) the winner is the owner of the last complete
+    line in the order defined by the win lines.
+
+    :return: the read-only array of final flags and the read-only array of winner values (1 for X, -1 for O, 0 for none)
+    """
+    # Compute the cell values (1 for X, -1 for O, 0 for empty) of all the boards
+    digits: numpy.ndarray = (numpy.arange(BOARD_CODES)[:, numpy.newaxis] // CELL_POWERS) % 3
+    values: numpy.ndarray = numpy.array([0, 1, -1], dtype=numpy.int8)[digits]
+    # Check each line in order, overwriting the winner at each complete line
+    winners: numpy.ndarray = numpy.zeros(BOARD_CODES, dtype=numpy.int8)
+    for first, second, third in WIN_LINES:
+        complete_line: numpy.ndarray = (values[:, first] != 0) & (values[:, first] == values[:, second]) & (values[:, first] == values[:, third])
+        winners = numpy.where(complete_line, values[:, first], winners)
+    # A board is final if there is a winner or if there are no more empty cells
+    final_states: numpy.ndarray = (winners != 0) | numpy.all(values != 0, axis=1)
+    final_states.flags.writeable = False
+    winners.flags.writeable = False
+    return final_states, winners
+
+
+FINAL_STATES, WINNERS = _generate_final_state_tables()
+
+
+def encode_board(boards: numpy.ndarray):
+    """
+    Compute the base-3 code of the given boards, expressed with cell values (1 for X, -1 for O, 0 for empty).
+
+    :param boards: a board of shape (9,) or a batch of boards of shape (N, 9)
+    :return: the code of the board or an array of shape (N,) with the code of each board
+    """
+    return (numpy.asarray(boards, dtype=numpy.int64) % 3) @ CELL_POWERS
@@ -0,0 +1,215 @@
+#
+# Copyright (C) 2019 Luca Pasqualini
+# University of Siena - Artificial Intelligence Laboratory - SAILab
+#
+#
+# TicTacToeRL project is licensed under a BSD 3-Clause.
+#
+# You should have received a copy of the license along with this
+# work. If not, see <https://opensource.org/licenses/BSD-3-Clause>.
+
+# Import packages
+
+import logging
+import numpy
+import math
+
+# Import required src
+
+from src.tictactoe_environment import Player
+from src.tictactoe_tables import FINAL_STATES, WINNERS, ACTION_CODE_INCREMENTS
+from src.tictactoe_state_index import STATE_IDS, get_random_actions
+from src.tictactoe_encodings import get_observations
+
+
+class VectorTicTacToeEnvironment:
+    """
+    Tic-Tac-Toe abstract vectorized environment, stepping a batch of N boards at once.
+
+    Each board, observation and action follows the same conventions of the Tic-Tac-Toe environment:
+        - the boards are stored in a (N, 9) array with 0 for empty cells, 1 for X cells and -1 for O cells
+        - the action 2n is the O player in n, the action 2n+1 is the X player in n
+
+    All the operations are executed as numpy batch operations. Boards reaching a final state are automatically reset,
+    so the observation returned for them is the first state of their next episode.
+    """
+
+    _ACTION_CODE_INCREMENTS: numpy.ndarray = numpy.array(ACTION_CODE_INCREMENTS, dtype=numpy.int64)
+
+    def __init__(self,
+                 name: str,
+                 environment_player: Player,
+                 agent_player_win_reward: float,
+                 environment_player_win_reward: float,
+                 draw_reward: float,
+                 boards_number: int,
+                 seed: int = None):
+        # Define attributes
+        self.name: str = name
+        self.boards_number: int = boards_number
+        self.environment_player: Player = environment_player
+        if self.environment_player == Player.x:
+            self.agent_player: Player = Player.o
+        else:
+            self.agent_player: Player = Player.x
+        self.agent_player_win_reward: float = agent_player_win_reward
+        self.environment_player_win_reward: float = environment_player_win_reward
+        self.draw_reward: float = draw_reward
+        self.current_players: numpy.ndarray = numpy.zeros(self.boards_number, dtype=numpy.int8)
+        self.winners: numpy.ndarray = numpy.zeros(self.boards_number, dtype=numpy.int8)
+        # Define internal attributes
+        self._random_generator: numpy.random.Generator = numpy.random.default_rng(seed)
+        self._boards: numpy.ndarray = numpy.zeros((self.boards_number, 9), dtype=numpy.int8)
+        self._codes: numpy.ndarray = numpy.zeros(self.boards_number, dtype=numpy.int64)
+        self._all_boards: numpy.ndarray = numpy.arange(self.boards_number)
+
+    def reset(self,
+              logger: logging.Logger,
+              session):
+        """
+        Reset all the boards of the environment.
+
+        :param logger: the logger used to print the environment information, warnings and errors
+        :param session: the session of tensorflow currently running, if any
+        :return: the (N, 9) array of the first encoded states and the (N, 18) array of the action masks
+        """
+        self.winners[:] = 0
+        self._reset_boards(logger, session, self._all_boards)
+        return self.get_observations(), self.get_action_masks()
+
+    def step(self,
+             logger: logging.Logger,
+             actions: numpy.ndarray,
+             session):
+        """
+        Execute the given actions, one for each board, and let the environment player reply where required.
+
+        :param logger: the logger used to print the environment information, warnings and errors
+        :param actions: the (N,) array of the actions to execute, each one valid for the current player of its board
+        :param session: the session of tensorflow currently running, if any
+        :return: the (N, 9) array of the encoded states, the (N,) array of rewards, the (N,) array of episode completion flags and the (N, 18) array of the action masks
+        """
+        # Change all the boards with the given actions
+        self._apply_actions(self._all_boards, numpy.asarray(actions))
+        # Check for winners and episode completion flags
+        episodes_done: numpy.ndarray = FINAL_STATES[self._codes]
+        # Let the environment player play on all the boards not completed in which it's its turn
+        environment_player_boards: numpy.ndarray = numpy.flatnonzero(~episodes_done & (self.current_players == self.environment_player.value))
+        if environment_player_boards.size > 0:
+            self._apply_actions(environment_player_boards, self.get_environment_player_actions(logger, session, environment_player_boards))
+            episodes_done = FINAL_STATES[self._codes]
+        self.winners = WINNERS[self._codes]
+        # Assign rewards
+        rewards: numpy.ndarray = numpy.zeros(self.boards_number, dtype=float)
+        rewards[episodes_done & (self.winners == Player.x.value)] = self.agent_player_win_reward
+        rewards[episodes_done & (self.winners == Player.o.value)] = self.environment_player_win_reward
+        rewards[episodes_done & (self.winners == Player.none.value)] = self.draw_reward
+        # Reset all the completed boards
+        completed_boards: numpy.ndarray = numpy.flatnonzero(episodes_done)
+        if completed_boards.size > 0:
+            self._reset_boards(logger, session, completed_boards)
+        # Return the encoded states, the rewards, the episode completion flags and the action masks
+        return self.get_observations(), rewards, episodes_done, self.get_action_masks()
+
+    def get_observations(self,
+                         encoding: str = "signed") -> numpy.ndarray:
+        """
+        Get the encoded current state of all the boards, seen by the agent player.
+
+        :param encoding: the name of the encoding of the observations (see the encodings)
+        :return: a (N, ...) array with the encoded state of each board, (N, 9) integers with the default encoding
+        """
+        return get_observations(encoding, self.state_ids, 1 if self.agent_player == Player.x else 0)
+
+    @property
+    def state_ids(self) -> numpy.ndarray:
+        """
+        The ids of the current state of each board in the state index, updated after each reset and step.
+        """
+        return STATE_IDS[self._codes]
+
+    def get_action_masks(self) -> numpy.ndarray:
+        """
+        Return all the possible actions at the current state of each board wrapped in a numpy array mask.
+
+        :return: a (N, 18) array of -infinity (for unavailable actions) and 1.0 (for available actions)
+        """
+        masks: numpy.ndarray = numpy.full((self.boards_number, 9 * 2), -math.inf)
+        boards, positions = numpy.nonzero(self._boards == Player.none.value)
+        masks[boards, 2 * positions + (self.current_players[boards] == Player.x.value)] = 1.0
+        return masks
+
+    def get_random_actions(self,
+                           boards: numpy.ndarray = None) -> numpy.ndarray:
+        """
+        Get a random action of the current player in the given boards, chosen uniformly among the possible ones.
+
+        :param boards: the indices of the boards in which to choose, all the boards if None
+        :return: an array with a random possible action for each given board
+        """
+        if boards is None:
+            boards = self._all_boards
+        # Choose a legal position of each board, uniformly distributed over the number of legal positions
+        return get_random_actions(STATE_IDS[self._codes[boards]], self.current_players[boards] == Player.x.value, self._random_generator.random(boards.size))
+
+    def _apply_actions(self,
+                       boards: numpy.ndarray,
+                       actions: numpy.ndarray):
+        """
+        Apply the given actions to the given boards and pass the turn to the other player.
+
+        :param boards: the indices of the boards in which to apply the actions
+        :param actions: the actions to apply, one for each given board
+        """
+        positions, players = numpy.divmod(actions, 2)
+        self._boards[boards, positions] = numpy.where(players == 0, Player.o.value, Player.x.value)
+        self._codes[boards] += self._ACTION_CODE_INCREMENTS[actions]
+        self.current_players[boards] = -self.current_players[boards]
+
+    def _reset_boards(self,
+                      logger: logging.Logger,
+                      session,
+                      boards: numpy.ndarray):
+        """
+        Reset the given boards, choosing a random starting player and letting the environment player play first if chosen.
+
+        :param logger: the logger used to print the environment information, warnings and errors
+        :param session: the session of tensorflow currently running, if any
+        :param boards: the indices of the boards to reset
+        """
+        self._boards[boards] = Player.none.value
+        self._codes[boards] = 0
+        # Choose a random starting player
+        self.current_players[boards] = numpy.where(self._random_generator.random(boards.size) <= 0.5, Player.x.value, Player.o.value)
+        # Let the environment player play first where it is the starting player
+        environment_player_boards: numpy.ndarray = boards[self.current_players[boards] == self.environment_player.value]
+        if environment_player_boards.size > 0:
+            self._apply_actions(environment_player_boards, self.get_environment_player_first_actions(logger, session, environment_player_boards))
+
+    def get_environment_player_first_actions(self,
+                                             logger: logging.Logger,
+                                             session,
+                                             boards: numpy.ndarray) -> numpy.ndarray:
+        """
+        Get the first action from the environment player on the given boards.
+
+        :param logger: the logger used to print the environment information, warnings and errors
+        :param session: the session of tensorflow currently running, if any
+        :param boards: the indices of the boards in which the environment player has to play
+        :return: an array with the action of the environment player for each given board
+        """
+        raise NotImplementedError()
+
+    def get_environment_player_actions(self,
+                                       logger: logging.Logger,
+                                       session,
+                                       boards: numpy.ndarray) -> numpy.ndarray:
+        """
+        Get the action from the environment player on the given boards.
+
+        :param logger: the logger used to print the environment information, warnings and errors
+        :param session: the session of tensorflow currently running, if any
+        :param boards: the indices of the boards in which the environment player has to play
+        :return: an array with the action of the environment player for each given board
+        """
+        raise NotImplementedError()
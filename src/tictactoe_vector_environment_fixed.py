@@ -0,0 +1,55 @@
+#
+# Copyright (C) 2019 Luca Pasqualini
+# University of Siena - Artificial Intelligence Laboratory - SAILab
+#
+#
+# TicTacToeRL project is licensed under a BSD 3-Clause.
+#
+# You should have received a copy of the license along with this
+# work. If not, see <https://opensource.org/licenses/BSD-3-Clause>.
+
+# Import packages
+
+import logging
+import numpy
+
+# Import src
+
+from src.tictactoe_vector_environment import VectorTicTacToeEnvironment, Player
+from src.tictactoe_fixed_policy import get_fixed_policy_actions
+
+
+class VectorTicTacToeEnvironmentFixed(VectorTicTacToeEnvironment):
+    """
+    Tic-Tac-Toe vectorized environment in which the environment player plays with a fixed policy on all the boards.
+
+    The policy is the same of the Tic-Tac-Toe fixed environment: win if possible, otherwise block the agent player,
+    otherwise play randomly. When more positions can win (or block) the lowest one is chosen.
+    """
+
+    def __init__(self,
+                 name: str,
+                 environment_player: Player,
+                 agent_player_win_reward: float,
+                 environment_player_win_reward: float,
+                 draw_reward: float,
+                 boards_number: int,
+                 seed: int = None):
+        # Generate the base vectorized tic tac toe environment
+        super(VectorTicTacToeEnvironmentFixed, self).__init__(name, environment_player, agent_player_win_reward, environment_player_win_reward, draw_reward, boards_number, seed)
+
+    def get_environment_player_first_actions(self,
+                                             logger: logging.Logger,
+                                             session,
+                                             boards: numpy.ndarray) -> numpy.ndarray:
+        # Just return random actions
+        return self.get_random_actions(boards)
+
+    def get_environment_player_actions(self,
+                                       logger: logging.Logger,
+                                       session,
+                                       boards: numpy.ndarray) -> numpy.ndarray:
+        # Win if possible, otherwise block if possible, otherwise play randomly
+        random_actions: numpy.ndarray = self.get_random_actions(boards)
+        player_offset: int = 1 if self.environment_player == Player.x else 0
+        return get_fixed_policy_actions(self.state_ids[boards], player_offset, random_actions)
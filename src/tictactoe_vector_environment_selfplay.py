@@ -0,0 +1,77 @@
+#
+# Copyright (C) 2019 Luca Pasqualini
+# University of Siena - Artificial Intelligence Laboratory - SAILab
+#
+#
+# TicTacToeRL project is licensed under a BSD 3-Clause.
+#
+# You should have received a copy of the license along with this
+# work. If not, see <https://opensource.org/licenses/BSD-3-Clause>.
+
+# Import packages
+
+import logging
+import numpy
+
+# Import src
+
+from src.tictactoe_vector_environment import VectorTicTacToeEnvironment, Player
+from src.tictactoe_state_index import STATE_ACTION_MASKS, STATE_POSITION_ACTION_MASKS
+from src.dddql_tictactoe_agent import DDDQLTicTacToeAgent
+
+
+class VectorTicTacToeEnvironmentSelfPlay(VectorTicTacToeEnvironment):
+    """
+    Tic-Tac-Toe vectorized environment in which the environment player is the same agent on all the boards.
+
+    The environment player sees the state as the inverse of the real state since it was trained to be the agent player.
+    The moves of the environment player on all the boards are evaluated by the agent in a single forward pass, on the
+    flipped observations written in a preallocated buffer.
+
+    If compact, the agent is expected to use the compact interface (9 position actions), otherwise the pass-through
+    interface (18 actions).
+    """
+
+    def __init__(self,
+                 name: str,
+                 environment_player: Player,
+                 agent_player_win_reward: float,
+                 environment_player_win_reward: float,
+                 draw_reward: float,
+                 boards_number: int,
+                 agent: DDDQLTicTacToeAgent,
+                 seed: int = None,
+                 compact: bool = False):
+        # Define environment attributes
+        self.compact: bool = compact
+        self._agent: DDDQLTicTacToeAgent = agent
+        # Generate the base vectorized tic tac toe environment
+        super(VectorTicTacToeEnvironmentSelfPlay, self).__init__(name, environment_player, agent_player_win_reward, environment_player_win_reward, draw_reward, boards_number, seed)
+        # Define the buffer of the flipped observations of all the boards
+        self._flipped_observations: numpy.ndarray = numpy.zeros((self.boards_number, 9), dtype=int)
+
+    def get_environment_player_first_actions(self,
+                                             logger: logging.Logger,
+                                             session,
+                                             boards: numpy.ndarray) -> numpy.ndarray:
+        # Just return random actions
+        return self.get_random_actions(boards)
+
+    def get_environment_player_actions(self,
+                                       logger: logging.Logger,
+                                       session,
+                                       boards: numpy.ndarray) -> numpy.ndarray:
+        # Write the flipped version of the boards in the observation buffer
+        flipped_observations: numpy.ndarray = self._flipped_observations[:boards.size]
+        numpy.negative(self._boards[boards], out=flipped_observations, casting="unsafe")
+        # Get the agent positions on the empty positions and play them with the environment player
+        if self.compact:
+            agent_positions: numpy.ndarray = self._agent.act_inference_batch(logger, session, flipped_observations, STATE_POSITION_ACTION_MASKS[self.state_ids[boards]])
+            return 2 * agent_positions + (1 if self.environment_player == Player.x else 0)
+        # Get the agent actions with the masks of the agent player, as if the agent was playing for the agent player
+        agent_player_offset: int = 1 if self.agent_player == Player.x else 0
+        agent_actions: numpy.ndarray = self._agent.act_inference_batch(logger, session, flipped_observations, STATE_ACTION_MASKS[self.state_ids[boards], agent_player_offset])
+        # Flip back the actions to the environment player
+        if self.environment_player == Player.x:
+            return agent_actions + 1
+        return agent_actions - 1
@@ -17,11 +17,11 @@ import os
 # Import usienarl
 
 from usienarl import Config, LayerType, run_experiment, command_line_parse
-from usienarl.td_models import DuelingDeepQLearning
 from usienarl.exploration_policies import BoltzmannExplorationPolicy
 
 # Import required src
 
+from src.tictactoe_dueling_deep_q_learning import TicTacToeDuelingDeepQLearning
 from src.dddql_tictactoe_agent import DDDQLTicTacToeAgent
 from src.tictactoe_experiment import TicTacToeExperiment
 from src.tictactoe_environment_random import TicTacToeEnvironmentRandom, Player
@@ -31,7 +31,7 @@ from src.tictactoe_pass_through_interface import TicTacToePassThroughInterface
 # Define utility functions to run the experiment
 
 
-def _define_dddqn_model(config: Config, learning_rate: float) -> DuelingDeepQLearning:
+def _define_dddqn_model(config: Config, learning_rate: float) -> TicTacToeDuelingDeepQLearning:
     # Define attributes
     discount_factor: float = 0.99
     buffer_capacity: int = 100000
@@ -41,12 +41,12 @@ def _define_dddqn_model(config: Config, learning_rate: float) -> DuelingDeepQLea
     importance_sampling_value: float = 0.001
     error_clip: bool = True
     # Return the _model
-    return DuelingDeepQLearning("model",
-                                learning_rate, discount_factor,
-                                buffer_capacity,
-                                minimum_sample_probability, random_sample_trade_off,
-                                importance_sampling_value, importance_sampling_value_increment,
-                                config, error_clip)
+    return TicTacToeDuelingDeepQLearning("model",
+                                         learning_rate, discount_factor,
+                                         buffer_capacity,
+                                         minimum_sample_probability, random_sample_trade_off,
+                                         importance_sampling_value, importance_sampling_value_increment,
+                                         config, error_clip)
 
 
 def _define_boltzmann_exploration_policy(temperature_max: float, temperature_min: float) -> BoltzmannExplorationPolicy:
@@ -56,7 +56,7 @@ def _define_boltzmann_exploration_policy(temperature_max: float, temperature_min
     return BoltzmannExplorationPolicy(temperature_max, temperature_min, temperature_decay)
 
 
-def _define_curriculum_agent(model: DuelingDeepQLearning,
+def _define_curriculum_agent(model: TicTacToeDuelingDeepQLearning,
                              exploration_policy: BoltzmannExplorationPolicy,
                              warmup_random_action_probability: float) -> DDDQLTicTacToeAgent:
     # Define attributes
@@ -96,8 +96,8 @@ if __name__ == "__main__":
     nn_config.add_hidden_layer(LayerType.dense, [1024, tensorflow.nn.relu, True, tensorflow.contrib.layers.xavier_initializer()])
     nn_config.add_hidden_layer(LayerType.dense, [1024, tensorflow.nn.relu, True, tensorflow.contrib.layers.xavier_initializer()])
     # Define model
-    inner_model_first: DuelingDeepQLearning = _define_dddqn_model(nn_config, 0.000001)
-    inner_model_second: DuelingDeepQLearning = _define_dddqn_model(nn_config, 0.000001)
+    inner_model_first: TicTacToeDuelingDeepQLearning = _define_dddqn_model(nn_config, 0.000001)
+    inner_model_second: TicTacToeDuelingDeepQLearning = _define_dddqn_model(nn_config, 0.000001)
     # Define exploration policies
     exploration_policy_first: BoltzmannExplorationPolicy = _define_boltzmann_exploration_policy(1.0, 0.1)
     exploration_policy_second: BoltzmannExplorationPolicy = _define_boltzmann_exploration_policy(0.85, 0.1)
@@ -17,20 +17,21 @@ import os
 # Import usienarl
 
 from usienarl import Config, LayerType, watch_experiment, command_line_parse
-from usienarl.td_models import DuelingDeepQLearning
 from usienarl.exploration_policies import BoltzmannExplorationPolicy
 
 # Import required src
 
+from src.tictactoe_dueling_deep_q_learning import TicTacToeDuelingDeepQLearning
 from src.dddql_tictactoe_agent import DDDQLTicTacToeAgent
 from src.tictactoe_experiment import TicTacToeExperiment
 from src.tictactoe_environment_fixed import TicTacToeEnvironmentFixed, Player
 from src.tictactoe_pass_through_interface import TicTacToePassThroughInterface
+from src.tictactoe_renderer import TicTacToeSlowWatchRenderer
 
 # Define utility functions to run the experiment
 
 
-def _define_dddqn_model(config: Config) -> DuelingDeepQLearning:
+def _define_dddqn_model(config: Config) -> TicTacToeDuelingDeepQLearning:
     # Define attributes
     learning_rate: float = 0.000001
     discount_factor: float = 0.99
@@ -41,12 +42,12 @@ def _define_dddqn_model(config: Config) -> DuelingDeepQLearning:
     importance_sampling_value: float = 0.001
     error_clip: bool = True
     # Return the model
-    return DuelingDeepQLearning("model",
-                                learning_rate, discount_factor,
-                                buffer_capacity,
-                                minimum_sample_probability, random_sample_trade_off,
-                                importance_sampling_value, importance_sampling_value_increment,
-                                config, error_clip)
+    return TicTacToeDuelingDeepQLearning("model",
+                                         learning_rate, discount_factor,
+                                         buffer_capacity,
+                                         minimum_sample_probability, random_sample_trade_off,
+                                         importance_sampling_value, importance_sampling_value_increment,
+                                         config, error_clip)
 
 
 def _define_boltzmann_exploration_policy() -> BoltzmannExplorationPolicy:
@@ -58,7 +59,7 @@ def _define_boltzmann_exploration_policy() -> BoltzmannExplorationPolicy:
     return BoltzmannExplorationPolicy(temperature_max, temperature_min, temperature_decay)
 
 
-def _define_boltzmann_agent(model: DuelingDeepQLearning, exploration_policy: BoltzmannExplorationPolicy) -> DDDQLTicTacToeAgent:
+def _define_boltzmann_agent(model: TicTacToeDuelingDeepQLearning, exploration_policy: BoltzmannExplorationPolicy) -> DDDQLTicTacToeAgent:
     # Define attributes
     weight_copy_step_interval: int = 100
     batch_size: int = 150
@@ -81,13 +82,15 @@ if __name__ == "__main__":
     # Generate Tic Tac Toe environments with fixed environment player and using the O player as the environment player with only low reward type
     environment_low_reward: TicTacToeEnvironmentFixed = TicTacToeEnvironmentFixed(environment_name, Player.o,
                                                                                   1.0, -0.1, 0.0)
+    # Watch the games slowly on the terminal
+    environment_low_reward.attach_renderer(TicTacToeSlowWatchRenderer())
     # Define Neural Network layers
     nn_config: Config = Config()
     nn_config.add_hidden_layer(LayerType.dense, [1024, tensorflow.nn.relu, True, tensorflow.contrib.layers.xavier_initializer()])
     nn_config.add_hidden_layer(LayerType.dense, [1024, tensorflow.nn.relu, True, tensorflow.contrib.layers.xavier_initializer()])
     nn_config.add_hidden_layer(LayerType.dense, [1024, tensorflow.nn.relu, True, tensorflow.contrib.layers.xavier_initializer()])
     # Define model
-    inner_model: DuelingDeepQLearning = _define_dddqn_model(nn_config)
+    inner_model: TicTacToeDuelingDeepQLearning = _define_dddqn_model(nn_config)
     # Define exploration policy
     boltzmann_exploration_policy: BoltzmannExplorationPolicy = _define_boltzmann_exploration_policy()
     # Define agent